@@ -0,0 +1,19 @@
+alter table supplier add column if not exists text_vector tsvector;
+
+create or replace function supplier_text_vector_update() returns trigger as $$
+begin
+  new.text_vector :=
+    setweight(to_tsvector(coalesce(new.name, '')), 'A') ||
+    setweight(to_tsvector(coalesce(new.summary, '')), 'B') ||
+    setweight(to_tsvector(concat(new.summary, new.data->>'tools', new.data->>'methodologies',
+                                 new.data->>'technologies', '')), 'C');
+  return new;
+end
+$$ language plpgsql;
+
+drop trigger if exists supplier_text_vector_update on supplier;
+create trigger supplier_text_vector_update before insert or update of name, summary, data on supplier
+  for each row execute procedure supplier_text_vector_update();
+
+-- existing rows are filled by scripts/oneoff/backfill_text_vectors.py, which commits in batches
+create index if not exists ix_supplier_text_vector on supplier using gin (text_vector);
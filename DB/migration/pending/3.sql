@@ -0,0 +1,28 @@
+alter table product add column if not exists text_vector tsvector;
+
+create or replace function product_text_vector_update() returns trigger as $$
+begin
+  new.text_vector := to_tsvector(concat(new.name, new.summary,
+                                        (select s.name from supplier s where s.code = new.supplier_code)));
+  return new;
+end
+$$ language plpgsql;
+
+drop trigger if exists product_text_vector_update on product;
+create trigger product_text_vector_update before insert or update of name, summary, supplier_code on product
+  for each row execute procedure product_text_vector_update();
+
+create or replace function supplier_product_text_vector_update() returns trigger as $$
+begin
+  update product set name = name where supplier_code = new.code;
+  return null;
+end
+$$ language plpgsql;
+
+drop trigger if exists supplier_product_text_vector_update on supplier;
+create trigger supplier_product_text_vector_update after update of name on supplier
+  for each row when (old.name is distinct from new.name)
+  execute procedure supplier_product_text_vector_update();
+
+-- existing rows are filled by scripts/oneoff/backfill_text_vectors.py --table=product
+create index if not exists ix_product_text_vector on product using gin (text_vector);
@@ -0,0 +1,5 @@
+alter table brief alter column data type jsonb using data::jsonb;
+alter table supplier alter column data type jsonb using data::jsonb;
+
+create index if not exists ix_brief_data_seller_selector on brief ((data ->> 'sellerSelector'));
+create index if not exists ix_brief_data_area_of_expertise on brief ((data ->> 'areaOfExpertise'));
@@ -0,0 +1,8 @@
+create table if not exists application_history_metric (
+  day date not null,
+  type varchar not null,
+  count bigint,
+  primary key (day, type)
+);
+
+-- filled by the update_application_history_metrics beat task, which snapshots every finished day
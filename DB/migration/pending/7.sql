@@ -0,0 +1,3 @@
+alter table brief add column if not exists responses_zip_manifest jsonb;
+
+-- existing archives have no manifest, so each is rebuilt in full once by create_responses_zip_for_closed_briefs
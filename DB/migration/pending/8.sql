@@ -0,0 +1,3 @@
+create extension if not exists pg_trgm;
+
+create index if not exists ix_supplier_name_trgm on supplier using gin (name gin_trgm_ops);
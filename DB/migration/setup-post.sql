@@ -1,3 +1,156 @@
 create view vuser as (
   select *, split_part(email_address, '@', 2) as email_domain from "user" u
 );
+
+create or replace function supplier_text_vector_update() returns trigger as $$
+begin
+  new.text_vector :=
+    setweight(to_tsvector(coalesce(new.name, '')), 'A') ||
+    setweight(to_tsvector(coalesce(new.summary, '')), 'B') ||
+    setweight(to_tsvector(concat(new.summary, new.data->>'tools', new.data->>'methodologies',
+                                 new.data->>'technologies', '')), 'C');
+  return new;
+end
+$$ language plpgsql;
+
+drop trigger if exists supplier_text_vector_update on supplier;
+create trigger supplier_text_vector_update before insert or update of name, summary, data on supplier
+  for each row execute procedure supplier_text_vector_update();
+
+create or replace function product_text_vector_update() returns trigger as $$
+begin
+  new.text_vector := to_tsvector(concat(new.name, new.summary,
+                                        (select s.name from supplier s where s.code = new.supplier_code)));
+  return new;
+end
+$$ language plpgsql;
+
+drop trigger if exists product_text_vector_update on product;
+create trigger product_text_vector_update before insert or update of name, summary, supplier_code on product
+  for each row execute procedure product_text_vector_update();
+
+create or replace function supplier_product_text_vector_update() returns trigger as $$
+begin
+  update product set name = name where supplier_code = new.code;
+  return null;
+end
+$$ language plpgsql;
+
+drop trigger if exists supplier_product_text_vector_update on supplier;
+create trigger supplier_product_text_vector_update after update of name on supplier
+  for each row when (old.name is distinct from new.name)
+  execute procedure supplier_product_text_vector_update();
+
+-- brief_access holds the (brief_id, user_id) pairs each buyer (viewer_id) can see on their dashboard:
+-- members of a completed team see their teams' briefs and every brief owned by a team mate,
+-- everyone else sees the briefs they own. Triggers below keep it current.
+create or replace function brief_access_rows(viewer_ids integer[])
+returns table (viewer_id integer, brief_id integer, user_id integer) as $$
+  with viewer_team as (
+    select tm.user_id as viewer_id, tm.team_id
+    from team_member tm
+    join team t on t.id = tm.team_id
+    where tm.user_id = any(viewer_ids) and t.status = 'completed'
+  )
+  select vt.viewer_id, tb.brief_id, tb.user_id
+  from viewer_team vt
+  join team_brief tb on tb.team_id = vt.team_id
+  union
+  select vt.viewer_id, bu.brief_id, bu.user_id
+  from viewer_team vt
+  join team_member mate on mate.team_id = vt.team_id
+  join brief_user bu on bu.user_id = mate.user_id
+  union
+  select v.viewer_id, bu.brief_id, bu.user_id
+  from unnest(viewer_ids) v (viewer_id)
+  join brief_user own on own.user_id = v.viewer_id
+  join brief_user bu on bu.brief_id = own.brief_id
+  where not exists (select 1 from viewer_team vt where vt.viewer_id = v.viewer_id)
+$$ language sql stable;
+
+create or replace function brief_access_refresh(viewer_ids integer[]) returns void as $$
+begin
+  delete from brief_access where viewer_id = any(viewer_ids);
+  insert into brief_access (viewer_id, brief_id, user_id)
+    select r.viewer_id, r.brief_id, r.user_id from brief_access_rows(viewer_ids) r;
+end
+$$ language plpgsql;
+
+create or replace function brief_access_team_viewers(team_id integer) returns integer[] as $$
+  select array(select tm.user_id from team_member tm where tm.team_id = $1)
+$$ language sql stable;
+
+create or replace function brief_access_user_viewers(user_id integer, brief_id integer) returns integer[] as $$
+  select array(
+    select $1
+    union
+    select mate.user_id
+    from team_member tm
+    join team_member mate on mate.team_id = tm.team_id
+    where tm.user_id = $1
+    union
+    select ba.viewer_id from brief_access ba where ba.brief_id = $2
+    union
+    select bu.user_id from brief_user bu where bu.brief_id = $2
+  )
+$$ language sql stable;
+
+create or replace function brief_user_brief_access_update() returns trigger as $$
+begin
+  if tg_op <> 'INSERT' then
+    perform brief_access_refresh(brief_access_user_viewers(old.user_id, old.brief_id));
+  end if;
+  if tg_op <> 'DELETE' then
+    perform brief_access_refresh(brief_access_user_viewers(new.user_id, new.brief_id));
+  end if;
+  return null;
+end
+$$ language plpgsql;
+
+drop trigger if exists brief_user_brief_access_update on brief_user;
+create trigger brief_user_brief_access_update after insert or update or delete on brief_user
+  for each row execute procedure brief_user_brief_access_update();
+
+create or replace function team_member_brief_access_update() returns trigger as $$
+begin
+  if tg_op <> 'INSERT' then
+    perform brief_access_refresh(brief_access_team_viewers(old.team_id) || old.user_id);
+  end if;
+  if tg_op <> 'DELETE' then
+    perform brief_access_refresh(brief_access_team_viewers(new.team_id) || new.user_id);
+  end if;
+  return null;
+end
+$$ language plpgsql;
+
+drop trigger if exists team_member_brief_access_update on team_member;
+create trigger team_member_brief_access_update after insert or update of team_id, user_id or delete on team_member
+  for each row execute procedure team_member_brief_access_update();
+
+create or replace function team_brief_brief_access_update() returns trigger as $$
+begin
+  if tg_op <> 'INSERT' then
+    perform brief_access_refresh(brief_access_team_viewers(old.team_id));
+  end if;
+  if tg_op <> 'DELETE' then
+    perform brief_access_refresh(brief_access_team_viewers(new.team_id));
+  end if;
+  return null;
+end
+$$ language plpgsql;
+
+drop trigger if exists team_brief_brief_access_update on team_brief;
+create trigger team_brief_brief_access_update after insert or update or delete on team_brief
+  for each row execute procedure team_brief_brief_access_update();
+
+create or replace function team_brief_access_update() returns trigger as $$
+begin
+  perform brief_access_refresh(brief_access_team_viewers(new.id));
+  return null;
+end
+$$ language plpgsql;
+
+drop trigger if exists team_brief_access_update on team;
+create trigger team_brief_access_update after update of status on team
+  for each row when (old.status is distinct from new.status)
+  execute procedure team_brief_access_update();
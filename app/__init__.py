@@ -52,7 +52,9 @@ def create_app(config_name):
             redis_opts['port'] = application.config['REDIS_SERVER_PORT']
             redis_opts['password'] = application.config['REDIS_SERVER_PASSWORD']
 
-        session_store = RedisStore(redis.StrictRedis(**redis_opts))
+        redis_client = redis.StrictRedis(**redis_opts)
+        application.extensions['redis'] = redis_client
+        session_store = RedisStore(redis_client)
         KVSessionExtension(session_store, application)
 
     if not application.config['DM_API_AUTH_TOKENS']:
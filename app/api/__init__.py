@@ -6,11 +6,9 @@ from flask import Blueprint, request, current_app
 from flask_login import LoginManager
 from app.models import User
 from app.api.business import supplier_business, team_business
-from app.api.services import api_key_service
 from base64 import b64decode
 from app import encryption
-from app.api.helpers import abort
-from app.authentication import get_api_key_from_request
+from app.api.helpers import abort, get_api_key_user_id
 
 api = Blueprint('api', __name__)
 login_manager = LoginManager()
@@ -40,8 +38,7 @@ def load_user(userid):
 def get_notification_count(user):
     notification_count = None
     if user.role == 'supplier':
-        errors_warnings = supplier_business.get_supplier_messages(user.supplier_code, False)
-        notification_count = len(errors_warnings.errors + errors_warnings.warnings)
+        notification_count = supplier_business.get_notification_count(user.supplier_code)
 
     return notification_count
 
@@ -60,8 +57,7 @@ def check_csrf_token():
         not be forwarded by browsers automatically in authenticated requests, so the presence of a valid API key in the
         request proves authenticity like a CSRF token.
         '''
-        api_key = get_api_key_from_request(request)
-        if not api_key or not api_key_service.get_key(api_key):
+        if not get_api_key_user_id():
             new_csrf_valid = check_valid_csrf()
 
             if not (new_csrf_valid):
@@ -71,7 +67,9 @@ def check_csrf_token():
 
 @api.after_request
 def add_cache_control(response):
-    response.headers['Cache-control'] = 'no-cache, no-store'
+    # views that support conditional requests set their own, weaker, directive
+    if 'Cache-control' not in response.headers:
+        response.headers['Cache-control'] = 'no-cache, no-store'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = 0
     return response
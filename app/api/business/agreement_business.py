@@ -1,38 +1,78 @@
 import pendulum
+from flask import current_app
+from sqlalchemy.orm.exc import MultipleResultsFound
 
 from app.api.business.validators import SupplierValidator
 from app.api.services import (application_service, key_values_service,
                               master_agreement_service, suppliers)
+from app.cache import LRUCache, clear_on_commit
 from app.models import MasterAgreement
 
 
-def get_old_agreements():
-    now = pendulum.now('utc')
-    return master_agreement_service.filter(
-        MasterAgreement.end_date < now
-    ).all()
+class Agreement(object):
+    """A read-only copy of a MasterAgreement row that can be shared between requests."""
 
+    def __init__(self, id, start_date, end_date, data):
+        self.id = id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.data = data
 
-def get_current_agreement():
-    now = pendulum.now('utc')
-    return master_agreement_service.filter(
-        MasterAgreement.start_date <= now,
-        MasterAgreement.end_date >= now
-    ).one_or_none()
+    def serialize(self):
+        data = dict(self.data or {})
+        data.update({
+            'id': self.id,
+            'startDate': self.start_date,
+            'endDate': self.end_date
+        })
 
+        return data
 
-def get_new_agreement():
-    now = pendulum.now('utc')
-    return master_agreement_service.filter(
-        MasterAgreement.start_date > now
-    ).one_or_none()
 
+agreements_cache = LRUCache(maxsize=1)
+clear_on_commit(agreements_cache, MasterAgreement)
 
-def has_signed_current_agreement(supplier):
-    current_agreement = get_current_agreement()
+
+def get_agreements():
+    """Every master agreement, cached for AGREEMENT_CACHE_TTL seconds and dropped when one is committed."""
+    def load():
+        return tuple(
+            Agreement(a.id, a.start_date, a.end_date, dict(a.data or {}))
+            for a in master_agreement_service.get_agreements()
+        )
+
+    ttl = current_app.config['AGREEMENT_CACHE_TTL']
+    if not ttl:
+        return load()
+    return agreements_cache.get_or_set('agreements', load, ttl=ttl)
+
+
+def _one_or_none(agreements):
+    if len(agreements) > 1:
+        raise MultipleResultsFound('Multiple master agreements found')
+    return agreements[0] if agreements else None
+
+
+def get_old_agreements(at=None):
+    now = at or pendulum.now('utc')
+    return [a for a in get_agreements() if a.end_date < now]
+
+
+def get_current_agreement(at=None):
+    now = at or pendulum.now('utc')
+    return _one_or_none([a for a in get_agreements() if a.start_date <= now and a.end_date >= now])
+
+
+def get_new_agreement(at=None):
+    now = at or pendulum.now('utc')
+    return _one_or_none([a for a in get_agreements() if a.start_date > now])
+
+
+def has_signed_current_agreement(supplier, at=None):
+    current_agreement = get_current_agreement(at)
 
     if current_agreement:
-        old_agreements = get_old_agreements()
+        old_agreements = get_old_agreements(at)
         old_agreement_ids = [agreement.id for agreement in old_agreements]
 
         if current_agreement.id in old_agreement_ids:
@@ -58,6 +58,11 @@ def close_opportunity_early(user_id, brief_id):
         raise NotFoundError('User {} does not exist'.format(user_id))
 
     brief = brief_service.close_opportunity_early(brief)
+    try:
+        brief_service.update_metrics(brief, 'closed')
+    except Exception:
+        rollbar.report_exc_info()
+
     create_responses_zip(brief.id)
     send_opportunity_closed_early_email(brief, user)
 
@@ -102,6 +107,11 @@ def withdraw_opportunity(user_id, brief_id, withdrawal_reason):
         raise NotFoundError('User {} does not exist'.format(user_id))
 
     brief = brief_service.withdraw_opportunity(brief, withdrawal_reason)
+    try:
+        brief_service.update_metrics(brief, 'withdrawn')
+    except Exception:
+        rollbar.report_exc_info()
+
     organisation = agency_service.get_agency_name(user.agency_id)
     sellers_to_contact = brief_service.get_sellers_to_notify(brief, brief_business.is_open_to_all(brief))
 
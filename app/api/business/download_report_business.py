@@ -13,54 +13,69 @@ from app.api.csv import (
 )
 
 
-def get_result(current_user, report_type, start_date, end_date):
+STREAM_BATCH_SIZE = 1000
+
+
+def get_result(current_user, report_type, start_date, end_date, stream=False):
+    """Return the file name, rows and csv generator for `report_type`.
+
+    With `stream` the rows are an iterator over a server-side cursor rather than a list, so they can only be
+    consumed once, inside the request that fetched them.
+    """
+    def fetch(query):
+        if stream:
+            return (r._asdict() for r in query.execution_options(stream_results=True).yield_per(STREAM_BATCH_SIZE))
+        return [r._asdict() for r in query.all()]
+
     csv_generator = None
     result = None
     report_file_name = None
 
     if report_type == 'sellersCatalogue':
-        result = suppliers.get_approved_suppliers()
+        result = fetch(suppliers.get_approved_suppliers_query())
         csv_generator = generate_seller_catalogue_csv
         report_file_name = 'current-approved-seller-catalogue.csv'
 
     elif report_type == 'sellerResponses':
-        result = briefs.get_all_user_seller_responses_within_date_range(
+        result = fetch(briefs.get_all_user_seller_responses_within_date_range_query(
             current_user.id, start_date, end_date
-        )
+        ))
         csv_generator = generate_seller_responses_csv
         report_file_name = "seller_responses_within_" + start_date + "_and_" + end_date + ".csv"
 
     elif report_type == 'specialist':
-        result = briefs.get_oppportunities_for_download(
+        result = fetch(briefs.get_oppportunities_for_download_query(
             current_user.id,
             start_date,
             end_date,
             [
                 'specialist'
             ]
-        )
+        ))
         csv_generator = generate_specialist_opportunities_csv
         report_file_name = "specialist_opportunities_within_" + start_date + "_and_" + end_date + ".csv"
 
     elif report_type == 'atm':
-        result = briefs.get_oppportunities_for_download(current_user.id, start_date, end_date, ['atm'])
+        result = fetch(briefs.get_oppportunities_for_download_query(current_user.id, start_date, end_date, ['atm']))
         csv_generator = generate_atm_opportunities_csv
         report_file_name = "atm_opportunities_within_" + start_date + "_and_" + end_date + ".csv"
 
     elif report_type == 'rfx':
-        result = briefs.get_oppportunities_for_download(
+        result = fetch(briefs.get_oppportunities_for_download_query(
             current_user.id,
             start_date,
             end_date,
             [
                 'rfx'
             ]
-        )
+        ))
         csv_generator = generate_rfx_opportunities_csv
         report_file_name = "rfx_opportunities_within_" + start_date + "_and_" + end_date + ".csv"
 
     elif report_type == 'training':
-        result = briefs.get_oppportunities_for_download(current_user.id, start_date, end_date, ['training2'])
+        result = fetch(briefs.get_oppportunities_for_download_query(
+            current_user.id, start_date, end_date, ['training2']
+        ))
         csv_generator = generate_training_opportunities_csv
         report_file_name = "training_opportunities_within_" + start_date + "_and_" + end_date + ".csv"
 
@@ -1,12 +1,42 @@
 import collections
 
 import pendulum
+from flask import current_app
 
 from app.api.business.agreement_business import (get_current_agreement,
                                                  get_new_agreement,
                                                  has_signed_current_agreement)
 from app.api.business.validators import SupplierValidator
 from app.api.services import application_service, key_values_service, suppliers
+from app.cache import SharedCache, on_commit
+from app.models import (Application, MasterAgreement, SignedAgreement,
+                        Supplier, SupplierDomain)
+
+notification_counts = SharedCache('supplier_notification_count:')
+
+
+def _notification_supplier_code(instance):
+    if isinstance(instance, Supplier):
+        return instance.code
+    if isinstance(instance, SupplierDomain):
+        return instance.supplier.code if instance.supplier else None
+    if isinstance(instance, (Application, SignedAgreement)):
+        return instance.supplier_code
+    # a master agreement change affects every supplier
+    return '*'
+
+
+def _forget_notification_counts(codes):
+    if '*' in codes:
+        notification_counts.clear()
+        return
+    for code in codes:
+        if code is not None:
+            notification_counts.delete(code)
+
+
+on_commit(_forget_notification_counts, Application, MasterAgreement, SignedAgreement, Supplier, SupplierDomain,
+          key=_notification_supplier_code)
 
 
 def abn_is_used(abn):
@@ -20,6 +50,22 @@ def abn_is_used(abn):
     return False
 
 
+def get_notification_count(code):
+    """Number of errors and warnings on the supplier's dashboard, cached for SUPPLIER_NOTIFICATION_COUNT_CACHE_TTL
+    seconds and forgotten when the supplier, its domains, applications or signed agreements, or any master
+    agreement is committed.
+    """
+    ttl = current_app.config['SUPPLIER_NOTIFICATION_COUNT_CACHE_TTL']
+    count = notification_counts.get(code) if ttl else None
+    if count is None:
+        messages = get_supplier_messages(code, False)
+        count = len(messages.errors + messages.warnings)
+        if ttl:
+            notification_counts.set(code, count, ttl=ttl)
+
+    return count
+
+
 def get_supplier_messages(code, skip_application_check):
     applications = application_service.find(
         supplier_code=code,
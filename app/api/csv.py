@@ -3,6 +3,7 @@ import six
 import csvx
 from io import StringIO
 from collections import OrderedDict as od
+from itertools import islice
 import json
 import pendulum
 
@@ -11,13 +12,11 @@ def csv_cell_sanitize(text):
     return re.sub(r"^(;|=|\+|-|@|!|\|{|}|\[|\]|<|,)+", '', unicode(text).strip())
 
 
-def convert_to_csv(data, convertor_function, transpose=False):
-    # convert the responses to a list - each row is a dict representing a brief response
-    rows = [convertor_function(d) for d in data]
-    # add the keys of a dict as the first element in the rows list, to be used as headers
-    first = rows[0].keys() if data else []
-    first = [f.replace('_', ' ').capitalize() if '_' in f else f for f in first]
-    rows = [first] + [r.values() for r in rows]
+def convert_to_csv(data, convertor_function, transpose=False, stream=False):
+    rows = csv_rows(data, convertor_function)
+    if stream and not transpose:
+        # a transposed csv needs every row before it can write the first line, so it is always buffered
+        return iter_csv(rows)
 
     csvdata = StringIO()
     with csvx.Writer(csvdata) as csv_out:
@@ -32,6 +31,38 @@ def convert_to_csv(data, convertor_function, transpose=False):
         return csvdata.getvalue()
 
 
+def csv_rows(data, convertor_function):
+    """Yield the header row, then the values of `convertor_function(d)` for each `d` in `data`.
+
+    Rows are converted one at a time as `data` is consumed.
+    """
+    header = None
+    for d in data:
+        # each row is a dict representing a brief response
+        row = convertor_function(d)
+        if header is None:
+            # the keys of the first dict are used as headers
+            header = [f.replace('_', ' ').capitalize() if '_' in f else f for f in row.keys()]
+            yield header
+        yield row.values()
+    if header is None:
+        yield []
+
+
+def iter_csv(rows, chunk_size=500):
+    """Yield `rows`, an iterable of lists, as CSV text `chunk_size` rows at a time.
+
+    Only one chunk is held in memory, so `rows` can come straight from a DB cursor and the result can be
+    handed to a streamed Response.
+    """
+    rows = iter(rows)
+    for chunk in iter(lambda: list(islice(rows, chunk_size)), []):
+        csvdata = StringIO()
+        with csvx.Writer(csvdata) as csv_out:
+            csv_out.write_rows(chunk)
+        yield csvdata.getvalue()
+
+
 def format_criteria(criteria):
     result = []
     for i in criteria:
@@ -210,7 +241,7 @@ def generate_brief_responses_csv(brief, responses):
     return convert_to_csv(responses, row, True)
 
 
-def generate_seller_catalogue_csv(seller_catalogue):
+def generate_seller_catalogue_csv(seller_catalogue, stream=False):
     # converts a brief response into an ordered dict
     def row(r):
         empty_cell_value = 'N/A'
@@ -280,10 +311,10 @@ def generate_seller_catalogue_csv(seller_catalogue):
 
         return answers
 
-    return convert_to_csv(seller_catalogue, row)
+    return convert_to_csv(seller_catalogue, row, stream=stream)
 
 
-def generate_seller_responses_csv(seller_responses):
+def generate_seller_responses_csv(seller_responses, stream=False):
     # converts a brief response into an ordered dict
     def row(r):
         answers = od()
@@ -427,10 +458,10 @@ def generate_seller_responses_csv(seller_responses):
 
         return answers
 
-    return convert_to_csv(seller_responses, row)
+    return convert_to_csv(seller_responses, row, stream=stream)
 
 
-def generate_specialist_opportunities_csv(specialist_opportunities):
+def generate_specialist_opportunities_csv(specialist_opportunities, stream=False):
     # converts a brief response into an ordered dict
     def row(r):
         answers = od()
@@ -465,10 +496,10 @@ def generate_specialist_opportunities_csv(specialist_opportunities):
 
         return answers
 
-    return convert_to_csv(specialist_opportunities, row)
+    return convert_to_csv(specialist_opportunities, row, stream=stream)
 
 
-def generate_atm_opportunities_csv(atmOpportunities):
+def generate_atm_opportunities_csv(atmOpportunities, stream=False):
     # converts a brief response into an ordered dict
     def row(r):
         answers = od()
@@ -493,10 +524,10 @@ def generate_atm_opportunities_csv(atmOpportunities):
 
         return answers
 
-    return convert_to_csv(atmOpportunities, row)
+    return convert_to_csv(atmOpportunities, row, stream=stream)
 
 
-def generate_rfx_opportunities_csv(rfx_opportunities):
+def generate_rfx_opportunities_csv(rfx_opportunities, stream=False):
     # converts a brief response into an ordered dict
     def row(r):
         answers = od()
@@ -531,10 +562,10 @@ def generate_rfx_opportunities_csv(rfx_opportunities):
 
         return answers
 
-    return convert_to_csv(rfx_opportunities, row)
+    return convert_to_csv(rfx_opportunities, row, stream=stream)
 
 
-def generate_training_opportunities_csv(training_opportunities):
+def generate_training_opportunities_csv(training_opportunities, stream=False):
     # converts a brief response into an ordered dict
     def row(r):
         answers = od()
@@ -571,4 +602,4 @@ def generate_training_opportunities_csv(training_opportunities):
 
         return answers
 
-    return convert_to_csv(training_opportunities, row)
+    return convert_to_csv(training_opportunities, row, stream=stream)
@@ -7,7 +7,7 @@ import pendulum
 import requests
 import rollbar
 from flask import abort as flask_abort
-from flask import current_app, jsonify, make_response, render_template_string, request
+from flask import current_app, g, jsonify, make_response, render_template_string, request
 from flask_login import current_user, login_user
 from werkzeug.exceptions import HTTPException
 from sqlalchemy.exc import DBAPIError
@@ -21,19 +21,38 @@ from dmutils.email import (ONE_DAY_IN_SECONDS, EmailError,
                            parse_fernet_timestamp)
 
 
+def get_api_key_user_id():
+    """The id of the user owning the request's API key, or None if there is no key or it is not live.
+
+    The key is resolved once per request and remembered on `g`, alongside the key it was resolved for.
+    """
+    request_key = get_api_key_from_request(request)
+    if not request_key:
+        return None
+
+    resolved_key, user_id = g.get('api_key_user', (None, None))
+    if resolved_key != request_key:
+        from app.api.services import api_key_service
+        user_id = api_key_service.get_user_id(request_key)
+        g.api_key_user = (request_key, user_id)
+    return user_id
+
+
+def login_api_key_user(user_id):
+    from app.api import load_user
+    user = load_user(user_id)
+    login_user(user)
+    current_app.logger.info('login.api_key.success: {user}', extra={'user': user.name})
+
+
 def allow_api_key_auth(func):
     @wraps(func)
     def decorated_view(*args, **kwargs):
-        request_key = get_api_key_from_request(request)
-        if request_key:
-            from app.api import load_user
-            from app.api.services import api_key_service
-            key = api_key_service.get_key(request_key)
-            if not key:
+        if get_api_key_from_request(request):
+            user_id = get_api_key_user_id()
+            if not user_id:
                 return flask_abort(403, 'Invalid API key - revoked or non existent')
-            user = load_user(key.user_id)
-            login_user(user)
-            current_app.logger.info('login.api_key.success: {user}', extra={'user': key.user.name})
+            login_api_key_user(user_id)
         return func(*args, **kwargs)
     return decorated_view
 
@@ -41,16 +60,11 @@ def allow_api_key_auth(func):
 def require_api_key_auth(func):
     @wraps(func)
     def decorated_view(*args, **kwargs):
-        request_key = get_api_key_from_request(request)
-        if request_key:
-            from app.api import load_user
-            from app.api.services import api_key_service
-            key = api_key_service.get_key(request_key)
-            if not key:
+        if get_api_key_from_request(request):
+            user_id = get_api_key_user_id()
+            if not user_id:
                 return flask_abort(403, 'Invalid API key - revoked or non existent')
-            user = load_user(key.user_id)
-            login_user(user)
-            current_app.logger.info('login.api_key.success: {user}', extra={'user': key.user.name})
+            login_api_key_user(user_id)
             return func(*args, **kwargs)
         return flask_abort(403, 'Must authenticate using API key authentication')
     return decorated_view
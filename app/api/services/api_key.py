@@ -1,8 +1,20 @@
+from hashlib import sha256
+
+from flask import current_app, g
+
 from app.api.helpers import Service
+from app.cache import SharedCache
 from app.models import ApiKey, db
 from app.api.helpers import generate_random_token
 from datetime import datetime
 
+# user ids of live api keys, keyed by a hash of the key so the keys themselves never leave the database
+api_key_users = SharedCache('api_key_user:')
+
+
+def hash_key(key):
+    return sha256(key.encode('utf-8')).hexdigest()
+
 
 class ApiKeyService(Service):
     __model__ = ApiKey
@@ -23,6 +35,29 @@ class ApiKeyService(Service):
         )
         return query.first()
 
+    def get_user_id(self, key):
+        """The id of the user a live api key belongs to, or None.
+
+        Found keys are cached for API_KEY_CACHE_TTL seconds; revoke evicts them straight away.
+        """
+        ttl = current_app.config['API_KEY_CACHE_TTL']
+        user_id = api_key_users.get(hash_key(key)) if ttl else None
+        if user_id is None:
+            user_id = (
+                db
+                .session
+                .query(ApiKey.user_id)
+                .filter(
+                    ApiKey.key == key,
+                    ApiKey.revoked_at.is_(None)
+                )
+                .scalar()
+            )
+            if user_id is not None and ttl:
+                api_key_users.set(hash_key(key), user_id, ttl=ttl)
+
+        return user_id
+
     def generate(self, user_id, length=32):
         api_key = ApiKey(user_id=user_id, key=generate_random_token(length=length))
         self.save(api_key)
@@ -42,4 +77,7 @@ class ApiKeyService(Service):
         for key in keys:
             key.revoke()
             self.save(key)
+            api_key_users.delete(hash_key(key.key))
+            if g.get('api_key_user', (None,))[0] == key.key:
+                g.pop('api_key_user')
         return True
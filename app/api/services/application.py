@@ -1,6 +1,51 @@
+from datetime import date, timedelta
+
+import pendulum
 from sqlalchemy import func
 from app.api.helpers import Service
-from app.models import Application, db
+from app.models import Application, ApplicationHistoryMetric, db
+
+
+HISTORY_METRICS_START = date(2016, 11, 1)
+
+# For each day in [:since, :until] this counts, per type, the objects whose latest audit event before
+# that day has that type. Each event counts from the day after it happened until the day after the
+# object's next event, so one pass of lead() over audit_event gives every day's counts as running sums.
+HISTORY_METRICS_QUERY = '''
+  WITH events AS (SELECT type, created_at,
+                         lead(created_at) OVER (PARTITION BY object_id ORDER BY created_at, id) AS superseded_at
+                  FROM audit_event
+                  WHERE ((object_type = 'Application'
+                          AND object_id NOT IN (SELECT id FROM application WHERE status = 'deleted'))
+                         OR object_type = 'SupplierDomain')
+                  AND created_at < :until),
+  deltas AS (SELECT CAST(date_trunc('day', created_at) AS date) + 1 AS day, type, 1 AS delta FROM events
+             UNION ALL
+             SELECT CAST(date_trunc('day', superseded_at) AS date) + 1, type, -1 FROM events
+             WHERE superseded_at IS NOT NULL),
+  counts AS (SELECT CAST(days.day AS date) AS day, types.type,
+                    sum(coalesce(sum(deltas.delta), 0)) OVER (PARTITION BY types.type ORDER BY days.day) AS total_count
+             FROM generate_series((SELECT least(min(day), CAST(:since AS date)) FROM deltas),
+                                  CAST(:until AS date), interval '1 day') days (day)
+             CROSS JOIN (SELECT DISTINCT type FROM deltas) types
+             LEFT JOIN deltas ON deltas.day = days.day AND deltas.type = types.type
+             GROUP BY days.day, types.type),
+  app_metrics AS (SELECT day, type, total_count FROM counts WHERE day >= :since AND total_count > 0),
+  days AS (SELECT CAST(day AS date) AS day FROM generate_series(CAST(:since AS date), CAST(:until AS date),
+                                                               interval '1 day') day)
+  INSERT INTO application_history_metric (day, type, count)
+  SELECT day, type, total_count FROM app_metrics
+  UNION ALL
+  SELECT days.day, 'started_application', sum(total_count)
+    FROM days LEFT JOIN app_metrics ON app_metrics.day = days.day
+     AND type IN ('submit_application','approve_application','create_application','revert_application')
+    GROUP BY days.day
+  UNION ALL
+  SELECT days.day, 'completed_application', sum(total_count)
+    FROM days LEFT JOIN app_metrics ON app_metrics.day = days.day
+     AND type IN ('submit_application','approve_application','revert_application')
+    GROUP BY days.day
+'''
 
 
 class ApplicationService(Service):
@@ -20,6 +65,31 @@ class ApplicationService(Service):
 
         return [r for (r, ) in results]
 
+    def get_history_metrics(self):
+        return (
+            db
+            .session
+            .query(ApplicationHistoryMetric)
+            .order_by(ApplicationHistoryMetric.day, ApplicationHistoryMetric.type)
+            .all()
+        )
+
+    def update_history_metrics(self, until=None):
+        """Snapshot every finished day after the last one stored, up to and including `until` (today in UTC)."""
+        until = until or pendulum.now('UTC').date()
+        last_day = db.session.query(func.max(ApplicationHistoryMetric.day)).scalar()
+        since = last_day + timedelta(days=1) if last_day else HISTORY_METRICS_START
+
+        if since > until:
+            return 0
+
+        result = db.session.execute(HISTORY_METRICS_QUERY, {
+            'since': since.isoformat(),
+            'until': until.isoformat()
+        })
+        db.session.commit()
+        return result.rowcount
+
     def get_applications_by_abn(self, abn):
         return (
             db
@@ -1,4 +1,5 @@
-from sqlalchemy import desc, func
+from sqlalchemy import String, cast, desc, func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from app import db
 from app.api.helpers import Service
@@ -62,6 +63,26 @@ class BriefResponsesService(Service):
 
         return query.all()
 
+    def get_responses_fingerprints(self, brief_ids):
+        """Return a hash of the ids and update times of each brief's submitted responses, keyed by brief id.
+
+        It changes whenever a response is submitted, edited or withdrawn, which is when the brief's responses
+        archive needs rebuilding. Briefs without responses are left out.
+        """
+        response = cast(BriefResponse.id, String) + ':' + cast(BriefResponse.updated_at, String)
+        query = (
+            db.session.query(
+                BriefResponse.brief_id,
+                func.md5(func.string_agg(response, aggregate_order_by(',', BriefResponse.id))).label('fingerprint'))
+            .filter(
+                BriefResponse.brief_id.in_(brief_ids),
+                BriefResponse.withdrawn_at.is_(None),
+                BriefResponse.submitted_at.isnot(None)
+            )
+            .group_by(BriefResponse.brief_id)
+        )
+        return {r.brief_id: r.fingerprint for r in query.all()}
+
     def get_suppliers_responded(self, brief_id):
         query = (
             db.session.query(
@@ -1,5 +1,10 @@
+from itertools import chain
+from uuid import uuid4
+
 import pendulum
-from sqlalchemy import and_, case, desc, func, or_, union
+from flask import current_app
+from six import string_types
+from sqlalchemy import and_, case, func, inspect, or_, union
 from sqlalchemy.orm import joinedload, noload
 from sqlalchemy.sql.expression import case as sql_case
 from sqlalchemy.sql.functions import concat
@@ -7,39 +12,153 @@ from sqlalchemy.types import Integer, Numeric
 
 from app import db
 from app.api.helpers import Service
-from app.models import (AuditEvent, Brief, BriefAssessor,
+from app.cache import LRUCache, SharedCache, on_commit
+from app.datetime_utils import to_iso8601_string
+from app.models import (AuditEvent, Brief, BriefAccess, BriefAssessor,
                         BriefClarificationQuestion, BriefQuestion,
-                        BriefResponse, BriefUser, Framework, Lot, Supplier,
-                        Team, TeamBrief, TeamMember, User, WorkOrder)
+                        BriefResponse, BriefUser, Framework, KeyValue, Lot,
+                        Supplier, Team, TeamBrief, TeamMember, User,
+                        WorkOrder, utcnow)
 from dmutils.filters import timesince
 
 
+# the brief columns shown on the opportunities page, status included
+OPPORTUNITY_BRIEF_ATTRIBUTES = ('_published_at', 'closed_at', 'withdrawn_at', 'data', '_lot_id')
+# the response columns that decide whether it is counted in a brief's submissions
+OPPORTUNITY_RESPONSE_ATTRIBUTES = ('submitted_at', 'withdrawn_at')
+
+
+def _changes_opportunities(instance):
+    """Whether flushing `instance`, a Brief or BriefResponse, changes what get_opportunities returns.
+
+    Only briefs that are or were published and responses that are or were submitted are listed, so edits to
+    drafts leave the list alone.
+    """
+    state = inspect(instance)
+    if instance in state.session.deleted:
+        return True
+
+    if isinstance(instance, Brief):
+        listed, attributes = '_published_at', OPPORTUNITY_BRIEF_ATTRIBUTES
+    else:
+        listed, attributes = 'submitted_at', OPPORTUNITY_RESPONSE_ATTRIBUTES
+    if getattr(instance, listed) is None and not any(v is not None for v in state.attrs[listed].history.deleted):
+        return False
+    return any(state.attrs[a].history.has_changes() for a in attributes)
+
+
+opportunities_cache = LRUCache(maxsize=1)
+on_commit(lambda changes: opportunities_cache.clear() if any(changes) else None, Brief, BriefResponse,
+          key=_changes_opportunities)
+
+brief_counts_cache = SharedCache('brief_counts:')
+
+
+def _brief_count_viewers(instance):
+    """The ids of the buyers whose dashboard counts change with `instance`, or '*' for every buyer.
+
+    Brief changes and new brief owners only reach the brief's viewers in brief_access, which its triggers have
+    already brought up to date when this runs after the flush. Removing owners and team changes are rare, and
+    the viewers they took access from are gone by then, so they forget every buyer's counts.
+    """
+    state = inspect(instance)
+    if isinstance(instance, (Team, TeamMember)) or instance in state.session.deleted:
+        return '*'
+
+    brief_id = instance.id if isinstance(instance, Brief) else instance.brief_id
+    viewers = (
+        state.session
+        .query(BriefAccess.viewer_id)
+        .filter(BriefAccess.brief_id == brief_id)
+        .all()
+    )
+    return tuple(viewer_id for (viewer_id,) in viewers)
+
+
+def _forget_brief_counts(viewers):
+    if '*' in viewers:
+        brief_counts_cache.clear()
+        return
+    for user_id in set(chain.from_iterable(viewers)):
+        brief_counts_cache.delete(user_id)
+
+
+on_commit(_forget_brief_counts, Brief, BriefUser, Team, TeamBrief, TeamMember, key=_brief_count_viewers)
+
+
 class BriefsService(Service):
     __model__ = Brief
 
+    METRICS_KEY = 'brief_metrics'
+    OPEN_TO_METRICS = {
+        'allSellers': 'open_to_all',
+        'someSellers': 'open_to_selected',
+        'oneSellers': 'open_to_one'
+    }
+
     def __init__(self, *args, **kwargs):
         super(BriefsService, self).__init__(*args, **kwargs)
 
     def get_brief_counts(self, user_id):
+        """Number of briefs in each status that the user can see on the buyer dashboard.
+
+        Counts are shared between processes per user for BRIEF_COUNTS_CACHE_TTL seconds, but never past the
+        moment the next live brief closes, and forgotten when a change to one of the user's briefs or teams is
+        committed.
+        """
+        ttl = current_app.config['BRIEF_COUNTS_CACHE_TTL']
+        if not ttl:
+            return self._count_briefs(user_id)[0]
+
+        counts = brief_counts_cache.get(user_id)
+        if counts is None:
+            counts, next_closed_at = self._count_briefs(user_id)
+            if next_closed_at:
+                ttl = min(ttl, (next_closed_at - utcnow()).total_seconds())
+            # redis expiries are whole seconds, and a brief closing sooner than that isn't worth caching past
+            if ttl >= 1:
+                brief_counts_cache.set(user_id, counts, ttl=ttl)
+
+        return dict(counts)
+
+    def _count_briefs(self, user_id):
         accessible_briefs_subquery = self.accessible_briefs(user_id)
-        result = [r._asdict() for r in (
+        # status is a CASE expression with a bound timestamp, so it is grouped on from a subquery
+        # rather than repeated in the GROUP BY clause
+        brief_status_subquery = (
             db
             .session
             .query(
-                Brief.status
+                Brief.id.label('id'),
+                Brief.status.label('status'),
+                Brief.closed_at.label('closed_at')
             )
             .join(
                 accessible_briefs_subquery,
                 accessible_briefs_subquery.columns.brief_id == Brief.id
             )
+            .subquery()
+        )
+        rows = (
+            db
+            .session
+            .query(
+                brief_status_subquery.columns.status,
+                func.count(brief_status_subquery.columns.id.distinct()).label('count'),
+                func.min(brief_status_subquery.columns.closed_at).label('next_closed_at')
+            )
+            .group_by(brief_status_subquery.columns.status)
             .all()
-        )]
-        return {
-            'withdrawn': result.count({'status': 'withdrawn'}),
-            'draft': result.count({'status': 'draft'}),
-            'live': result.count({'status': 'live'}),
-            'closed': result.count({'status': 'closed'})
-        }
+        )
+
+        counts = {'withdrawn': 0, 'draft': 0, 'live': 0, 'closed': 0}
+        next_closed_at = None
+        for row in rows:
+            counts[row.status] = row.count
+            if row.status == 'live':
+                next_closed_at = row.next_closed_at
+
+        return counts, next_closed_at
 
     def get_buyer_dashboard_briefs(self, user_id, status):
         brief_response_subquery = (
@@ -148,16 +267,53 @@ class BriefsService(Service):
 
         return [r._asdict() for r in results]
 
-    def get_briefs_by_filters(self, status=None, open_to=None, brief_type=None, location=None):
-        status = status or []
-        open_to = open_to or []
-        brief_type = brief_type or []
-        location = location or []
-        status_filters = [x for x in status if x in ['live', 'closed']]
-        open_to_filters = [x for x in open_to if x in ['all', 'selected', 'one']]
-        brief_type_filters = [x for x in brief_type if x in ['outcomes', 'training', 'specialists', 'atm']]
-        location_filters = [x for x in location if x in ['ACT', 'NSW', 'NT', 'QLD', 'SA', 'TAS', 'VIC', 'WA', 'Remote']]
+    OPEN_TO_FILTERS = {
+        'all': 'allSellers',
+        'selected': 'someSellers',
+        'one': 'oneSeller'
+    }
+    LOCATION_FILTERS = {
+        'ACT': 'Australian Capital Territory',
+        'NSW': 'New South Wales',
+        'NT': 'Northern Territory',
+        'QLD': 'Queensland',
+        'SA': 'South Australia',
+        'TAS': 'Tasmania',
+        'VIC': 'Victoria',
+        'WA': 'Western Australia',
+        'Remote': 'Offsite'
+    }
+    BRIEF_TYPE_LOTS = {
+        'atm': ['atm'],
+        'outcomes': ['digital-outcome', 'rfx'],
+        'training': ['training', 'training2'],
+        'specialists': ['digital-professionals', 'specialist']
+    }
+    # historic prod brief ids we want to show when the training or atm filter is active
+    TRAINING_BRIEF_IDS = frozenset([105, 183, 205, 215, 217, 292, 313, 336, 358, 438, 477, 498, 535, 577, 593, 762,
+                                    864, 868, 886, 907, 933, 1029, 1136, 1164, 1310, 1443])
+    ATM_BRIEF_IDS = frozenset([136, 180, 207, 351, 383, 453, 485, 490, 548, 568, 633, 743, 819, 830, 862, 975, 1071,
+                               1147, 1176, 1238, 1239, 1260, 1263, 1268, 1413, 1476, 1620, 1646, 1935])
+
+    def get_opportunities(self):
+        """All published briefs for the opportunities page, newest first.
+
+        Returns a dict with the `briefs` and a `version` that changes whenever they are rebuilt (None when
+        caching is disabled). The list is cached per process for OPPORTUNITIES_CACHE_TTL seconds, so it is
+        shared between requests and must not be mutated. A commit that changes a listed brief or its submitted
+        responses only drops the cache of the process that made it, so other processes can lag by up to the TTL.
+        """
+        ttl = current_app.config['OPPORTUNITIES_CACHE_TTL']
+        if not ttl:
+            return {'version': None, 'briefs': self._load_opportunities()}
+
+        return opportunities_cache.get_or_set(
+            'opportunities',
+            lambda: {'version': uuid4().hex, 'briefs': self._load_opportunities()},
+            ttl=ttl
+        )
 
+    def _load_opportunities(self):
         query = (db.session
                    .query(Brief.id, Brief.data['title'].astext.label('name'), Brief.closed_at,
                           Brief.data['organisation'].astext.label('company'),
@@ -165,89 +321,74 @@ class BriefsService(Service):
                           Brief.data['sellerSelector'].astext.label('openTo'),
                           Brief.status,
                           func.count(BriefResponse.id).label('submissions'),
-                          Lot.slug.label('lot'))
+                          Lot.slug.label('lot'),
+                          Brief.data['areaOfExpertise'].astext.label('areaOfExpertise'))
                    .outerjoin(
                        BriefResponse,
                        and_(Brief.id == BriefResponse.brief_id,
                             BriefResponse.withdrawn_at.is_(None),
                             BriefResponse.submitted_at.isnot(None)))
                    .outerjoin(Lot)
-                   .group_by(Brief.id, Lot.id))
+                   .filter(Brief.published_at.isnot(None))
+                   .group_by(Brief.id, Lot.id)
+                   .order_by(Brief.published_at.desc()))
 
-        lots = db.session.query(Lot).all()
+        return [r._asdict() for r in query.all()]
+
+    def get_briefs_by_filters(self, status=None, open_to=None, brief_type=None, location=None, opportunities=None):
+        """Filter the opportunities list in memory.
+
+        `opportunities` is the result of get_opportunities(), which is fetched if not given.
+        """
+        status = status or []
+        open_to = open_to or []
+        brief_type = brief_type or []
+        location = location or []
+        status_filters = [x for x in status if x in ['live', 'closed']]
+        open_to_filters = [self.OPEN_TO_FILTERS[x] for x in open_to if x in self.OPEN_TO_FILTERS]
+        brief_type_filters = [x for x in brief_type if x in self.BRIEF_TYPE_LOTS]
+        location_filters = [self.LOCATION_FILTERS[x] for x in location if x in self.LOCATION_FILTERS]
 
         if 'closed' in status_filters:
             status_filters.append('withdrawn')
 
-        if status_filters:
-            cond = or_(*[Brief.status == x for x in status_filters])
-            query = query.filter(cond)
-
-        if open_to_filters:
-            switcher = {
-                'all': 'allSellers',
-                'selected': 'someSellers',
-                'one': 'oneSeller'
-            }
-            atm_lot = next(iter([x for x in lots if x.slug == 'atm']))
-            cond = or_(
-                and_(Brief._lot_id == atm_lot.id, Brief.data['sellerSelector'].astext == 'someSellers'),
-                *[Brief.data['sellerSelector'].astext == switcher.get(x) for x in open_to_filters]
-            )
-            query = query.filter(cond)
-
-        if location_filters:
-            switcher = {
-                'ACT': 'Australian Capital Territory',
-                'NSW': 'New South Wales',
-                'NT': 'Northern Territory',
-                'QLD': 'Queensland',
-                'SA': 'South Australia',
-                'TAS': 'Tasmania',
-                'VIC': 'Victoria',
-                'WA': 'Western Australia',
-                'Remote': 'Offsite'
-            }
-            cond = or_(*[Brief.data['location'].astext.contains(switcher.get(x)) for x in location_filters])
-            query = query.filter(cond)
-
-        if brief_type_filters:
-            switcher = {
-                'atm': [x.id for x in lots if x.slug == 'atm'],
-                'outcomes': [x.id for x in lots if x.slug in ['digital-outcome', 'rfx']],
-                'training': [x.id for x in lots if x.slug in ['training', 'training2']],
-                'specialists': [x.id for x in lots if x.slug in ['digital-professionals', 'specialist']]
-            }
-            lot_cond = or_(*[Brief._lot_id.in_(switcher.get(x)) for x in brief_type_filters])
+        lot_filters = set(lot for x in brief_type_filters for lot in self.BRIEF_TYPE_LOTS[x])
 
+        def matches_brief_type(brief):
+            if brief['lot'] in lot_filters:
+                return True
             if 'training' in brief_type_filters:
-                # this is a list of historic prod brief ids we want to show when the training filter is active
-                training_ids = [105, 183, 205, 215, 217, 292, 313, 336, 358, 438, 477, 498, 535, 577, 593, 762,
-                                864, 868, 886, 907, 933, 1029, 1136, 1164, 1310, 1443]
-                ids_cond = or_(Brief.id.in_(training_ids))
-
-                # we also want specialist briefs with a area of expertise of 'Training, Learning and Development'
-                aoe_cond = or_(Brief.data['areaOfExpertise'].astext == 'Training, Learning and Development')
-
-                cond = or_(lot_cond, ids_cond, aoe_cond)
-                query = query.filter(cond)
-            elif 'atm' in brief_type_filters:
-                # this is a list of historic prod brief ids we want to show when the atm filter is active
-                atm_ids = [136, 180, 207, 351, 383, 453, 485, 490, 548, 568, 633, 743, 819, 830, 862, 975, 1071,
-                           1147, 1176, 1238, 1239, 1260, 1263, 1268, 1413, 1476, 1620, 1646, 1935]
-                ids_cond = or_(Brief.id.in_(atm_ids))
-                cond = or_(lot_cond, ids_cond)
-                query = query.filter(cond)
-            else:
-                query = query.filter(lot_cond)
+                return (brief['id'] in self.TRAINING_BRIEF_IDS or
+                        brief['areaOfExpertise'] == 'Training, Learning and Development')
+            if 'atm' in brief_type_filters:
+                return brief['id'] in self.ATM_BRIEF_IDS
+            return False
+
+        def matches_location(brief):
+            values = brief['location'] if isinstance(brief['location'], list) else [brief['location']]
+            values = [v for v in values if isinstance(v, string_types)]
+            return any(name in v for name in location_filters for v in values)
+
+        if opportunities is None:
+            opportunities = self.get_opportunities()
+
+        results = []
+        for brief in opportunities['briefs']:
+            if status_filters and brief['status'] not in status_filters:
+                continue
+            if open_to_filters and not (
+                brief['openTo'] in open_to_filters or
+                (brief['lot'] == 'atm' and brief['openTo'] == 'someSellers')
+            ):
+                continue
+            if location_filters and not matches_location(brief):
+                continue
+            if brief_type_filters and not matches_brief_type(brief):
+                continue
+
+            results.append({k: v for k, v in brief.items() if k != 'areaOfExpertise'})
 
-        query = (query
-                 .filter(Brief.published_at.isnot(None))
-                 .order_by(Brief.published_at.desc()))
-
-        results = query.all()
-
-        return [r._asdict() for r in results]
+        return results
 
     def get_open_briefs_published_since(self, since=None):
         if not since:
@@ -274,36 +415,90 @@ class BriefsService(Service):
         return results
 
     def get_metrics(self):
-        brief_query = (
+        now = pendulum.now()
+        open_to = Brief.data['sellerSelector'].astext
+        metrics = (
             db
             .session
             .query(
-                Brief.id,
-                Brief.published_at
+                func.count(Brief.id).label('total'),
+                func.count(Brief.id).filter(and_(Brief.closed_at.isnot(None), Brief.closed_at > now)).label('live'),
+                func.count(Brief.id).filter(open_to == 'allSellers').label('open_to_all'),
+                func.count(Brief.id).filter(open_to == 'someSellers').label('open_to_selected'),
+                func.count(Brief.id).filter(open_to == 'oneSellers').label('open_to_one'),
+                func.max(Brief.published_at).label('most_recent_published_at')
             )
             .filter(
                 Brief.withdrawn_at.is_(None),
                 Brief.published_at.isnot(None)
             )
+            .one()
+        )._asdict()
+
+        # stored as is, the time since it is worked out when the metrics are read
+        most_recent_published_at = metrics['most_recent_published_at']
+        metrics['most_recent_published_at'] = (
+            to_iso8601_string(most_recent_published_at, extended=True) if most_recent_published_at else None
         )
-        most_recent_brief = (
-            brief_query
-            .order_by(
-                desc(
-                    Brief.published_at
-                )
+
+        return metrics
+
+    @staticmethod
+    def with_time_since(metrics):
+        """Return the `metrics` with `most_recent_published_at` replaced by the time since then, as of now."""
+        metrics = dict(metrics)
+        if 'most_recent_published_at' in metrics:
+            most_recent_published_at = metrics.pop('most_recent_published_at')
+            metrics['recent_brief_time_since'] = (
+                timesince(pendulum.parse(most_recent_published_at)) if most_recent_published_at else ''
             )
-            .first()
+        return metrics
+
+    def update_metrics(self, brief, event):
+        """Apply a brief's publish, close or withdraw to the stored brief metrics.
+
+        The counters are only adjusted once they have been materialised by the update_brief_metrics
+        task, which also corrects for briefs that close on their own as time passes.
+        """
+        key_value = (
+            db
+            .session
+            .query(KeyValue)
+            .filter(KeyValue.key == self.METRICS_KEY)
+            .with_for_update()
+            .one_or_none()
         )
+        if not key_value:
+            return None
+
+        now = pendulum.now()
+        is_live = brief.closed_at is not None and brief.closed_at > now
+        open_to_metric = self.OPEN_TO_METRICS.get(brief.data.get('sellerSelector'))
+
+        metrics = dict(key_value.data)
+        if event == 'published':
+            changes = ['total', open_to_metric] + (['live'] if is_live else [])
+            step = 1
+            metrics['most_recent_published_at'] = to_iso8601_string(brief.published_at, extended=True)
+            metrics.pop('recent_brief_time_since', None)
+        elif event == 'withdrawn':
+            changes = ['total', open_to_metric] + (['live'] if is_live else [])
+            step = -1
+        elif event == 'closed':
+            # closing early moves closed_at to now, so the brief was live until this change
+            changes = ['live']
+            step = -1
+        else:
+            raise ValueError('unknown brief metrics event: {}'.format(event))
+
+        for metric in changes:
+            if metric:
+                metrics[metric] = max(metrics.get(metric, 0) + step, 0)
 
-        return {
-            'total': brief_query.count(),
-            'live': brief_query.filter(Brief.closed_at.isnot(None), Brief.closed_at > pendulum.now()).count(),
-            'open_to_all': brief_query.filter(Brief.data['sellerSelector'].astext == 'allSellers').count(),
-            'open_to_selected': brief_query.filter(Brief.data['sellerSelector'].astext == 'someSellers').count(),
-            'open_to_one': brief_query.filter(Brief.data['sellerSelector'].astext == 'oneSellers').count(),
-            'recent_brief_time_since': (timesince(most_recent_brief.published_at)) if most_recent_brief else ''
-        }
+        key_value.data = metrics
+        db.session.commit()
+
+        return metrics
 
     def create_brief(self, user, team, framework, lot, data=None):
         if not data:
@@ -339,96 +534,31 @@ class BriefsService(Service):
         return brief
 
     def accessible_briefs(self, user_id):
-        team_member_subquery = (
+        return (
             db
             .session
             .query(
-                TeamMember.team_id
+                BriefAccess.brief_id.label('brief_id'),
+                BriefAccess.user_id.label('user_id')
             )
-            .join(Team)
-            .filter(TeamMember.user_id == user_id)
-            .filter(Team.status == 'completed')
+            .filter(BriefAccess.viewer_id == user_id)
             .subquery()
         )
-        team_member_result = (
+
+    def has_permission_to_brief(self, user_id, brief_id):
+        return (
             db
             .session
             .query(
-                TeamMember.team_id,
-                TeamMember.user_id
-            )
-            .join(team_member_subquery, team_member_subquery.columns.team_id == TeamMember.team_id)
-            .all()
-        )
-        team_ids = [tm.team_id for tm in team_member_result]
-        user_ids = [tm.user_id for tm in team_member_result]
-
-        if team_ids:
-            team_brief_query = (
-                db
-                .session
-                .query(
-                    TeamBrief.brief_id.label('brief_id'),
-                    TeamBrief.user_id.label('user_id')
-                )
-                .join(Team)
-                .filter(TeamBrief.team_id.in_(team_ids))
-                .filter(Team.status == 'completed')
-            )
-
-            brief_user_query = (
                 db
                 .session
-                .query(
-                    BriefUser.brief_id.label('brief_id'),
-                    BriefUser.user_id.label('user_id')
-                )
-                .filter(BriefUser.user_id.in_(user_ids))
+                .query(BriefAccess)
+                .filter(BriefAccess.viewer_id == user_id, BriefAccess.brief_id == brief_id)
+                .exists()
             )
-            query = union(team_brief_query, brief_user_query).alias('result')
-            return (
-                db
-                .session
-                .query(
-                    query.c.brief_id.label('brief_id'),
-                    query.c.user_id.label('user_id')
-                )
-                .subquery()
-            )
-
-        else:
-            query = (
-                db
-                .session
-                .query(
-                    BriefUser.brief_id.label('brief_id')
-                )
-                .filter(BriefUser.user_id == user_id)
-                .subquery()
-            )
-            return (
-                db
-                .session
-                .query(
-                    BriefUser.brief_id.label('brief_id'),
-                    BriefUser.user_id.label('user_id')
-                )
-                .filter(BriefUser.brief_id.in_(query))
-                .subquery()
-            )
-
-    def has_permission_to_brief(self, user_id, brief_id):
-        query = self.accessible_briefs(user_id)
-        result = (
-            db
-            .session
-            .query(query)
-            .filter(query.c.brief_id == brief_id)
-            .all()
+            .scalar()
         )
 
-        return True if len(result) > 0 else False
-
     def get_contact_for_team_brief(self, brief_id):
         team_brief = (db.session
                         .query(TeamBrief)
@@ -498,8 +628,12 @@ class BriefsService(Service):
         return None
 
     def get_all_user_seller_responses_within_date_range(self, current_user_id, start_date, end_date):
+        query = self.get_all_user_seller_responses_within_date_range_query(current_user_id, start_date, end_date)
+        return [r._asdict() for r in query.all()]
+
+    def get_all_user_seller_responses_within_date_range_query(self, current_user_id, start_date, end_date):
         subquery = self.accessible_briefs(current_user_id)
-        result = (
+        return (
             db
             .session
             .query(
@@ -540,16 +674,18 @@ class BriefsService(Service):
             .order_by(Brief.id)
         )
 
-        return [r._asdict() for r in result.all()]
-
     def get_oppportunities_for_download(self, current_user_id, start_date, end_date, lot_slugs):
+        query = self.get_oppportunities_for_download_query(current_user_id, start_date, end_date, lot_slugs)
+        return [r._asdict() for r in query.all()]
+
+    def get_oppportunities_for_download_query(self, current_user_id, start_date, end_date, lot_slugs):
         subquery = self.accessible_briefs(current_user_id)
         brief_subquery = (
             db
             .session
             .query(
                 Brief.id.label('brief_id'),
-                func.json_object_keys(Brief.data['sellers']).label('supplier_code')
+                func.jsonb_object_keys(Brief.data['sellers']).label('supplier_code')
             )
             .subquery()
         )
@@ -569,7 +705,7 @@ class BriefsService(Service):
             .group_by(brief_subquery.c.brief_id)
             .subquery()
         )
-        result = (
+        return (
             db
             .session
             .query(
@@ -613,11 +749,8 @@ class BriefsService(Service):
             .filter(Brief.created_at >= pendulum.parse(start_date, tz='Australia/Canberra'))
             .filter(Brief.created_at <= pendulum.parse(end_date, tz='Australia/Canberra'))
             .filter(Brief.published_at.isnot(None))
-            .all()
         )
 
-        return [r._asdict() for r in result]
-
     def close_opportunity_early(self, brief):
         now = pendulum.now('utc')
 
@@ -1,9 +1,8 @@
 from app.api.helpers import Service
 from app.models import Domain
 from app import db
-from sqlalchemy.orm import joinedload, raiseload, Load
-from six import string_types
-from sqlalchemy import func
+from dmutils.data_tools import ValidationError
+from sqlalchemy.orm import Load
 
 
 class DomainService(Service):
@@ -24,19 +23,11 @@ class DomainService(Service):
         return query.all()
 
     def get_by_name_or_id(self, name_or_id, show_legacy=True):
-        if isinstance(name_or_id, string_types):
-            query = self.filter(
-                func.lower(Domain.name) == func.lower(name_or_id)
-            )
-            if not show_legacy:
-                query = query.filter(Domain.name.notin_(self.legacy_domains))
-        else:
-            query = self.filter(Domain.id == name_or_id)
-            if not show_legacy:
-                query = query.filter(Domain.name.notin_(self.legacy_domains))
-        query.options(
-            Load(Domain).raiseload('*')
-        )
-        domain = query.one_or_none()
+        try:
+            domain = Domain.get_by_name_or_id(name_or_id)
+        except ValidationError:
+            return None
 
+        if not show_legacy and domain.name in self.legacy_domains:
+            return None
         return domain
@@ -1,5 +1,5 @@
 from app.api.helpers import Service
-from app.models import MasterAgreement
+from app.models import MasterAgreement, db
 
 
 class MasterAgreementService(Service):
@@ -7,3 +7,17 @@ class MasterAgreementService(Service):
 
     def __init__(self, *args, **kwargs):
         super(MasterAgreementService, self).__init__(*args, **kwargs)
+
+    def get_agreements(self):
+        return (
+            db
+            .session
+            .query(
+                MasterAgreement.id,
+                MasterAgreement.start_date,
+                MasterAgreement.end_date,
+                MasterAgreement.data
+            )
+            .order_by(MasterAgreement.start_date)
+            .all()
+        )
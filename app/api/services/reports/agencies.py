@@ -11,6 +11,9 @@ class AgenciesService(Service):
         super(AgenciesService, self).__init__(*args, **kwargs)
 
     def get_agencies(self):
+        return [r._asdict() for r in self.get_agencies_query()]
+
+    def get_agencies_query(self):
         subquery = (
             db
             .session
@@ -28,7 +31,7 @@ class AgenciesService(Service):
             .subquery()
         )
 
-        result = (
+        return (
             db
             .session
             .query(
@@ -44,6 +47,4 @@ class AgenciesService(Service):
             )
             .join(subquery, subquery.c.agency_id == Agency.id)
             .order_by(Agency.name)
-            .all()
         )
-        return [r._asdict() for r in result]
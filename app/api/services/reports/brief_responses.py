@@ -10,6 +10,9 @@ class BriefResponsesService(Service):
         super(BriefResponsesService, self).__init__(*args, **kwargs)
 
     def get_submitted_brief_responses(self):
+        return [r._asdict() for r in self.get_submitted_brief_responses_query()]
+
+    def get_submitted_brief_responses_query(self, updated_since=None):
         result = (
             db
             .session
@@ -25,7 +28,9 @@ class BriefResponsesService(Service):
             .filter(BriefResponse.withdrawn_at.is_(None))
             .filter(BriefResponse.submitted_at.isnot(None))
             .order_by(Brief.id)
-            .all()
         )
 
-        return [r._asdict() for r in result]
+        if updated_since:
+            result = result.filter(BriefResponse.updated_at > updated_since)
+
+        return result
@@ -13,6 +13,9 @@ class BriefsService(Service):
         super(BriefsService, self).__init__(*args, **kwargs)
 
     def get_published_briefs(self):
+        return [r._asdict() for r in self.get_published_briefs_query()]
+
+    def get_published_briefs_query(self, updated_since=None):
         team_brief_query = (
             db
             .session
@@ -56,7 +59,9 @@ class BriefsService(Service):
             .join(Lot)
             .filter(Brief.published_at.isnot(None))
             .order_by(Brief.id)
-            .all()
         )
 
-        return [r._asdict() for r in result]
+        if updated_since:
+            result = result.filter(Brief.updated_at > updated_since)
+
+        return result
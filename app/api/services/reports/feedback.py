@@ -11,6 +11,9 @@ class FeedbackService(Service):
         super(FeedbackService, self).__init__(*args, **kwargs)
 
     def get_all_feedback(self):
+        return [r._asdict() for r in self.get_all_feedback_query()]
+
+    def get_all_feedback_query(self, updated_since=None):
         result = (
             db
             .session
@@ -27,6 +30,10 @@ class FeedbackService(Service):
             )
             .filter(AuditEvent.type == 'feedback')
             .order_by(AuditEvent.id)
-            .all()
         )
-        return [r._asdict() for r in result]
+
+        if updated_since:
+            # feedback is never edited, so new events are the only changes
+            result = result.filter(AuditEvent.created_at > updated_since)
+
+        return result
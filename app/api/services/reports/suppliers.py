@@ -40,6 +40,9 @@ class SuppliersService(Service):
         return [dict(r) for r in result]
 
     def get_suppliers(self):
+        return [r._asdict() for r in self.get_suppliers_query()]
+
+    def get_suppliers_query(self, updated_since=None):
         subquery = (
             db
             .session
@@ -144,7 +147,9 @@ class SuppliersService(Service):
             .outerjoin(product_subquery, Supplier.code == product_subquery.columns.supplier_code)
             .outerjoin(address_subquery, Supplier.code == address_subquery.columns.supplier_code)
             .order_by(Supplier.code)
-            .all()
         )
 
-        return [r._asdict() for r in result]
+        if updated_since:
+            result = result.filter(Supplier.last_update_time > updated_since)
+
+        return result
@@ -1,8 +1,9 @@
+import re
 from datetime import datetime, timedelta
 
 import pytz
 from sqlalchemy import and_, case, func, literal, or_, select, union
-from sqlalchemy.orm import joinedload, noload, raiseload
+from sqlalchemy.orm import joinedload
 from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from app import db
@@ -61,34 +62,65 @@ class SuppliersService(Service):
             .all()
         )
 
-    def get_suppliers_by_name_keyword(
-        self, keyword, framework_slug=None, category=None, exclude=None, exclude_recruiters=False
+    def search_sellers_by_name(
+        self, keyword, framework_slug=None, category=None, exclude=None, exclude_recruiters=False,
+        assessed_only=False, limit=20
     ):
-        query = (db.session.query(Supplier)
-                 .filter(Supplier.name.ilike('%{}%'.format(keyword.encode('utf-8'))))
-                 .filter(Supplier.status != 'deleted')
-                 .options(
-                     joinedload(Supplier.frameworks),
-                     joinedload(Supplier.domains),
-                     joinedload(Supplier.prices),
-                     joinedload('domains.domain'),
-                     joinedload('prices.service_role'),
-                     joinedload('frameworks.framework'),
-                     noload('frameworks.framework.lots'),
-                     raiseload('*')))
+        """Return up to `limit` sellers whose name contains `keyword`, best matches first, for typeahead.
+
+        Each row has the seller's code, name and assessed_domain_ids. Names starting with `keyword` come first,
+        then the rest by trigram similarity. The match uses the ix_supplier_name_trgm index.
+        """
+        pattern = re.sub(r'([\\%_])', r'\\\1', keyword)
+        assessed_domain_ids = func.array_agg(SupplierDomain.domain_id).filter(SupplierDomain.status == 'assessed')
+        query = (
+            db
+            .session
+            .query(
+                Supplier.code,
+                Supplier.name,
+                func.coalesce(assessed_domain_ids, []).label('assessed_domain_ids')
+            )
+            .outerjoin(SupplierDomain, SupplierDomain.supplier_id == Supplier.id)
+            .filter(Supplier.name.ilike(u'%{}%'.format(pattern)))
+            .filter(Supplier.status != 'deleted')
+            .group_by(Supplier.id)
+        )
         if framework_slug:
-            query = query.outerjoin(SupplierFramework).outerjoin(Framework)
-            query = query.filter(Framework.slug == framework_slug)
+            query = query.filter(
+                db.session.query(SupplierFramework)
+                .join(Framework)
+                .filter(SupplierFramework.supplier_code == Supplier.code, Framework.slug == framework_slug)
+                .exists()
+            )
         if category:
-            query = query.outerjoin(SupplierDomain)
-            query = query.filter(SupplierDomain.domain_id == category).filter(SupplierDomain.status == 'assessed')
+            query = query.filter(
+                db.session.query(SupplierDomain)
+                .filter(
+                    SupplierDomain.supplier_id == Supplier.id,
+                    SupplierDomain.domain_id == category,
+                    SupplierDomain.status == 'assessed'
+                )
+                .exists()
+            )
         if exclude:
             query = query.filter(Supplier.code.notin_(exclude))
         if exclude_recruiters:
             query = query.filter(Supplier.data['recruiter'].astext != 'yes')
+        if assessed_only:
+            query = query.having(assessed_domain_ids.isnot(None))
 
-        query.order_by(Supplier.name.asc()).limit(20)
-        return query.all()
+        return (
+            query
+            .order_by(
+                Supplier.name.ilike(u'{}%'.format(pattern)).desc(),
+                func.similarity(Supplier.name, keyword).desc(),
+                Supplier.name.asc(),
+                Supplier.code.asc()
+            )
+            .limit(limit)
+            .all()
+        )
 
     def get_supplier_assessed_status(self, supplier_id, category):
         return (
@@ -346,12 +378,15 @@ class SuppliersService(Service):
         return self.save(supplier, do_commit)
 
     def get_approved_suppliers(self):
+        return [r._asdict() for r in self.get_approved_suppliers_query().all()]
+
+    def get_approved_suppliers_query(self):
         expanded_certifications = (
             db
             .session
             .query(
                 Supplier.id,
-                func.json_array_elements_text(Supplier.data['certifications']).label('certifications')
+                func.jsonb_array_elements_text(Supplier.data['certifications']).label('certifications')
             )
             .subquery()
         )
@@ -368,7 +403,7 @@ class SuppliersService(Service):
             .subquery()
         )
 
-        results = (
+        return (
             db
             .session
             .query(
@@ -414,7 +449,4 @@ class SuppliersService(Service):
             )
             .group_by(Supplier.id, Supplier.name, Supplier.abn, aggregated_certifications.c.certifications)
             .order_by(Supplier.name)
-            .all()
         )
-
-        return [r._asdict() for r in results]
@@ -615,6 +615,9 @@ def update_brief(brief_id):
             url=brief_url_external
         )
 
+        if previous_status != 'live':
+            briefs.update_metrics(brief, 'published')
+
     try:
         audit_service.log_audit_event(
             audit_type=AuditTypes.update_brief,
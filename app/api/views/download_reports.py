@@ -1,4 +1,4 @@
-from flask import Response, jsonify, request
+from flask import Response, jsonify, request, stream_with_context
 from flask_login import login_required, current_user
 
 from app.api import api
@@ -24,12 +24,14 @@ def download_reports():
     result = None
     report_file_name = None
 
-    report_file_name, result, csv_generator = get_result(current_user, report_type, start_date, end_date)
+    # the csv is written as rows come off the cursor instead of being built in memory first
+    stream = output_format != 'json'
+    report_file_name, result, csv_generator = get_result(current_user, report_type, start_date, end_date, stream)
 
     if output_format == 'json':
         return jsonify(result), 200
     else:
-        csv_data = csv_generator(result)
-        response = Response(csv_data, mimetype='text/csv')
+        csv_data = csv_generator(result, stream=True)
+        response = Response(stream_with_context(csv_data), mimetype='text/csv')
         response.headers['Content-Disposition'] = 'attachment; filename=' + report_file_name
         return response
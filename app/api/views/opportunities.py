@@ -1,5 +1,7 @@
+from hashlib import sha1
+
 from app.api import api
-from flask import request, jsonify
+from flask import request, jsonify, make_response
 from app.api.services import briefs
 
 
@@ -54,22 +56,46 @@ def get_opportunities():
           type: string
           required: false
           description: a comma separated list of filters
+        - name: If-None-Match
+          in: header
+          type: string
+          required: false
+          description: the ETag of a previous response
     responses:
         200:
             description: Data for the opportunities page
             schema:
                 $ref: '#/definitions/Opportunities'
+        304:
+            description: The opportunities have not changed since the given ETag
     """
     status_filters = request.args.get('statusFilters') or ''
     open_to_filters = request.args.get('openToFilters') or ''
     type_filters = request.args.get('typeFilters') or ''
     location_filters = request.args.get('locationFilters') or ''
 
+    listing = briefs.get_opportunities()
+    etag = None
+    if listing['version']:
+        etag = sha1('|'.join(
+            [listing['version'], status_filters, open_to_filters, type_filters, location_filters]
+        ).encode('utf-8')).hexdigest()
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+            response.set_etag(etag)
+            response.headers['Cache-control'] = 'no-cache'
+            return response
+
     opportunities = briefs.get_briefs_by_filters(
         status=status_filters.split(','),
         open_to=open_to_filters.split(','),
         brief_type=type_filters.split(','),
-        location=location_filters.split(',')
+        location=location_filters.split(','),
+        opportunities=listing
     )
 
-    return jsonify({'opportunities': opportunities})
+    response = jsonify({'opportunities': opportunities})
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-control'] = 'no-cache'
+    return response
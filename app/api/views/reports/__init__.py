@@ -2,3 +2,90 @@
 # The api's here should not be used by normal application code.
 # All api's should have the require_api_key_auth decorator and
 # the url should be prefixed with /reports
+import datetime
+import json
+from itertools import islice
+
+import pendulum
+from flask import Response, jsonify, request, stream_with_context
+
+from app.api.csv import iter_csv
+from app.api.helpers import abort
+from app.datetime_utils import utcnow
+from app.modelsbase import CustomEncoder
+
+REPORT_FORMATS = ('json', 'ndjson', 'csv')
+STREAM_BATCH_SIZE = 1000
+
+_encoder = CustomEncoder()
+
+
+def report_response(get_query, name, incremental=True):
+    """Respond with the rows of the report query returned by `get_query`.
+
+    `?format=json` (the default) returns the usual {'items': [...], 'total': n} document. `ndjson` and `csv`
+    stream the rows as they are fetched from a server-side cursor, so the report is never held in memory.
+
+    For `incremental` reports `?updated_since=<ISO 8601>` is passed on to `get_query` to limit the report to
+    rows changed after that time. The X-Updated-Until header holds the value to use on the next pull.
+    """
+    output_format = request.args.get('format', 'json')
+    if output_format not in REPORT_FORMATS:
+        abort('format must be one of {}'.format(', '.join(REPORT_FORMATS)))
+
+    kwargs = {}
+    updated_since = request.args.get('updated_since')
+    if updated_since:
+        if not incremental:
+            abort('updated_since is not supported by this report')
+        try:
+            kwargs['updated_since'] = pendulum.parse(updated_since)
+        except ValueError as e:
+            abort('Invalid updated_since: {}'.format(e))
+
+    # taken before the query runs, so rows changed while it streams are included in the next pull
+    updated_until = utcnow()
+    query = get_query(**kwargs)
+
+    if output_format == 'json':
+        result = [r._asdict() for r in query]
+        response = jsonify({
+            'items': result,
+            'total': len(result)
+        })
+    else:
+        rows = query.execution_options(stream_results=True).yield_per(STREAM_BATCH_SIZE)
+        if output_format == 'ndjson':
+            response = Response(stream_with_context(_ndjson(rows)), mimetype='application/x-ndjson')
+        else:
+            response = Response(stream_with_context(iter_csv(_csv_rows(rows))), mimetype='text/csv')
+            response.headers['Content-Disposition'] = 'attachment; filename={}.csv'.format(name)
+
+    # in UTC with a Z, so it can be copied into the next URL without encoding
+    response.headers['X-Updated-Until'] = updated_until.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    return response
+
+
+def _ndjson(rows):
+    rows = iter(rows)
+    for chunk in iter(lambda: list(islice(rows, STREAM_BATCH_SIZE)), []):
+        yield ''.join(json.dumps(r._asdict(), default=_encoder.default, sort_keys=True) + '\n' for r in chunk)
+
+
+def _csv_rows(rows):
+    header = None
+    for row in rows:
+        if header is None:
+            header = row.keys()
+            yield header
+        yield [_csv_value(v) for v in row]
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_encoder.default, sort_keys=True)
+    if isinstance(value, datetime.datetime):
+        return _encoder.default(value)
+    return value
@@ -1,6 +1,7 @@
 from flask import current_app, jsonify
 from app.api import api
 from app.api.helpers import require_api_key_auth
+from app.api.views.reports import report_response
 from app.api.services.reports import suppliers_service
 from itertools import groupby
 
@@ -31,8 +32,4 @@ def get_unassessed():
 @api.route('/reports/supplier/all', methods=['GET'])
 @require_api_key_auth
 def get_all_suppliers():
-    result = suppliers_service.get_suppliers()
-    return jsonify({
-        'items': result,
-        'total': len(result)
-    })
+    return report_response(suppliers_service.get_suppliers_query, 'suppliers')
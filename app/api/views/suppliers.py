@@ -6,7 +6,7 @@ from flask_login import login_required
 from app.api import api
 from app.api.business.errors import NotFoundError
 from app.api.helpers import is_current_supplier, role_required
-from app.api.services import briefs, domain_service, suppliers
+from app.api.services import briefs, suppliers
 from app.api.suppliers import get_supplier
 from app.utils import get_json_from_request
 
@@ -170,30 +170,16 @@ def get_suppliers():
     supplier_codes_to_exclude = [int(code) for code in exclude]
 
     if keyword:
-        results = suppliers.get_suppliers_by_name_keyword(
+        results = suppliers.search_sellers_by_name(
             keyword,
             framework_slug='digital-marketplace',
-            category=category,
+            category=int(category) if category else None,
             exclude=supplier_codes_to_exclude,
-            exclude_recruiters=exclude_recruiters
+            exclude_recruiters=exclude_recruiters,
+            assessed_only=not all_suppliers
         )
 
-        supplier_results = []
-        for result in results:
-            if all_suppliers:
-                supplier = {}
-                supplier['name'] = result.name
-                supplier['code'] = result.code
-                supplier_results.append(supplier)
-            elif len(result.assessed_domains) > 0:
-                if category:
-                    domain = domain_service.get_by_name_or_id(int(category))
-                    if not domain or domain.name not in result.assessed_domains:
-                        continue
-                supplier = {}
-                supplier['name'] = result.name
-                supplier['code'] = result.code
-                supplier_results.append(supplier)
+        supplier_results = [{'name': result.name, 'code': result.code} for result in results]
 
         return jsonify(sellers=supplier_results), 200
     else:
@@ -37,13 +37,30 @@ def run_maintain_seller_email_list():
     ---
     tags:
       - tasks
+    parameters:
+      - name: dry_run
+        in: query
+        type: string
+        required: false
+        description: True to return the addresses that would be added and removed without changing the list
+      - name: unsubscribe_missing
+        in: query
+        type: string
+        required: false
+        description: True to unsubscribe list members who are no longer sellers
     responses:
       200:
         type: string
         description: string
     """
-    res = sync_mailchimp_seller_list.delay()
-    return jsonify(res.id)
+    dry_run = True if request.args.get('dry_run') == 'True' else False
+    unsubscribe_missing = True if request.args.get('unsubscribe_missing') == 'True' else False
+
+    if dry_run is False:
+        res = sync_mailchimp_seller_list.delay(dry_run, unsubscribe_missing)
+        return jsonify(res.id)
+    else:
+        return jsonify(sync_mailchimp_seller_list(dry_run, unsubscribe_missing)), 200
 
 
 @api.route('/tasks/send-daily-seller-email', methods=['POST'])
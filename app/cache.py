@@ -0,0 +1,144 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+_MISSING = object()
+
+
+class LRUCache(object):
+    """A small thread-safe, process-local cache with least-recently-used eviction.
+
+    Entries optionally expire `ttl` seconds after they were stored. Values are shared between
+    requests, so callers must not mutate what they get back.
+    """
+
+    def __init__(self, maxsize=128, ttl=None, timer=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._timer():
+                del self._data[key]
+                return default
+            # re-insert to mark as most recently used
+            del self._data[key]
+            self._data[key] = entry
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = self._timer() + ttl if ttl is not None else None
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, factory, ttl=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, ttl=ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SharedCache(object):
+    """A cache shared by every process through the app's redis (see `create_app`).
+
+    Values are stored JSON encoded under `prefix`. Apps without redis, such as tests and local
+    development without REDIS_SESSIONS, get a process-local LRUCache instead.
+    """
+
+    def __init__(self, prefix, maxsize=1024):
+        self.prefix = prefix
+        self._local = LRUCache(maxsize)
+
+    @property
+    def _redis(self):
+        return current_app.extensions.get('redis')
+
+    def get(self, key, default=None):
+        if self._redis is None:
+            return self._local.get(key, default)
+        value = self._redis.get(self.prefix + str(key))
+        return default if value is None else json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        if self._redis is None:
+            return self._local.set(key, value, ttl=ttl)
+        self._redis.set(self.prefix + str(key), json.dumps(value), ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        if self._redis is None:
+            return self._local.delete(key)
+        self._redis.delete(self.prefix + str(key))
+
+    def clear(self):
+        if self._redis is None:
+            return self._local.clear()
+        for name in self._redis.scan_iter(match=self.prefix + '*'):
+            self._redis.delete(name)
+
+
+def on_commit(callback, *models, **kwargs):
+    """Call `callback(keys)` once a transaction that added, changed or deleted instances of `models` commits.
+
+    `keys` is the set of `key(instance)` for those instances, taken at flush time while they can still be
+    read. Without `key` it is just {None}.
+    """
+    key = kwargs.pop('key', lambda instance: None)
+    info_key = ('on_commit', callback)
+
+    def after_flush(session, flush_context):
+        keys = set(key(o) for o in chain(session.new, session.dirty, session.deleted) if isinstance(o, models))
+        if keys:
+            session.info.setdefault(info_key, set()).update(keys)
+
+    def after_commit(session):
+        keys = session.info.pop(info_key, None)
+        if keys:
+            callback(keys)
+
+    def after_rollback(session):
+        session.info.pop(info_key, None)
+
+    event.listen(Session, 'after_flush', after_flush)
+    event.listen(Session, 'after_commit', after_commit)
+    event.listen(Session, 'after_rollback', after_rollback)
+
+
+def clear_on_commit(cache, *models):
+    """Clear `cache` whenever a transaction that added, changed or deleted an instance of `models` commits.
+
+    This only reaches the current process; other processes see the change once their entries expire.
+    """
+    on_commit(lambda keys: cache.clear(), *models)
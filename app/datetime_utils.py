@@ -57,6 +57,66 @@ def is_textual(x):
     return isinstance(x, six.text_type) or isinstance(x, six.binary_type)
 
 
+ISO8601 = '%04d-%02d-%02dT%02d:%02d:%02d%s%02d:%02d'
+ISO8601_EXTENDED = '%04d-%02d-%02dT%02d:%02d:%02d.%06d%s%02d:%02d'
+
+
+def to_iso8601_string(dt, extended=False):
+    """`pendulum.instance(dt).to_iso8601_string(extended)`, formatted straight from the datetime.
+
+    Naive datetimes are taken to be UTC, as pendulum does.
+    """
+    offset = dt.utcoffset() or ZERO
+    minutes = offset.total_seconds() / 60
+    sign = '+' if minutes >= 0 else '-'
+    hour, minute = divmod(abs(int(minutes)), 60)
+
+    if extended:
+        return ISO8601_EXTENDED % (
+            dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.microsecond, sign, hour, minute)
+    return ISO8601 % (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, sign, hour, minute)
+
+
+class LazyPendulum(pendulum.Pendulum):
+    """A Pendulum loaded from a DateTime column, which puts off Pendulum's set up until something needs it.
+
+    Only the wall clock is kept when a row is loaded. The first use of anything that needs the timezone runs
+    Pendulum.__init__ as `pendulum.instance` would have, so from then on it is an ordinary Pendulum. The
+    offset is always zero, so `utcoffset` and `to_iso8601_string` never need the set up.
+    """
+
+    _DEFERRED = frozenset(['_tz', '_tzinfo', '_fold', '_timestamp', '_int_timestamp', '_datetime'])
+
+    @classmethod
+    def load(cls, value):
+        x = value
+        obj = cls.__new__(cls, x.year, x.month, x.day, x.hour, x.minute, x.second, x.microsecond)
+        obj.__dict__.update(
+            _year=x.year, _month=x.month, _day=x.day,
+            _hour=x.hour, _minute=x.minute, _second=x.second, _microsecond=x.microsecond,
+            # pendulum.instance gives naive values the UTC timezone and others a fixed offset, here always zero
+            _lazy_tz=pendulum.UTC if x.tzinfo is None else 0.0)
+        return obj
+
+    def __getattr__(self, name):
+        if name in self._DEFERRED and '_lazy_tz' in self.__dict__:
+            tz = self.__dict__.pop('_lazy_tz')
+            pendulum.Pendulum.__init__(
+                self, self._year, self._month, self._day,
+                self._hour, self._minute, self._second, self._microsecond,
+                tzinfo=tz)
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def utcoffset(self):
+        if '_lazy_tz' in self.__dict__:
+            return ZERO
+        return super(LazyPendulum, self).utcoffset()
+
+    def to_iso8601_string(self, extended=False):
+        return to_iso8601_string(self, extended)
+
+
 class DateTime(types.TypeDecorator):
     '''Modified datetime to incorporate pendulum.
     '''
@@ -72,13 +132,8 @@ class DateTime(types.TypeDecorator):
 
     def process_result_value(self, value, dialect):
         if value is not None:
-            result = pendulum.instance(value)
-
-            if value.tzinfo is not None:
-                # remove timezone from timezone-aware fields
-                offset_removed = vanilla(result)
-                result = pendulum.instance(offset_removed)
-            return result
+            # timezone-aware fields keep their wall clock and have the timezone removed
+            return LazyPendulum.load(value)
 
 
 def utcnow():
@@ -1,8 +1,6 @@
 from dmutils.data_tools import ValidationError
-from dmutils.filters import timesince
 from flask import jsonify, abort, current_app, request
-from sqlalchemy import desc
-from sqlalchemy.orm import joinedload, lazyload, noload
+from sqlalchemy.orm import joinedload, noload
 from sqlalchemy.exc import IntegrityError
 import pendulum
 from pendulum.parsing.exceptions import ParserError
@@ -10,6 +8,7 @@ from pendulum.parsing.exceptions import ParserError
 from app.api.services import (
     AuditTypes,
     briefs,
+    key_values_service,
     suppliers,
     users,
     team_service
@@ -475,26 +474,9 @@ def list_briefs():
 
 @main.route('/briefs/count', methods=['GET'])
 def get_briefs_stats():
-    # workaround as 'Brief.withdrawn_at == None' gives pep8 error
-    brief_query = Brief.query.options(lazyload('framework')).options(lazyload('lot'))\
-        .filter(Brief.withdrawn_at.is_(None), Brief.published_at.isnot(None))
-    all_briefs = brief_query.order_by(desc(Brief.published_at)).all()
+    metrics = key_values_service.get_by_key(briefs.METRICS_KEY)
 
-    briefs = {
-        'total': brief_query.count(),
-
-        'live': brief_query.filter(Brief.closed_at.isnot(None), Brief.closed_at > pendulum.now()).count(),
-
-        'open_to_all': brief_query.filter(Brief.data['sellerSelector'].astext == 'allSellers').count(),
-
-        'open_to_selected': brief_query.filter(Brief.data['sellerSelector'].astext == 'someSellers').count(),
-
-        'open_to_one': brief_query.filter(Brief.data['sellerSelector'].astext == 'oneSellers').count(),
-
-        'recent_brief_time_since': (timesince(all_briefs[0].published_at)) if all_briefs else ''
-    }
-
-    return jsonify(briefs=briefs)
+    return jsonify(briefs=briefs.with_time_since(metrics['data'] if metrics else briefs.get_metrics()))
 
 
 @main.route('/briefs/<int:brief_id>/status', methods=['PUT'])
@@ -595,6 +577,9 @@ def update_brief_status_by_action(brief_id, action):
             url=brief_url_external
         )
 
+        if action == 'publish' or previous_status in ('live', 'closed'):
+            briefs.update_metrics(brief, 'published' if action == 'publish' else 'withdrawn')
+
     return jsonify(briefs=brief.serialize()), 200
 
 
@@ -9,7 +9,7 @@ import io
 import csv
 from collections import defaultdict
 from flask import jsonify, make_response
-from app.api.services import key_values_service
+from app.api.services import application_service, briefs as briefs_service, key_values_service
 
 
 @main.route('/metrics', methods=['GET'])
@@ -25,7 +25,7 @@ def get_metrics():
     for kv in key_values:
         updated_at = kv['updated_at'].to_iso8601_string()
         if kv['key'] == 'brief_metrics':
-            for k, v in kv['data'].iteritems():
+            for k, v in briefs_service.with_time_since(kv['data']).iteritems():
                 metrics["briefs_" + k] = {"value": v, "ts": updated_at}
         elif kv['key'] == 'total_contracted':
             metrics['total_contracted'] = {"value": kv['data']['total'], "ts": updated_at}
@@ -155,28 +155,9 @@ def get_application_metrics():
 @main.route('/metrics/applications/history', methods=['GET'])
 def get_application_historical_metrics():
     metrics = defaultdict(list)
-    period = pendulum.period(pendulum.Pendulum(2016, 11, 1), pendulum.tomorrow())
-    for dt in period.range('days'):
-        date = dt.to_date_string()
-        timestamp = dt.to_iso8601_string()
-        query = '''
-  WITH app_metrics AS (SELECT type, count(*) total_count
-                FROM
-                  (SELECT DISTINCT ON (object_id) date_trunc('day', created_at) AS day, type, object_id FROM audit_event
-                  WHERE ((object_type = 'Application'
-                          AND object_id NOT IN (SELECT id FROM application WHERE status = 'deleted') )
-                          OR object_type = 'SupplierDomain')
-                  AND created_at < :date
-                  ORDER BY object_id, created_at DESC ) a
-                GROUP BY type)
-    SELECT * FROM app_metrics
-    UNION SELECT 'started_application', sum(total_count) FROM app_metrics
-      WHERE type IN ('submit_application','approve_application','create_application','revert_application')
-    UNION SELECT 'completed_application', sum(total_count) FROM app_metrics
-      WHERE type IN ('submit_application','approve_application','revert_application')
-                '''
-        for row in db.session.execute(query, {'date': date}).fetchall():
-            metrics[row['type'] + "_count"].append({"value": row["total_count"], "ts": timestamp})
+    for row in application_service.get_history_metrics():
+        timestamp = pendulum.Pendulum(row.day.year, row.day.month, row.day.day).to_iso8601_string()
+        metrics[row.type + "_count"].append({"value": row.count, "ts": timestamp})
 
     return jsonify(metrics)
 
@@ -5,7 +5,7 @@ from sqlalchemy.exc import IntegrityError, DataError
 from sqlalchemy.sql.expression import true
 from sqlalchemy.sql import cast
 from sqlalchemy import Boolean, select, column, or_
-from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.dialects.postgresql import ARRAY, array, aggregate_order_by
 from sqlalchemy.dialects import postgresql as postgres
 from sqlalchemy import String, literal
 from sqlalchemy.types import TEXT
@@ -31,8 +31,6 @@ from dmapiclient.audit import AuditTypes
 from dmutils.logging import notify_team
 from app.emails import send_assessment_approval_notification
 import json
-from itertools import groupby, chain
-from operator import itemgetter
 from app.api.business.validators import ApplicationValidator
 from app.tasks import publish_tasks
 
@@ -70,7 +68,13 @@ def list_suppliers():
                 Contact.email.ilike('%{}%'.format(prefix))
             ))
 
-    suppliers = suppliers.distinct(Supplier.name, Supplier.code)
+    suppliers = (
+        suppliers
+        .distinct(Supplier.name, Supplier.code)
+        # the order DISTINCT ON already gives, stated so the batch loads below see the same page
+        .order_by(Supplier.name, Supplier.code)
+        .options(*Supplier.serializer_options())
+    )
 
     try:
         if results_per_page > 0:
@@ -176,16 +180,6 @@ def product_search():
             tsquery = func.plainto_tsquery(search_term)
         else:
             tsquery = func.to_tsquery(search_term + ":*")
-        q = q.add_column(func.ts_headline(
-            'english',
-            Product.summary,
-            tsquery,
-            'MaxWords=150, MinWords=75, ShortWord=3, HighlightAll=FALSE, MaxFragments=1, FragmentDelimiter=" ... " '
-        ))
-    else:
-        q = q.add_column("''")
-    q = q.add_column(Supplier.name)
-    q = q.add_column(Supplier.data)
     q = q.group_by(Product.id, Supplier.id)
 
     if domains:
@@ -195,7 +189,7 @@ def product_search():
     if seller_types:
         selected_seller_types = select(
             [postgres.array_agg(column('key'))],
-            from_obj=func.json_each_text(Supplier.data[('seller_type',)]),
+            from_obj=func.jsonb_each_text(Supplier.data[('seller_type',)]),
             whereclause=cast(column('value'), Boolean)
         ).as_scalar()
 
@@ -207,36 +201,71 @@ def product_search():
         ob = [asc(Product.name)]
 
     if search_term:
-        ob = [desc(func.ts_rank_cd(func.to_tsvector(func.concat(Product.name,
-                                                                Product.summary, Supplier.name)), tsquery))] + ob
+        ob = [desc(func.ts_rank_cd(Product.text_vector, tsquery))] + ob
 
-        condition = func.to_tsvector(func.concat(Product.name, Product.summary, Supplier.name)) \
-            .op('@@')(tsquery)
-        q = q.filter(condition)
-    q = q.order_by(*ob)
+        q = q.filter(Product.text_vector.op('@@')(tsquery))
 
-    raw_results = list(q)
-    results = []
+    page = (
+        q
+        .with_entities(
+            Product.id.label('id'),
+            func.row_number().over(order_by=ob).label('position'),
+            func.count().over().label('total')
+        )
+        .order_by(*ob)
+        .offset(offset)
+        .limit(result_count)
+        .subquery()
+    )
 
-    for x in range(len(raw_results)):
-        result = raw_results[x][0].__dict__
-        result.pop('_sa_instance_state', None)
-        if raw_results[x][1] is not None and raw_results[x][1] != '':
-            result['summary'] = raw_results[x][1]
-        if raw_results[x][2] is not None:
-            result['supplierName'] = raw_results[x][2]
-        if raw_results[x][3] is not None:
-            result['seller_type'] = raw_results[x][3].get('seller_type')
-        results.append(result)
+    summary = Product.summary
+    if tsquery is not None:
+        summary = func.coalesce(func.nullif(func.ts_headline(
+            'english',
+            Product.summary,
+            tsquery,
+            'MaxWords=150, MinWords=75, ShortWord=3, HighlightAll=FALSE, MaxFragments=1, FragmentDelimiter=" ... " '
+        ), ''), Product.summary)
+
+    rows = (
+        db.session.query(
+            Product.id,
+            Product.name,
+            Product.pricing,
+            summary.label('summary'),
+            Product.support,
+            Product.website,
+            Product.supplier_code,
+            Supplier.name.label('supplierName'),
+            Supplier.data.isnot(None).label('has_data'),
+            Supplier.data['seller_type'].label('seller_type'),
+            page.c.total
+        )
+        .join(page, page.c.id == Product.id)
+        .join(Supplier, Supplier.code == Product.supplier_code)
+        .order_by(page.c.position)
+        .all()
+    )
 
-    total_results = len(results)
+    if rows:
+        total_results = rows[0].total
+    elif offset > 0:
+        total_results = q.with_entities(Product.id).count()
+    else:
+        total_results = 0
 
-    sliced_results = results[offset:(offset + result_count)]
+    results = []
+    for row in rows:
+        result = row._asdict()
+        if not result.pop('has_data'):
+            result.pop('seller_type')
+        result.pop('total')
+        results.append(result)
 
     result = {
         'hits': {
             'total': total_results,
-            'hits': [{'_source': r} for r in sliced_results]
+            'hits': [{'_source': r} for r in results]
         }
     }
 
@@ -291,7 +320,7 @@ def casestudies_search():
     if seller_types:
         selected_seller_types = select(
             [postgres.array_agg(column('key'))],
-            from_obj=func.json_each_text(Supplier.data[('seller_type',)]),
+            from_obj=func.jsonb_each_text(Supplier.data[('seller_type',)]),
             whereclause=cast(column('value'), Boolean)
         ).as_scalar()
 
@@ -407,18 +436,6 @@ def do_search(search_query, offset, result_count, new_domains, framework_slug):
             tsquery = func.plainto_tsquery(search_term)
         else:
             tsquery = func.to_tsquery(search_term + ":*")
-        q = q.add_column(func.ts_headline(
-            'english',
-            func.concat(Supplier.summary,
-                         ' ',
-                         Supplier.data['tools'].astext,
-                         ' ',
-                         Supplier.data['methodologies'].astext,
-                         ' ',
-                         Supplier.data['technologies'].astext, ''),
-            tsquery,
-            'MaxWords=25, MinWords=20, ShortWord=3, HighlightAll=FALSE, MaxFragments=1'
-        ))
 
     q = q.group_by(Supplier.id)
 
@@ -447,7 +464,7 @@ def do_search(search_query, offset, result_count, new_domains, framework_slug):
     if seller_types_list is not None:
         selected_seller_types = select(
             [postgres.array_agg(column('key'))],
-            from_obj=func.json_each_text(Supplier.data[('seller_type',)]),
+            from_obj=func.jsonb_each_text(Supplier.data[('seller_type',)]),
             whereclause=cast(column('value'), Boolean)
         ).as_scalar()
 
@@ -471,50 +488,74 @@ def do_search(search_query, offset, result_count, new_domains, framework_slug):
 
     q = q.order_by(*ob)
 
-    raw_results = list(q)
-    results = []
-
-    for x in range(len(raw_results)):
-        if type(raw_results[x]) is Supplier:
-            result = raw_results[x]
-        else:
-            result = raw_results[x][0]
-            if raw_results[x][1] is not None and raw_results[x][1] != '':
-                result.summary = raw_results[x][1]
-        results.append(result)
-
-    sliced_results = results[offset:(offset + result_count)]
+    # only the requested page of supplier ids leaves the database; the window count
+    # gives the total number of matches in the same round trip
+    page = (
+        q
+        .with_entities(Supplier.id.label('id'), func.count().over().label('total'))
+        .offset(offset)
+        .limit(result_count)
+        .subquery()
+    )
 
-    q = db.session.query(Supplier.code, Supplier.name, Supplier.summary, Supplier.is_recruiter,
-                         Supplier.data, Domain.name.label('domain_name'),
-                         SupplierDomain.status.label('domain_status'))\
-        .outerjoin(SupplierDomain, Domain)\
-        .filter(Supplier.id.in_([sr.id for sr in sliced_results]))\
+    summary = Supplier.summary
+    if tsquery is not None:
+        summary = func.coalesce(func.nullif(func.ts_headline(
+            'english',
+            func.concat(Supplier.summary,
+                        ' ',
+                        Supplier.data['tools'].astext,
+                        ' ',
+                        Supplier.data['methodologies'].astext,
+                        ' ',
+                        Supplier.data['technologies'].astext, ''),
+            tsquery,
+            'MaxWords=25, MinWords=20, ShortWord=3, HighlightAll=FALSE, MaxFragments=1'
+        ), ''), Supplier.summary)
+
+    rows = (
+        db.session.query(
+            Supplier.code,
+            Supplier.name,
+            summary.label('summary'),
+            Supplier.is_recruiter,
+            Supplier.data['seller_type'].label('seller_type'),
+            _supplier_domain_names(SupplierDomain.status == 'assessed').label('assessed'),
+            _supplier_domain_names(SupplierDomain.status != 'assessed').label('unassessed'),
+            page.c.total
+        )
+        .join(page, page.c.id == Supplier.id)
         .order_by(Supplier.name)
+        .all()
+    )
 
-    suppliers = [r._asdict() for r in q]
+    if rows:
+        total = rows[0].total
+    elif offset > 0:
+        total = q.with_entities(Supplier.id).order_by(None).count()
+    else:
+        total = 0
 
     sliced_results = []
-    for key, group in groupby(suppliers, key=itemgetter('code')):
-        supplier = group.next()
-
-        supplier['seller_type'] = supplier.get('data') and supplier['data'].get('seller_type')
-
-        supplier['domains'] = {'assessed': [], 'unassessed': []}
-        for s in chain([supplier], group):
-            domain, status = s['domain_name'], s['domain_status']
-            if domain:
-                if status == 'assessed':
-                    supplier['domains']['assessed'].append(domain)
-                else:
-                    supplier['domains']['unassessed'].append(domain)
+    for row in rows:
+        supplier = row._asdict()
+        supplier['domains'] = {
+            'assessed': supplier.pop('assessed') or [],
+            'unassessed': supplier.pop('unassessed') or []
+        }
+        supplier.pop('total')
+        sliced_results.append(supplier)
 
-        for e in ['domain_name', 'domain_status', 'data']:
-            supplier.pop(e, None)
+    return sliced_results, total
 
-        sliced_results.append(supplier)
 
-    return sliced_results, len(results)
+def _supplier_domain_names(*criteria):
+    return (
+        select([postgres.array_agg(aggregate_order_by(Domain.name, Domain.name))])
+        .where(and_(SupplierDomain.supplier_id == Supplier.id, SupplierDomain.domain_id == Domain.id, *criteria))
+        .correlate(Supplier)
+        .as_scalar()
+    )
 
 
 @main.route('/suppliers/search', methods=['GET'])
@@ -1,9 +1,11 @@
+import json
 from datetime import datetime
+from itertools import chain, islice
 from dmapiclient.audit import AuditTypes
-from sqlalchemy import func
+from sqlalchemy import String, case, cast, func, or_
 from sqlalchemy.orm import lazyload, noload, joinedload, raiseload
 from sqlalchemy.exc import IntegrityError, DataError
-from flask import jsonify, abort, request, current_app
+from flask import Response, jsonify, abort, request, current_app, stream_with_context
 
 from app import db, encryption
 from app.main import main
@@ -20,6 +22,7 @@ from app.validation import validate_user_json_or_400, validate_user_auth_json_or
 from app.emails.users import (
     send_existing_seller_notification, send_existing_application_notification,
 )
+from app.api.csv import iter_csv
 from app.api.business import (
     supplier_business,
     team_business
@@ -428,8 +431,25 @@ def update_user(user_id):
         abort(400, "Could not update user with: {0}".format(user_update))
 
 
+USERS_EXPORT_FORMATS = ('json', 'csv')
+USERS_EXPORT_FIELDS = [
+    'user_email', 'user_name', 'supplier_code', 'declaration_status', 'application_status', 'framework_agreement',
+    'application_result'
+]
+USERS_EXPORT_BATCH_SIZE = 1000
+
+
 @main.route('/users/export/<framework_slug>', methods=['GET'])
 def export_users_for_framework(framework_slug):
+    """Export the active users of every supplier on the framework, one row per user.
+
+    The rows come from a single query, with each supplier's submitted drafts counted in a grouped subquery,
+    and are streamed from a server-side cursor. `?format=csv` streams them as CSV rather than the default
+    {"users": [...]} document.
+    """
+    output_format = request.args.get('format', 'json')
+    if output_format not in USERS_EXPORT_FORMATS:
+        abort(400, 'format must be one of {}'.format(', '.join(USERS_EXPORT_FORMATS)))
 
     # 400 if framework slug is invalid
     framework = Framework.query.filter(Framework.slug == framework_slug).first()
@@ -439,61 +459,103 @@ def export_users_for_framework(framework_slug):
     if framework.status == 'coming':
         abort(400, 'framework not yet open')
 
-    supplier_frameworks_and_suppliers_and_users = db.session.query(
-        SupplierFramework, Supplier, User
+    rows = (
+        _framework_users_query(framework)
+        .execution_options(stream_results=True)
+        .yield_per(USERS_EXPORT_BATCH_SIZE)
+    )
+    users = (_framework_user_row(framework, row) for row in rows)
+
+    if output_format == 'csv':
+        csv_rows = chain([USERS_EXPORT_FIELDS], ([user[f] for f in USERS_EXPORT_FIELDS] for user in users))
+        response = Response(stream_with_context(iter_csv(csv_rows)), mimetype='text/csv')
+        response.headers['Content-Disposition'] = 'attachment; filename=users-{}.csv'.format(framework_slug)
+        return response
+
+    return Response(stream_with_context(_users_json(users)), mimetype='application/json')
+
+
+def _framework_users_query(framework):
+    declaration_status = case([
+        (or_(
+            SupplierFramework.declaration.is_(None),
+            cast(SupplierFramework.declaration, String).in_(['null', '{}'])
+        ), 'unstarted')
+    ], else_=SupplierFramework.declaration['status'].astext)
+
+    query = db.session.query(
+        User.email_address,
+        User.name,
+        SupplierFramework.supplier_code,
+        declaration_status.label('declaration_status'),
+        SupplierFramework.on_framework,
+        SupplierFramework.agreement_returned_at.isnot(None).label('framework_agreement')
+    ).select_from(
+        SupplierFramework
     ).join(
-        Supplier, User, Framework
-    ).filter(
-        Framework.slug == framework_slug
+        User, User.supplier_code == SupplierFramework.supplier_code
     ).filter(
+        SupplierFramework.framework_id == framework.id,
         User.active.is_(True)
-    ).all()
-
-    submitted_draft_counts_per_supplier = {}
-    user_rows = []
-
-    for sf, s, u in supplier_frameworks_and_suppliers_and_users:
-
-        # always get the declaration status
-        declaration_status = sf.declaration.get('status') if sf.declaration else 'unstarted'
-        application_status = ''
-        application_result = ''
-        framework_agreement = ''
-
-        # if framework is pending, live, or expired
-        if framework.status != 'open':
-
-            # get number of completed draft services per supplier
-            # `application_status` is based on a complete declaration and at least one completed draft service
-            if sf.supplier_code not in submitted_draft_counts_per_supplier.keys():
-                submitted_draft_counts_per_supplier[sf.supplier_code] = db.session.query(
-                    func.count()
-                ).filter(
-                    DraftService.supplier_code == sf.supplier_code,
-                    DraftService.framework_id == sf.framework_id,
-                    DraftService.status == 'submitted'
-                ).scalar()
-
-            submitted_draft_count = submitted_draft_counts_per_supplier[sf.supplier_code]
-            application_status = \
-                'application' if submitted_draft_count and declaration_status == 'complete' else 'no_application'
-            if sf.on_framework is None:
-                application_result = 'no result'
-            else:
-                application_result = 'pass' if sf.on_framework else 'fail'
-            framework_agreement = bool(sf.agreement_returned_at)
-
-        user_rows.append({
-            'user_email': u.email_address,
-            'user_name': u.name,
-            'supplier_code': s.code,
-            'declaration_status': declaration_status,
-            'application_status': application_status,
-            'framework_agreement': framework_agreement,
-            'application_result': application_result
-        })
-
-    return jsonify(users=[user for user in user_rows])
+    ).order_by(
+        SupplierFramework.supplier_code, User.id
+    )
+
+    # the application columns are only reported once the framework has closed
+    if framework.status != 'open':
+        submitted_drafts = db.session.query(
+            DraftService.supplier_code, func.count().label('count')
+        ).filter(
+            DraftService.framework_id == framework.id,
+            DraftService.status == 'submitted'
+        ).group_by(
+            DraftService.supplier_code
+        ).subquery('submitted_drafts')
+
+        query = query.outerjoin(
+            submitted_drafts, submitted_drafts.c.supplier_code == SupplierFramework.supplier_code
+        ).add_columns(
+            func.coalesce(submitted_drafts.c.count, 0).label('submitted_draft_count')
+        )
+
+    return query
+
+
+def _framework_user_row(framework, row):
+    application_status = ''
+    application_result = ''
+    framework_agreement = ''
+
+    # if framework is pending, live, or expired
+    if framework.status != 'open':
+        # `application_status` is based on a complete declaration and at least one completed draft service
+        application_status = \
+            'application' if row.submitted_draft_count and row.declaration_status == 'complete' else 'no_application'
+        if row.on_framework is None:
+            application_result = 'no result'
+        else:
+            application_result = 'pass' if row.on_framework else 'fail'
+        framework_agreement = row.framework_agreement
+
+    return {
+        'user_email': row.email_address,
+        'user_name': row.name,
+        'supplier_code': row.supplier_code,
+        'declaration_status': row.declaration_status,
+        'application_status': application_status,
+        'framework_agreement': framework_agreement,
+        'application_result': application_result
+    }
+
+
+def _users_json(users):
+    yield '{"users": ['
+    users = iter(users)
+    separator = ''
+    for chunk in iter(lambda: list(islice(users, USERS_EXPORT_BATCH_SIZE)), []):
+        yield separator + ', '.join(json.dumps(user, sort_keys=True) for user in chunk)
+        separator = ', '
+    yield ']}'
 
 
 def invite_response(db_results):
@@ -16,13 +16,14 @@ from six import string_types, text_type, binary_type
 
 from sqlalchemy import text
 from sqlalchemy import asc, desc, func, and_
-from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.dialects.postgresql import JSON, JSONB, TSVECTOR
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.ext.hybrid import hybrid_property, hybrid_method
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.ext.associationproxy import association_proxy
-from sqlalchemy.orm import validates, relationship, column_property, noload
+from sqlalchemy.orm import validates, relationship, deferred, make_transient_to_detached
 from sqlalchemy.orm.session import Session
+from sqlalchemy.orm.util import identity_key
 from sqlalchemy.sql.expression import case as sql_case
 from sqlalchemy.sql.expression import cast as sql_cast
 from sqlalchemy.types import String, Date, Integer, Interval
@@ -32,6 +33,7 @@ from dmutils.data_tools import ValidationError, normalise_acn, parse_money
 from dmapiclient.audit import AuditTypes
 
 from . import db
+from .cache import LRUCache, clear_on_commit
 
 from app.utils import (
     link, url_for, strip_whitespace_from_data, drop_foreign_fields, purge_nulls_from_data, filter_fields,
@@ -521,6 +523,7 @@ class MasterAgreement(db.Model):
 class SignedAgreement(db.Model):
     __tablename__ = 'signed_agreement'
     master_agreement = db.relationship('MasterAgreement', single_parent=True)
+    user = db.relationship('User')
     agreement_id = db.Column(
         db.Integer,
         db.ForeignKey('master_agreement.id'),
@@ -655,6 +658,10 @@ class Supplier(db.Model):
         'applications',
         'brief_responses',
         'text_vector']
+    # used by serializable_after
+    SERIALIZATION_LOADS = [
+        'signed_agreements.master_agreement',
+        'signed_agreements.user']
 
     DUMMY_ABN = '50 110 219 460'
 
@@ -709,7 +716,7 @@ class Supplier(db.Model):
         nullable=False
     )
     is_recruiter = db.Column(db.String, nullable=False, default=False, server_default=text('false'))
-    data = db.Column(MutableDict.as_mutable(JSON), default=dict)
+    data = db.Column(MutableDict.as_mutable(JSONB), default=dict)
 
     # TODO: migrate these to plain (non-timezone) fields
     creation_time = db.Column(DateTime(timezone=True),
@@ -725,11 +732,13 @@ class Supplier(db.Model):
     domains = relationship("SupplierDomain", back_populates="supplier")
     signed_agreements = db.relationship('SignedAgreement', single_parent=True, order_by="SignedAgreement.agreement_id")
     frameworks = relationship("SupplierFramework")
-    text_vector = column_property(func.setweight(func.to_tsvector(func.coalesce(name, '')), 'A').op('||')(
-        func.setweight(func.to_tsvector(func.coalesce(summary, '')), 'B')).op('||')(
-        func.setweight(func.to_tsvector(func.concat(summary, data['tools'].astext,
-                                                    data['methodologies'].astext,
-                                                    data['technologies'].astext, '')), 'C'))
+    # maintained by the supplier_text_vector_update trigger (see DB/migration/setup-post.sql)
+    text_vector = deferred(db.Column(TSVECTOR, nullable=True))
+
+    __table_args__ = (
+        db.Index('ix_supplier_text_vector', 'text_vector', postgresql_using='gin'),
+        # trigram index for the seller name typeahead's substring matches and similarity ranking
+        db.Index('ix_supplier_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
     )
 
     def add_unassessed_domain(self, name_or_id):
@@ -913,25 +922,21 @@ class Supplier(db.Model):
         if 'case_studies' in j:
             j['case_studies'] = [normalize_key_case(c) for c in j['case_studies']]
 
-        signed_agreements = []
-        for v in j['signed_agreements']:
-            signed_agreements.append(self.serialize_signed_agreement(v))
-
-        j['signed_agreements'] = signed_agreements
+        j['signed_agreements'] = [self.serialize_signed_agreement(a) for a in self.signed_agreements]
 
         return j
 
     def serialize_signed_agreement(self, signed_agreement):
-        agreement = MasterAgreement.query.get(signed_agreement['agreement_id'])
-        user = User.query.get(signed_agreement['user_id'])
+        agreement = signed_agreement.master_agreement
+        user = signed_agreement.user
 
         return {
             'agreement': agreement.serialize() if agreement else None,
             'htmlUrl': agreement.data['htmlUrl'] if 'htmlUrl' in agreement.data else None,
             'pdfUrl': agreement.data['pdfUrl'] if 'pdfUrl' in agreement.data else None,
-            'applicationId': signed_agreement['application_id'],
-            'signedAt': signed_agreement['signed_at'],
-            'supplierCode': signed_agreement['supplier_code'],
+            'applicationId': signed_agreement.application_id,
+            'signedAt': signed_agreement.signed_at,
+            'supplierCode': signed_agreement.supplier_code,
             'user': {
                 'id': user.id,
                 'emailAddress': user.email_address,
@@ -1072,23 +1077,55 @@ class Domain(db.Model):
     price_maximum = db.Column(db.Numeric, nullable=False)
     criteria_needed = db.Column(db.Numeric, nullable=False)
 
-    suppliers = relationship("SupplierDomain", back_populates="domain", lazy='joined')
+    suppliers = relationship("SupplierDomain", back_populates="domain")
     criteria = relationship("DomainCriteria", back_populates="domain")
     assoc_suppliers = association_proxy('suppliers', 'supplier')
 
+    @staticmethod
+    def registry(refresh=False):
+        """The columns of every domain, keyed by id and by case-folded name.
+
+        Shared by the process for DOMAIN_CACHE_TTL seconds and dropped when a domain is committed.
+        """
+        def load():
+            ids, names = {}, {}
+            columns = [Domain.id, Domain.name, Domain.ordering, Domain.price_minimum, Domain.price_maximum,
+                       Domain.criteria_needed]
+            for row in db.session.query(*columns):
+                ids[row.id] = names[row.name.lower()] = row._asdict()
+            return {'ids': ids, 'names': names}
+
+        ttl = current_app.config['DOMAIN_CACHE_TTL']
+        if not ttl:
+            return load()
+        if refresh:
+            domain_registry.clear()
+        return domain_registry.get_or_set('domains', load, ttl=ttl)
+
     @staticmethod
     def get_by_name_or_id(name_or_id):
+        """The domain with this id or (case insensitive) name, attached to the current session.
+
+        Looked up in the registry, so a domain already in the session costs no query and any other is
+        merged in without loading it. Its relationships load lazily when used.
+        """
         if isinstance(name_or_id, six.string_types):
-            d = Domain.query.filter(
-                func.lower(Domain.name) == func.lower(name_or_id)
-            ).options(
-                noload('suppliers')
-            ).first()
+            key = 'names', name_or_id.lower()
         else:
-            d = Domain.query.filter_by(id=name_or_id).first()
+            key = 'ids', name_or_id
 
-        if not d:
+        columns = Domain.registry()[key[0]].get(key[1])
+        if columns is None:
+            # it may have been added by another process since the registry was loaded
+            columns = Domain.registry(refresh=True)[key[0]].get(key[1])
+        if columns is None:
             raise ValidationError('cannot find domain: {}'.format(name_or_id))
+
+        d = db.session.identity_map.get(identity_key(Domain, columns['id']))
+        if d is None:
+            d = Domain(**columns)
+            make_transient_to_detached(d)
+            d = db.session.merge(d, load=False)
         return d
 
     def serialize(self):
@@ -1103,6 +1140,10 @@ class Domain(db.Model):
         return serialized
 
 
+domain_registry = LRUCache(maxsize=1)
+clear_on_commit(domain_registry, Domain)
+
+
 class DomainCriteria(db.Model):
     __tablename__ = 'domain_criteria'
     id = db.Column(db.Integer, primary_key=True)
@@ -1259,6 +1300,13 @@ class Product(db.Model):
 
     supplier_code = db.Column(db.BigInteger, db.ForeignKey('supplier.code'), nullable=False)
 
+    # maintained by the product_text_vector_update trigger (see DB/migration/setup-post.sql)
+    text_vector = deferred(db.Column(TSVECTOR, nullable=True))
+
+    __table_args__ = (
+        db.Index('ix_product_text_vector', 'text_vector', postgresql_using='gin'),
+    )
+
     @staticmethod
     def get_by_name_or_id(name_or_id):
         if isinstance(name_or_id, six.string_types):
@@ -1983,6 +2031,17 @@ class KeyValue(db.Model):
         self.data = data
 
 
+class ApplicationHistoryMetric(db.Model):
+    """How many applications and supplier domains had each audit event type as their latest event
+    at the start of `day`. Rows are added once a day has finished, see ApplicationService.
+    """
+    __tablename__ = 'application_history_metric'
+
+    day = db.Column(Date, primary_key=True)
+    type = db.Column(db.String, primary_key=True)
+    count = db.Column(db.BigInteger, nullable=True)
+
+
 class Brief(db.Model):
     __tablename__ = 'brief'
 
@@ -1997,7 +2056,7 @@ class Brief(db.Model):
 
     domain_id = db.Column(db.Integer, db.ForeignKey('domain.id'), nullable=True)
 
-    data = db.Column(MutableDict.as_mutable(JSON))
+    data = db.Column(MutableDict.as_mutable(JSONB))
     created_at = db.Column(DateTime, index=True, nullable=False,
                            default=utcnow)
     updated_at = db.Column(DateTime, index=True, nullable=False,
@@ -2007,6 +2066,8 @@ class Brief(db.Model):
     questions_closed_at = db.Column(DateTime, index=True, nullable=True)
     withdrawn_at = db.Column(DateTime, index=True, nullable=True)
     responses_zip_filesize = db.Column(db.BigInteger, nullable=True)
+    # the attachments in the responses archive and the fingerprint of the responses it was built from
+    responses_zip_manifest = db.Column(JSONB, nullable=True)
 
     __table_args__ = (db.ForeignKeyConstraint([framework_id, _lot_id],
                                               ['framework_lot.framework_id', 'framework_lot.lot_id']),
@@ -2062,15 +2123,23 @@ class Brief(db.Model):
                 questions_closed_at,
                 t, DEADLINES_TZ_NAME).in_tz('UTC')
         else:
-            self.closed_at = combine_date_and_time(
-                self.published_day + parse_interval(self.requirements_length),
-                t, DEADLINES_TZ_NAME).in_tz('UTC')
-            self.questions_closed_at = combine_date_and_time(
-                workday(self.published_day, self.questions_duration_workdays),
-                t, DEADLINES_TZ_NAME).in_tz('UTC')
+            self.closed_at, self.questions_closed_at, _ = self.deadlines(self.published_day)
 
-    @property
-    def dates_for_serialization(self):
+    def deadlines(self, published_day):
+        """The closing time, questions closing time and answers deadline if this brief is published on
+        `published_day`, worked out once per day, requirements length and questions duration.
+        """
+        key = (
+            published_day,
+            self.requirements_length,
+            self.questions_duration_workdays,
+            current_app.config['DEADLINES_TIME_OF_DAY'],
+            current_app.config['DEADLINES_TZ_NAME']
+        )
+        return brief_deadlines.get_or_set(key, lambda: _brief_deadlines(*key))
+
+    @staticmethod
+    def _dates_for_serialization(published_day, closed_at, questions_closed_at, answers_close, requirements_length):
         def as_s(x):
             if x:
                 return str(x)
@@ -2080,22 +2149,32 @@ class Brief(db.Model):
 
         dates = {}
 
-        dates['published_date'] = self.published_day
-        dates['closing_date'] = self.closed_at.date() if self.closed_at else None
-        dates['questions_close'] = self.questions_closed_at
-        dates['questions_closing_date'] = self.questions_closed_at.date() if self.questions_closed_at else None
-        dates['answers_close'] = self.clarification_questions_published_by
-        dates['application_open_weeks'] = self.requirements_length
-        dates['closing_time'] = self.closed_at
+        dates['published_date'] = published_day
+        dates['closing_date'] = closed_at.date() if closed_at else None
+        dates['questions_close'] = questions_closed_at
+        dates['questions_closing_date'] = questions_closed_at.date() if questions_closed_at else None
+        dates['answers_close'] = answers_close
+        dates['application_open_weeks'] = requirements_length
+        dates['closing_time'] = closed_at
+
+        return stringified(dates)
 
-        dates = stringified(dates)
+    @property
+    def dates_for_serialization(self):
+        dates = self._dates_for_serialization(
+            self.published_day,
+            self.closed_at,
+            self.questions_closed_at,
+            self.clarification_questions_published_by,
+            self.requirements_length
+        )
 
         if not self.published_at:
-            self.publish()
-            dates['hypothetical'] = self.dates_for_serialization
-            self.published_at = None
-            self.closed_at = None
-            self.questions_closed_at = None
+            # the dates it would have if it was published now, without publishing it
+            published_day = pendulum.now(current_app.config['DEADLINES_TZ_NAME']).date()
+            closed_at, questions_closed_at, answers_close = self.deadlines(published_day)
+            dates['hypothetical'] = self._dates_for_serialization(
+                published_day, closed_at, questions_closed_at, answers_close, self.requirements_length)
 
         return dates
 
@@ -2405,6 +2484,25 @@ class Brief(db.Model):
         return data
 
 
+def _brief_deadlines(published_day, requirements_length, questions_duration_workdays, time_of_day, tz_name):
+    t = parse_time_of_day(time_of_day)
+
+    closed_at = combine_date_and_time(
+        published_day + parse_interval(requirements_length),
+        t, tz_name).in_tz('UTC')
+    questions_closed_at = combine_date_and_time(
+        workday(published_day, questions_duration_workdays),
+        t, tz_name).in_tz('UTC')
+    answers_close = combine_date_and_time(
+        workday(closed_at, -1),
+        t, tz_name).in_tz('UTC')
+
+    return closed_at, questions_closed_at, answers_close
+
+
+brief_deadlines = LRUCache(maxsize=1024)
+
+
 class BriefHistory(db.Model):
     __tablename__ = 'brief_history'
 
@@ -2422,6 +2520,19 @@ class BriefUser(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
 
 
+class BriefAccess(db.Model):
+    """The briefs, and their owners, that each buyer can see.
+
+    Rows are written only by the triggers in setup-post.sql, which follow brief_user, team, team_brief
+    and team_member.
+    """
+    __tablename__ = 'brief_access'
+
+    viewer_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='cascade'), primary_key=True)
+    brief_id = db.Column(db.Integer, db.ForeignKey('brief.id', ondelete='cascade'), primary_key=True, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='cascade'), primary_key=True)
+
+
 class BriefResponseDownload(db.Model):
     __tablename__ = 'brief_response_download'
 
@@ -3351,6 +3462,18 @@ db.Index(
     AuditEvent.acknowledged,
 )
 
+# Expression indexes for the brief.data keys that /opportunities and the brief
+# metrics filter on. brief.data is jsonb so extracting them doesn't reparse the
+# whole document per row.
+db.Index(
+    'ix_brief_data_seller_selector',
+    Brief.data['sellerSelector'].astext,
+)
+db.Index(
+    'ix_brief_data_area_of_expertise',
+    Brief.data['areaOfExpertise'].astext,
+)
+
 
 def filter_null_value_fields(obj):
     return dict(
@@ -9,7 +9,6 @@ from collections import OrderedDict
 
 from sqlalchemy.orm.exc import UnmappedClassError
 
-import pendulum
 import datetime
 
 import json
@@ -18,6 +17,8 @@ from flask import url_for, request
 from werkzeug.routing import BuildError
 import six
 
+from sqlalchemy.orm import subqueryload, undefer
+from sqlalchemy.orm.properties import ColumnProperty
 from sqlalchemy.orm.relationships import RelationshipProperty
 
 from collections import Mapping
@@ -30,6 +31,8 @@ from collections import Iterable
 
 from dmutils.data_tools import ValidationError
 
+from .datetime_utils import to_iso8601_string
+
 
 def normalize_key_case(d):
     if not isinstance(d, Mapping):
@@ -48,7 +51,7 @@ class CustomEncoder(json.JSONEncoder):
         if hasattr(obj, 'serializable'):
             return obj.serializable
         if isinstance(obj, datetime.datetime):
-            return pendulum.instance(obj).to_iso8601_string(extended=True)
+            return to_iso8601_string(obj, extended=True)
         if isinstance(obj, decimal.Decimal):
             return str(obj)
         return super(CustomEncoder, self).default(obj)
@@ -63,34 +66,172 @@ def to_snake(s):
         r'([A-Z])', lambda m: "_" + m.group(0).lower(), s[1:]))
 
 
-def identity_link(name, id):
-    def pluralize(word):
-        if word == 'case_study':
-            word = 'case_studies'
-        elif word == 'address':
-            word = 'addresses'
-        elif not word.endswith('s'):
-            return '{}s'.format(word)
-        return word.replace('_', '-')
+def pluralize(word):
+    if word == 'case_study':
+        word = 'case_studies'
+    elif word == 'address':
+        word = 'addresses'
+    elif not word.endswith('s'):
+        return '{}s'.format(word)
+    return word.replace('_', '-')
 
-    if id is None:
-        raise ValueError
 
+def url_root():
     try:
-        url_root = request.url_root
+        return request.url_root
     except RuntimeError:
-        url_root = '/'
+        return '/'
+
+
+def identity_link(name, id):
+    if id is None:
+        raise ValueError
 
-    return url_root + '{}/{}'.format(pluralize(name), id)
+    return url_root() + '{}/{}'.format(pluralize(name), id)
 
 
 DEFAULT_REPR_FIELDS = ['id', 'name', 'slug']
 
 
+# how many relationships deep ModelSerializer.loader_options batch loads, anything further loads lazily
+SERIALIZER_LOAD_DEPTH = 3
+
+
 class ExcludedException(Exception):
     pass
 
 
+def _defines(cls, name):
+    return any(name in vars(c) for c in cls.__mro__)
+
+
+class ModelSerializer(object):
+    """The serialized form of a model class, worked out once from its mapper.
+
+    `serialize` produces what `MyModel._serializable` always has: the `data` column merged with every other
+    column, the serialized relationships (less EXCLUDE_FOR_SERIALIZATION) and `links` to itself and to
+    related rows, then `serializable_after`. `loader_options` are the query options that batch load what
+    that touches, plus the paths the model lists in SERIALIZATION_LOADS for its `serializable_after`.
+    """
+
+    def __init__(self, cls):
+        mapper = sqlalchemy.orm.class_mapper(cls)
+        excluded = getattr(cls, 'EXCLUDE_FOR_SERIALIZATION', [])
+
+        self.cls = cls
+        self.name = to_snake(cls.__name__)
+        self.link = pluralize(self.name)
+        self.has_id = _defines(cls, 'id')
+        self.fields = [k for k in get_fields(cls) if k != 'data']
+        self.deferred = [
+            p.key for p in mapper.iterate_properties if isinstance(p, ColumnProperty) and p.deferred
+        ]
+        self.relationships = []
+        for prop in mapper.iterate_properties:
+            if not isinstance(prop, RelationshipProperty):
+                continue
+            fk = next((a for a in ['{}_id'.format(prop.key), '{}_code'.format(prop.key)] if _defines(cls, a)), None)
+            self.relationships.append((prop, prop.key not in excluded, fk, pluralize(prop.key)))
+        self.also_loads = list(getattr(cls, 'SERIALIZATION_LOADS', []))
+        self._loader_options = None
+
+    @staticmethod
+    def of(cls):
+        serializer = cls.__dict__.get('_model_serializer')
+        if serializer is None:
+            serializer = cls._model_serializer = ModelSerializer(cls)
+        return serializer
+
+    def serialize(self, obj, exclude=(), only=None, root=None):
+        if self.name in exclude:
+            raise ExcludedException()
+
+        if only is not None and self.name not in only:
+            raise ExcludedException()
+
+        exclude = tuple(exclude) + (self.name,)
+        root = url_root() if root is None else root
+
+        try:
+            data = obj.data.copy()
+        except AttributeError:
+            data = {}
+
+        for k in self.fields:
+            data[k] = getattr(obj, k)
+
+        data['links'] = links = {}
+
+        if not self.has_id:
+            # return early as this is likely a many-to-many
+            return data
+
+        if obj.id is not None:
+            links['self'] = root + '{}/{}'.format(self.link, obj.id)
+
+        for prop, serialized, fk, link in self.relationships:
+            if serialized:
+                try:
+                    data[prop.key] = self._serialize_related(getattr(obj, prop.key), exclude, only, root)
+                except ExcludedException:
+                    pass
+
+            if fk is not None:
+                fk_id = getattr(obj, fk)
+                if fk_id is not None:
+                    links[prop.key] = root + '{}/{}'.format(link, fk_id)
+
+        if 'created_at' in data:
+            data['createdAt'] = data['created_at']
+
+        return obj.serializable_after(data)
+
+    @staticmethod
+    def _serialize_related(x, exclude, only, root):
+        if x is None:
+            return None
+        elif not isinstance(x, string_types) and isinstance(x, Iterable):
+            return [ModelSerializer.of(type(_)).serialize(_, exclude, only, root) for _ in x]
+        else:
+            return ModelSerializer.of(type(x)).serialize(x, exclude, only, root)
+
+    def loader_options(self):
+        """Options for a query of this model that load its serialized relationships in a query per path.
+
+        Relationships that are already eagerly joined keep their strategy, as do many-to-ones back to a model
+        being serialized further up, which come from the identity map.
+        """
+        if self._loader_options is None:
+            self._loader_options = list(self._options('', (self.name,), 0))
+        return self._loader_options
+
+    def _options(self, prefix, exclude, depth):
+        for key in self.deferred:
+            yield undefer(prefix + key)
+
+        if not self.has_id or depth == SERIALIZER_LOAD_DEPTH:
+            return
+
+        for prop, serialized, fk, link in self.relationships:
+            if not serialized:
+                continue
+
+            target = ModelSerializer.of(prop.mapper.class_)
+            path = prefix + prop.key
+            recurse = target.name not in exclude
+
+            if not recurse and not prop.uselist:
+                continue
+            if prop.lazy not in ('joined', False):
+                yield subqueryload(path)
+            if recurse:
+                for option in target._options(path + '.', exclude + (target.name,), depth + 1):
+                    yield option
+
+        for path in self.also_loads:
+            yield subqueryload(prefix + path)
+
+
 @six.python_2_unicode_compatible
 class MyModel(Model):
     def __str__(self):
@@ -249,80 +390,12 @@ class MyModel(Model):
         return self._serializable(only=[self._name])
 
     def _serializable(self, exclude=None, only=None, recurse=0):
-        exclude = exclude or []
-        exclude = list(exclude)
-
-        if self._name in exclude:
-            raise ExcludedException()
+        return ModelSerializer.of(type(self)).serialize(self, exclude or (), only)
 
-        if only is not None and self._name not in only:
-            raise ExcludedException()
-
-        exclude.append(self._name)
-
-        try:
-            data = self.data.copy()
-        except AttributeError:
-            data = {}
-
-        data.update({k: v for k, v in self._fieldsdict.items() if k != 'data'})
-
-        data['links'] = {}
-
-        try:
-            self.id
-        except AttributeError:
-            # return early as this is likely a many-to-many
-            return data
-
-        if self.id is not None:
-            data['links']['self'] = identity_link(self._name, self.id)
-
-        def get_related(x):
-            if x is None:
-                return None
-            elif not isinstance(x, string_types) and isinstance(x, Iterable):
-                return [_._serializable(exclude=exclude, only=only, recurse=recurse + 1) for _ in x]
-            else:
-                return x._serializable(exclude=exclude, only=only, recurse=recurse + 1)
-
-        if len(exclude) != len(set(exclude)):
-            print('duplicates in exclude!')
-            raise ValueError
-
-        for r in self._relationships:
-            no_serialize = False
-            try:
-                if r in self.EXCLUDE_FOR_SERIALIZATION:
-                    no_serialize = True
-            except AttributeError:
-                pass
-
-            if not no_serialize:
-                try:
-                    data[r] = get_related(getattr(self, r))
-                except ExcludedException:
-                    pass
-
-            fk_attr = '{}_id'.format(r)
-            alternate_fk_id = '{}_code'.format(r)
-
-            try:
-                fk_id = getattr(self, fk_attr)
-            except AttributeError:
-                try:
-                    fk_id = getattr(self, alternate_fk_id)
-                except AttributeError:
-                    continue
-
-            if fk_id is not None:
-                data['links'][r] = identity_link(r, fk_id)
-
-        if 'created_at' in data:
-            data['createdAt'] = data['created_at']
-
-        data = self.serializable_after(data)
-        return data
+    @classmethod
+    def serializer_options(cls):
+        """Query options that batch load everything `serializable` uses, see ModelSerializer.loader_options."""
+        return ModelSerializer.of(cls).loader_options()
 
     def serializable_after(self, data):
         return data
@@ -0,0 +1,7 @@
+from app.api.services import application_service
+from . import celery
+
+
+@celery.task
+def update_application_history_metrics():
+    application_service.update_history_metrics()
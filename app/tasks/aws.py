@@ -0,0 +1,85 @@
+from __future__ import absolute_import, unicode_literals
+
+import os
+import threading
+from os import getenv
+
+import boto3
+import botocore.exceptions
+from flask import current_app
+
+# error codes that mean the credentials a client was built with are no longer valid
+EXPIRED_CREDENTIAL_CODES = frozenset([
+    'ExpiredToken',
+    'ExpiredTokenException',
+    'InvalidClientTokenId',
+    'RequestExpired',
+    'SignatureDoesNotMatch'
+])
+
+ENDPOINT_URLS = {
+    'ses': 'AWS_SES_URL',
+    's3': 'AWS_S3_URL'
+}
+
+_lock = threading.Lock()
+_clients = {}
+_stats = {}
+
+
+def get_client(service_name):
+    """Return this worker process's boto3 client for `service_name`, creating it on first use.
+
+    Clients are keyed by process id, so each forked worker builds its own after the fork and then
+    reuses it, and its HTTP connection pool, for every task it runs.
+    """
+    key = (os.getpid(), service_name)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = boto3.session.Session().client(
+                service_name,
+                region_name=getenv('AWS_REGION'),
+                aws_access_key_id=getenv('AWS_ACCESS_KEY_ID'),
+                aws_secret_access_key=getenv('AWS_SECRET_ACCESS_KEY'),
+                endpoint_url=getenv(ENDPOINT_URLS[service_name])
+            )
+            stats = _stats.setdefault(key, {'created': 0, 'uses': 0})
+            stats['created'] += 1
+            current_app.logger.info('Created {service} client: pid={pid}, created={created}',
+                                    extra={'service': service_name, 'pid': key[0], 'created': stats['created']})
+        _stats[key]['uses'] += 1
+    return client
+
+
+def discard_client(service_name):
+    """Forget this process's client so the next get_client builds one with fresh credentials."""
+    with _lock:
+        _clients.pop((os.getpid(), service_name), None)
+
+
+def has_expired_credentials(error):
+    return (isinstance(error, botocore.exceptions.ClientError) and
+            error.response.get('Error', {}).get('Code') in EXPIRED_CREDENTIAL_CODES)
+
+
+def call_with_client(service_name, method_name, **kwargs):
+    """Call `method_name` on the shared client, rebuilding it once if its credentials have expired.
+
+    A `Fileobj` argument is rewound before the retry; transfers always start from position 0.
+    """
+    try:
+        return getattr(get_client(service_name), method_name)(**kwargs)
+    except botocore.exceptions.ClientError as e:
+        if not has_expired_credentials(e):
+            raise
+        discard_client(service_name)
+        if 'Fileobj' in kwargs:
+            kwargs['Fileobj'].seek(0)
+        return getattr(get_client(service_name), method_name)(**kwargs)
+
+
+def client_stats(service_name):
+    """How many times this process has created and handed out its client for `service_name`."""
+    with _lock:
+        return dict(_stats.get((os.getpid(), service_name), {'created': 0, 'uses': 0}))
@@ -3,6 +3,7 @@ from flask import current_app
 from sqlalchemy import or_
 from app import db
 from app.api.services import (
+    brief_responses_service,
     briefs,
     key_values_service
 )
@@ -48,8 +49,7 @@ def create_responses_zip_for_closed_briefs():
             Lot
         )
         .filter(
-            Brief.status == 'closed',
-            Brief.responses_zip_filesize.is_(None), (
+            Brief.status == 'closed', (
                 or_(
                     Lot.slug == 'digital-professionals',
                     Lot.slug == 'training',
@@ -65,7 +65,14 @@ def create_responses_zip_for_closed_briefs():
         .all()
     )
 
+    # only briefs whose responses changed since their archive was built are rebuilt
+    fingerprints = brief_responses_service.get_responses_fingerprints([b.id for b in closed_briefs])
     for brief in closed_briefs:
+        if brief.id not in fingerprints:
+            continue
+        manifest = brief.responses_zip_manifest or {}
+        if brief.responses_zip_filesize and manifest.get('fingerprint') == fingerprints[brief.id]:
+            continue
         try:
             create_responses_zip(brief.id)
         except CreateResponsesZipException as e:
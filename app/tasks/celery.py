@@ -51,6 +51,7 @@ def make_celery(flask_app):
             'app.tasks.s3',
             'app.tasks.brief_response_tasks',
             'app.tasks.supplier_tasks',
+            'app.tasks.application_tasks',
             'app.tasks.jira',
             'app.tasks.dreamail',
             'app.tasks.publish_tasks'
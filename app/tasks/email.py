@@ -3,15 +3,15 @@ from __future__ import \
     absolute_import
 
 from . import celery
-import boto3
+from .aws import call_with_client, client_stats
 import botocore.exceptions
 import textwrap
 import sys
 import codecs
+import time
 from flask import current_app
 from flask._compat import string_types
 from dmutils.email import hash_email, to_bytes, to_text, EmailError
-from os import getenv
 
 
 @celery.task
@@ -53,14 +53,6 @@ Reply-To: {reply_to}
         email_body = to_bytes(email_body)
         subject = to_bytes(subject)
 
-        email_client = boto3.client(
-            'ses',
-            region_name=getenv('AWS_REGION'),
-            aws_access_key_id=getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=getenv('AWS_SECRET_ACCESS_KEY'),
-            endpoint_url=getenv('AWS_SES_URL')
-        )
-
         destination_addresses = {
             'ToAddresses': to_email_addresses,
         }
@@ -71,7 +63,10 @@ Reply-To: {reply_to}
 
         return_address = current_app.config.get('DM_EMAIL_RETURN_ADDRESS')
 
-        result = email_client.send_email(
+        started = time.time()
+        result = call_with_client(
+            'ses',
+            'send_email',
             Source=u"{} <{}>".format(from_name, from_email),
             Destination=destination_addresses,
             Message={
@@ -90,10 +85,12 @@ Reply-To: {reply_to}
             ReplyToAddresses=[reply_to or from_email],
         )
 
-        current_app.logger.info("Sent email: id={id}, email={email_hash}",
+        current_app.logger.info("Sent email: id={id}, email={email_hash}, ms={ms}, client_uses={uses}",
                                 extra={
                                     'id': result['ResponseMetadata']['RequestId'],
-                                    'email_hash': hash_email(to_email_addresses[0])
+                                    'email_hash': hash_email(to_email_addresses[0]),
+                                    'ms': int((time.time() - started) * 1000),
+                                    'uses': client_stats('ses')['uses']
                                 })
 
     except botocore.exceptions.ClientError as e:
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, unicode_literals
 
 from os import getenv
+from time import sleep
 
 import pendulum
 import rollbar
@@ -43,6 +44,13 @@ template_env = Environment(
     autoescape=select_autoescape(['html', 'xml'])
 )
 
+# Mailchimp lists at most 1000 members per page and accepts at most 500 per batch subscribe
+MEMBER_PAGE_SIZE = 1000
+MEMBER_BATCH_SIZE = 500
+# attempts at each list sync request, waiting 1, 2, 4... seconds before retrying
+MAILCHIMP_ATTEMPTS = 3
+MAILCHIMP_RETRY_BACKOFF = 1
+
 
 def create_campaign(client, recipients, settings=None):
     if settings is None:
@@ -142,17 +150,58 @@ def schedule_campaign(client, campaign_id, schedule_time):
         )
 
 
-def add_members_to_list(client, list_id, email_addresses):
+def retry_request(func, *args, **kwargs):
+    """Call `func`, retrying with exponential backoff when the Mailchimp API request fails."""
+    for attempt in range(MAILCHIMP_ATTEMPTS):
+        try:
+            return func(*args, **kwargs)
+        except RequestException as e:
+            if attempt == MAILCHIMP_ATTEMPTS - 1:
+                raise
+            current_app.logger.warning('A Mailchimp API request failed, retrying: {}'.format(e))
+            sleep(MAILCHIMP_RETRY_BACKOFF * 2 ** attempt)
+
+
+def get_list_member_addresses(client, list_id):
+    """Return the lowercased addresses of `list_id`'s members, split into those subscribed and all of them."""
+    subscribed, addresses = set(), set()
+    offset = 0
+    while True:
+        page = retry_request(
+            client.lists.members.all,
+            list_id,
+            count=MEMBER_PAGE_SIZE,
+            offset=offset,
+            fields='members.email_address,members.status,total_items'
+        )
+        members = page.get('members', [])
+        for member in members:
+            address = member['email_address'].lower()
+            addresses.add(address)
+            if member.get('status') == 'subscribed':
+                subscribed.add(address)
+        offset += len(members)
+        if not members or offset >= page.get('total_items', 0):
+            return subscribed, addresses
+
+
+def update_list_members(client, list_id, email_addresses, status='subscribed'):
+    """Give `email_addresses` the `status` in `list_id`, MEMBER_BATCH_SIZE addresses per request."""
+    responses = []
     try:
-        data = {
-            'members': [{
-                'email_address': email_address,
-                'status': 'subscribed'
-            } for email_address in email_addresses]
-        }
+        for i in range(0, len(email_addresses), MEMBER_BATCH_SIZE):
+            data = {
+                'members': [{
+                    'email_address': email_address,
+                    'status': status
+                } for email_address in email_addresses[i:i + MEMBER_BATCH_SIZE]]
+            }
+            if status != 'subscribed':
+                # changing the status of existing members has to be asked for
+                data['update_existing'] = True
 
-        response = client.lists.update_members(list_id=list_id, data=data)
-        return response
+            responses.append(retry_request(client.lists.update_members, list_id=list_id, data=data))
+        return responses
     except RequestException as e:
         # publish error in slack and rollbar
         publish_tasks.mailchimp.delay(
@@ -166,13 +215,17 @@ def add_members_to_list(client, list_id, email_addresses):
         rollbar.report_exc_info()
         raise e
     except Exception as error:
-        publish.task.mailchimp.delay(
+        publish_tasks.mailchimp.delay(
             'error',
             message='Mailchimp API error occurred while adding a member to list',
             error=error.message
         )
 
 
+def add_members_to_list(client, list_id, email_addresses):
+    return update_list_members(client, list_id, email_addresses, 'subscribed')
+
+
 def send_document_expiry_campaign(client, sellers):
     folder_id = getenv('MAILCHIMP_MARKETPLACE_FOLDER_ID')
     if not folder_id:
@@ -424,7 +477,14 @@ def send_new_briefs_email():
 
 
 @celery.task
-def sync_mailchimp_seller_list():
+def sync_mailchimp_seller_list(dry_run=False, unsubscribe_missing=False):
+    """Subscribe the users and contact addresses of marketplace sellers to the Mailchimp seller list.
+
+    Addresses already on the list are left alone, even if they unsubscribed. Subscribed members who are no longer
+    sellers are only unsubscribed with `unsubscribe_missing`, as people can join the list outside the marketplace.
+    With `dry_run` the list isn't changed. Returns the diff: the addresses to add and the subscribers who are no
+    longer sellers.
+    """
     client = get_client()
     list_id = getenv('MAILCHIMP_SELLER_LIST_ID')
 
@@ -433,22 +493,11 @@ def sync_mailchimp_seller_list():
 
     # get the mailchimp list's existing members
     try:
-        current_members = client.lists.members.all(
-            list_id,
-            fields='members.email_address,members.id',
-            get_all=True
-        )
+        subscribed_addresses, current_member_addresses = get_list_member_addresses(client, list_id)
     except RequestException as e:
         current_app.logger.error("An Mailchimp API error occurred, aborting: %s %s", e, e.response)
         raise e
 
-    current_member_addresses = []
-    try:
-        for member in current_members['members']:
-            current_member_addresses.append(member['email_address'].lower())
-    except KeyError:
-        pass
-
     # get the addresses from DM service supplier users
     sub1 = db.session.query(SupplierFramework.supplier_code)\
         .filter(Framework.slug == 'digital-marketplace')\
@@ -474,14 +523,35 @@ def sync_mailchimp_seller_list():
 
     supplier_contacts = [x[0].lower() for x in results]
 
-    # combine the user and supplier contact lists
-    combined_supplier_addresses = [x for x in supplier_contacts if x not in supplier_users]
-    combined_supplier_addresses = combined_supplier_addresses + supplier_users
+    # combine the user and supplier contact lists, contacts first, without duplicates
+    user_addresses = set(supplier_users)
+    combined_supplier_addresses = [x for x in supplier_contacts if x not in user_addresses] + supplier_users
+    seller_addresses = set(combined_supplier_addresses)
+
+    # the sellers not in the mailchimp list, each once, and the subscribers who are no longer sellers
+    new_addresses = []
+    for address in combined_supplier_addresses:
+        if address not in current_member_addresses:
+            new_addresses.append(address)
+            current_member_addresses.add(address)
+    missing_addresses = sorted(subscribed_addresses - seller_addresses)
+
+    current_app.logger.info(
+        'Mailchimp seller list sync{}: {} to add, {} subscribers are not sellers{}'.format(
+            ' (dry run)' if dry_run else '',
+            len(new_addresses),
+            len(missing_addresses),
+            ' and will be unsubscribed' if unsubscribe_missing else ''
+        )
+    )
 
-    # get the suppliers not in the mailchimp list
-    new_addresses = [
-        x for x in combined_supplier_addresses if x not in current_member_addresses
-    ]
+    if not dry_run:
+        # add the new suppliers to the mailchimp list
+        update_list_members(client, list_id, new_addresses, 'subscribed')
+        if unsubscribe_missing:
+            update_list_members(client, list_id, missing_addresses, 'unsubscribed')
 
-    # add the new suppliers to the mailchimp list
-    add_members_to_list(client, list_id, new_addresses)
+    return {
+        'add': new_addresses,
+        'remove': missing_addresses
+    }
@@ -1,13 +1,15 @@
 from __future__ import absolute_import, unicode_literals
 
+import shutil
 import tempfile
 import zipfile
-from io import BytesIO
+from collections import deque
 from os import getenv
 
-import boto3
 import botocore
 import pendulum
+from boto3.s3.transfer import TransferConfig
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app, render_template
 from jinja2 import Environment, PackageLoader, select_autoescape
 from werkzeug.utils import secure_filename
@@ -19,6 +21,7 @@ from app.api.services import brief_responses_service, briefs
 from app.models import Brief, BriefResponse
 
 from . import celery
+from .aws import call_with_client
 
 
 class CreateResponsesZipException(Exception):
@@ -30,6 +33,121 @@ template_env = Environment(
     autoescape=select_autoescape(['html', 'xml'])
 )
 
+MB = 1024 * 1024
+
+# archives over 16MB are uploaded in 16MB parts, four at a time
+ARCHIVE_TRANSFER_CONFIG = TransferConfig(multipart_threshold=16 * MB, multipart_chunksize=16 * MB, max_concurrency=4)
+
+ARCHIVE_KEY = 'digital-marketplace/archives/brief-{0}/brief-{0}-resumes.zip'
+
+
+def get_etags(bucket, keys, prefix):
+    """Return the ETag of each of `keys`.
+
+    Everything under `prefix` is listed a page at a time, and only keys outside it are looked up one by one.
+    """
+    etags = {}
+    kwargs = {'Bucket': bucket, 'Prefix': prefix}
+    while True:
+        listing = call_with_client('s3', 'list_objects_v2', **kwargs)
+        etags.update((o['Key'], o['ETag']) for o in listing.get('Contents', []))
+        if not listing.get('IsTruncated'):
+            break
+        kwargs['ContinuationToken'] = listing['NextContinuationToken']
+
+    for key in keys:
+        if key not in etags:
+            try:
+                etags[key] = call_with_client('s3', 'head_object', Bucket=bucket, Key=key)['ETag']
+            except botocore.exceptions.ClientError:
+                raise CreateResponsesZipException('The file "{}" failed to download'.format(key))
+
+    return {key: etags[key] for key in keys}
+
+
+def download_archive(bucket, key):
+    """Download a previously built archive into a temporary file, or return None if it can't be fetched or read."""
+    archive = tempfile.TemporaryFile()
+    try:
+        call_with_client('s3', 'download_fileobj', Bucket=bucket, Key=key, Fileobj=archive)
+    except botocore.exceptions.ClientError:
+        archive.close()
+        return None
+    if not zipfile.is_zipfile(archive):
+        archive.close()
+        return None
+    archive.seek(0)
+    return archive
+
+
+def download_attachment(app, bucket, key):
+    """Download `key` into a temporary file and return the file, which is deleted when closed."""
+    with app.app_context():
+        attachment = tempfile.NamedTemporaryFile()
+        try:
+            call_with_client('s3', 'download_fileobj', Bucket=bucket, Key=key, Fileobj=attachment)
+        except botocore.exceptions.ClientError:
+            attachment.close()
+            raise CreateResponsesZipException('The file "{}" failed to download'.format(key))
+        attachment.flush()
+        return attachment
+
+
+def add_attachments(zf, files, bucket, workers, previous=None):
+    """Add `files` to the archive in order, downloading up to `workers` of them from `bucket` at once.
+
+    Each attachment goes through a temporary file on disk, which zipfile compresses in chunks, so no attachment
+    is ever held in memory. Downloads stay at most `workers` files ahead of the archive. Files marked `reuse` are
+    copied from the `previous` archive instead of being downloaded again.
+    """
+    app = current_app._get_current_object()
+    pending = deque()
+
+    def write_next():
+        zip_name, download = pending.popleft()
+        if download is None:
+            with tempfile.NamedTemporaryFile() as attachment:
+                shutil.copyfileobj(previous.open(zip_name), attachment)
+                attachment.flush()
+                zf.write(attachment.name, zip_name)
+            return
+        with download.result() as attachment:
+            zf.write(attachment.name, zip_name)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for file in files:
+                    if file.get('reuse'):
+                        pending.append((file['zip_name'], None))
+                    else:
+                        pending.append(
+                            (file['zip_name'], executor.submit(download_attachment, app, bucket, file['key'])))
+                    if len(pending) > workers:
+                        write_next()
+                while pending:
+                    write_next()
+            except Exception:
+                for _, download in pending:
+                    if download is not None:
+                        download.cancel()
+                raise
+    finally:
+        # only a failure leaves downloads pending. The executor has waited for the ones that had started, so close
+        # the files they returned
+        for _, download in pending:
+            if download is not None and not download.cancelled() and download.exception() is None:
+                download.result().close()
+
+
+def reusable_entries(brief, files, previous):
+    """Mark each of `files` whose key and ETag match the entry of the same name in the `previous` archive."""
+    manifest = brief.responses_zip_manifest or {}
+    built = {(e['zip_name'], e['key']): e['etag'] for e in manifest.get('entries', [])}
+    names = set(previous.namelist()) if previous else set()
+    for file in files:
+        file['reuse'] = file['zip_name'] in names and built.get((file['zip_name'], file['key'])) == file['etag']
+
 
 @celery.task
 def create_responses_zip(brief_id):
@@ -38,6 +156,8 @@ def create_responses_zip(brief_id):
     if not brief:
         raise CreateResponsesZipException('Failed to load brief for id {}'.format(brief_id))
 
+    # taken before the responses are read, so a response submitted during the build triggers another one
+    fingerprint = brief_responses_service.get_responses_fingerprints([brief_id]).get(brief_id)
     responses = brief_responses_service.get_responses_to_zip(brief_id, brief.lot.slug)
 
     if not responses:
@@ -49,14 +169,6 @@ def create_responses_zip(brief_id):
     print 'Generating zip for brief id: {}'.format(brief_id)
 
     BUCKET_NAME = getenv('S3_BUCKET_NAME')
-    s3 = boto3.resource(
-        's3',
-        region_name=getenv('AWS_REGION'),
-        aws_access_key_id=getenv('AWS_ACCESS_KEY_ID'),
-        aws_secret_access_key=getenv('AWS_SECRET_ACCESS_KEY'),
-        endpoint_url=getenv('AWS_S3_URL')
-    )
-    bucket = s3.Bucket(BUCKET_NAME)
 
     files = []
     attachments = brief_responses_service.get_all_attachments(brief_id)
@@ -78,18 +190,32 @@ def create_responses_zip(brief_id):
             )
         })
 
+    etags = get_etags(BUCKET_NAME, [f['key'] for f in files],
+                      prefix='digital-marketplace/documents/brief-{}/'.format(brief_id))
+    for file in files:
+        file['etag'] = etags[file['key']]
+
+    # attachments that haven't changed since the last build are copied from the stored archive
+    previous_archive = None
+    if brief.responses_zip_manifest and brief.responses_zip_filesize:
+        previous_archive = download_archive(BUCKET_NAME, ARCHIVE_KEY.format(brief_id))
+
     with tempfile.TemporaryFile() as archive:
         with zipfile.ZipFile(archive, mode='w', compression=zipfile.ZIP_DEFLATED) as zf:
-            for file in files:
-                s3file = file['key']
-                with BytesIO() as s3_stream:
-                    try:
-                        bucket.download_fileobj(s3file, s3_stream)
-                        zf.writestr(file['zip_name'], s3_stream.getvalue())
-                    except botocore.exceptions.ClientError as e:
-                        raise CreateResponsesZipException('The file "{}" failed to download'.format(s3file))
-                    finally:
-                        s3_stream.close()
+            previous = zipfile.ZipFile(previous_archive) if previous_archive else None
+            try:
+                reusable_entries(brief, files, previous)
+                add_attachments(zf, files, BUCKET_NAME, current_app.config['RESPONSES_ZIP_DOWNLOAD_WORKERS'], previous)
+            finally:
+                if previous:
+                    previous.close()
+                if previous_archive:
+                    previous_archive.close()
+
+            reused = len([f for f in files if f['reuse']])
+            current_app.logger.info('Responses archive for brief {brief_id}: {reused} attachments reused, '
+                                    '{downloaded} downloaded',
+                                    extra={'brief_id': brief_id, 'reused': reused, 'downloaded': len(files) - reused})
 
             csvdata = generate_brief_responses_csv(brief, responses)
             csv_file_name = ('opportunity-{}-raw.csv'.format(brief_id)
@@ -159,21 +285,30 @@ def create_responses_zip(brief_id):
 
                 zf.writestr('Responses ({}).html'.format(brief_id), response_criteria_html.encode('utf-8'))
 
+        # closing the zip leaves the archive positioned at its end
+        filesize = archive.tell()
         archive.seek(0)
-
         try:
-            brief.responses_zip_filesize = len(archive.read())
-            archive.seek(0)
-            db.session.add(brief)
-            db.session.commit()
-        except Exception as e:
-            raise CreateResponsesZipException(str(e))
-
-        try:
-            bucket.upload_fileobj(
-                archive,
-                'digital-marketplace/archives/brief-{}/brief-{}-resumes.zip'.format(brief_id, brief_id)
+            call_with_client(
+                's3',
+                'upload_fileobj',
+                Fileobj=archive,
+                Bucket=BUCKET_NAME,
+                Key=ARCHIVE_KEY.format(brief_id),
+                Config=ARCHIVE_TRANSFER_CONFIG
             )
         except botocore.exceptions.ClientError as e:
             raise CreateResponsesZipException('The responses archive for brief id "{}" failed to upload'
                                               .format(brief_id))
+
+    # only recorded once the archive is stored, so a failed upload is retried and never reused
+    try:
+        brief.responses_zip_filesize = filesize
+        brief.responses_zip_manifest = {
+            'fingerprint': fingerprint,
+            'entries': [{'zip_name': f['zip_name'], 'key': f['key'], 'etag': f['etag']} for f in files]
+        }
+        db.session.add(brief)
+        db.session.commit()
+    except Exception as e:
+        raise CreateResponsesZipException(str(e))
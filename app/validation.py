@@ -10,8 +10,11 @@ from jsonschema.validators import validator_for
 from datetime import datetime
 from dmutils.formats import DATE_FORMAT
 
+from .cache import LRUCache
+
 MINIMUM_SERVICE_ID_LENGTH = 10
 MAXIMUM_SERVICE_ID_LENGTH = 20
+VALIDATOR_CACHE_SIZE = 256
 
 JSON_SCHEMAS_PATH = './json_schemas'
 SCHEMA_NAMES = [
@@ -96,9 +99,22 @@ def get_required_fields(brief):
 
 
 def get_validator(schema_name, enforce_required=True, required_fields=None):
-    if required_fields is None:
-        required_fields = []
+    """Return a shared validator for `schema_name`.
+
+    Validators are built once per (schema name, required fields) pair and reused, so callers must not
+    mutate the returned validator or its schema.
+    """
     if enforce_required:
+        key = (schema_name, None)
+    else:
+        schema_required = _SCHEMAS[schema_name].get('required', [])
+        key = (schema_name, frozenset(field for field in schema_required if field in (required_fields or [])))
+
+    return _VALIDATORS.get_or_set(key, lambda: _build_validator(*key))
+
+
+def _build_validator(schema_name, required_fields=None):
+    if required_fields is None:
         schema = _SCHEMAS[schema_name]
     else:
         schema = copy.deepcopy(_SCHEMAS[schema_name])
@@ -110,6 +126,11 @@ def get_validator(schema_name, enforce_required=True, required_fields=None):
     return validator_for(schema)(schema, format_checker=FORMAT_CHECKER)
 
 
+_VALIDATORS = LRUCache(maxsize=VALIDATOR_CACHE_SIZE)
+for _schema_name in SCHEMA_NAMES:
+    get_validator(_schema_name)
+
+
 def validate_updater_json_or_400(submitted_json):
     try:
         get_validator('services-update').validate(submitted_json)
@@ -40,6 +40,10 @@ CELERYBEAT_SCHEDULE = {
         'task': 'app.tasks.supplier_tasks.update_supplier_metrics',
         'schedule': crontab(hour='*/4', minute=4)
     },
+    'update_application_history_metrics': {
+        'task': 'app.tasks.application_tasks.update_application_history_metrics',
+        'schedule': crontab(hour='*/1', minute=6)
+    },
     'sync_application_approvals_with_jira': {
         'task': 'app.tasks.jira.sync_application_approvals_with_jira',
         'schedule': crontab(day_of_week='mon-fri', hour='8-18/1', minute=45)
@@ -203,6 +207,21 @@ class Config:
     AWS_SES_URL = None
     AWS_SQS_BROKER_URL = None
     AWS_SQS_QUEUE_URL = None
+    # attachments downloaded at once while building a brief's responses archive
+    RESPONSES_ZIP_DOWNLOAD_WORKERS = 8
+
+    # seconds each process keeps the opportunities list, 0 disables the cache
+    OPPORTUNITIES_CACHE_TTL = 60
+    # seconds a user's buyer dashboard brief counts are shared between processes, 0 disables the cache
+    BRIEF_COUNTS_CACHE_TTL = 300
+    # seconds a supplier's dashboard notification count is shared between processes, 0 disables the cache
+    SUPPLIER_NOTIFICATION_COUNT_CACHE_TTL = 600
+    # seconds each process keeps the master agreement calendar, 0 disables the cache
+    AGREEMENT_CACHE_TTL = 300
+    # seconds each process keeps the domain registry, 0 disables the cache
+    DOMAIN_CACHE_TTL = 300
+    # seconds a live API key's owner is shared between processes, 0 disables the cache
+    API_KEY_CACHE_TTL = 60
 
     # CELERY
     CELERY_TIMEZONE = 'Australia/Sydney'
@@ -255,6 +274,13 @@ class Test(Config):
 
     REDIS_SESSIONS = False
 
+    OPPORTUNITIES_CACHE_TTL = 0
+    BRIEF_COUNTS_CACHE_TTL = 0
+    SUPPLIER_NOTIFICATION_COUNT_CACHE_TTL = 0
+    AGREEMENT_CACHE_TTL = 0
+    DOMAIN_CACHE_TTL = 0
+    API_KEY_CACHE_TTL = 0
+
 
 class Development(Config):
     DEBUG = True
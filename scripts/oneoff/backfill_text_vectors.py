@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Fill persisted full-text search columns for rows that existed before their trigger was added.
+
+Each batch is a no-op update of a trigger column, so the stored vector is computed by the same
+trigger that maintains it afterwards. Batches are committed separately to keep locks short.
+
+Usage:
+    backfill_text_vectors.py <database_url> [--table=<table>] [--batch-size=<size>]
+
+Options:
+    --table=<table>          Table to backfill [default: supplier]
+    --batch-size=<size>      Rows updated per transaction [default: 500]
+"""
+from docopt import docopt
+from sqlalchemy import create_engine, text
+
+
+TRIGGER_COLUMNS = {
+    'supplier': 'name',
+    'product': 'name',
+}
+
+
+def backfill(database_url, table, batch_size):
+    column = TRIGGER_COLUMNS[table]
+    engine = create_engine(database_url)
+
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            ids = [r[0] for r in conn.execute(text(
+                'select id from {table} where id > :last_id and text_vector is null '
+                'order by id limit :batch_size'.format(table=table)
+            ), last_id=last_id, batch_size=batch_size)]
+
+            if not ids:
+                break
+
+            conn.execute(text(
+                'update {table} set {column} = {column} where id = any(:ids)'.format(table=table, column=column)
+            ), ids=ids)
+
+        last_id = ids[-1]
+        print('{}: backfilled up to id {}'.format(table, last_id))
+
+
+if __name__ == '__main__':
+    arguments = docopt(__doc__)
+    backfill(
+        database_url=arguments['<database_url>'],
+        table=arguments['--table'],
+        batch_size=int(arguments['--batch-size']))
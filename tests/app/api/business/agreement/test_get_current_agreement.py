@@ -1,6 +1,11 @@
 import pendulum
+from flask import current_app
 
-from app.api.business.agreement_business import get_current_agreement
+from app.api.business.agreement_business import (agreements_cache,
+                                                 get_current_agreement,
+                                                 get_new_agreement)
+from app.api.services import master_agreement_service
+from app.models import MasterAgreement, db
 from tests.app.helpers import BaseApplicationTest
 
 
@@ -14,3 +19,24 @@ class TestCurrentAgreement(BaseApplicationTest):
 
         assert current_agreement.start_date <= now
         assert current_agreement.end_date >= now
+
+    def test_current_agreement_as_of_another_time(self, master_agreements):
+        current_agreement = get_current_agreement(at=pendulum.now('utc').add(years=1, days=1))
+
+        assert current_agreement.id == 4
+
+    def test_agreements_are_cached_until_one_is_committed(self, app, master_agreements, mocker):
+        current_app.config['AGREEMENT_CACHE_TTL'] = 60
+        agreements_cache.clear()
+        get_agreements = mocker.spy(master_agreement_service, 'get_agreements')
+        try:
+            assert get_current_agreement().id == 3
+            assert get_new_agreement().id == 4
+            assert get_agreements.call_count == 1
+
+            MasterAgreement.query.get(4).end_date = pendulum.now('utc').add(years=3)
+            db.session.commit()
+            get_current_agreement()
+            assert get_agreements.call_count == 2
+        finally:
+            agreements_cache.clear()
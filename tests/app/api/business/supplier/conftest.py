@@ -0,0 +1,41 @@
+import pendulum
+import pytest
+
+from app.models import MasterAgreement, Supplier, db
+
+
+@pytest.fixture()
+def master_agreement(app):
+    with app.app_context():
+        now = pendulum.now('utc')
+
+        db.session.add(
+            MasterAgreement(
+                id=1,
+                start_date=now.subtract(years=1),
+                end_date=now.add(years=1),
+                data={}
+            )
+        )
+
+        db.session.commit()
+
+        yield MasterAgreement.query.first()
+
+
+@pytest.fixture()
+def supplier(app):
+    with app.app_context():
+        db.session.add(
+            Supplier(
+                id=1,
+                code=1,
+                name='FriendFace',
+                is_recruiter=False,
+                data={}
+            )
+        )
+
+        db.session.commit()
+
+        yield Supplier.query.first()
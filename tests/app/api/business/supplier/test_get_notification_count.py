@@ -0,0 +1,34 @@
+from flask import current_app
+
+from app.api.business.supplier_business import (get_notification_count,
+                                                get_supplier_messages,
+                                                notification_counts)
+from app.models import MasterAgreement, db
+from tests.app.helpers import BaseApplicationTest
+
+
+class TestGetNotificationCount(BaseApplicationTest):
+    def setup(self):
+        super(TestGetNotificationCount, self).setup()
+
+    def test_notification_count_matches_supplier_messages(self, supplier, master_agreement):
+        messages = get_supplier_messages(1, False)
+        assert get_notification_count(1) == len(messages.errors + messages.warnings)
+
+    def test_cached_notification_count_is_forgotten_when_supplier_changes(self, supplier, master_agreement):
+        current_app.config['SUPPLIER_NOTIFICATION_COUNT_CACHE_TTL'] = 60
+        notification_counts.clear()
+        try:
+            count = get_notification_count(1)
+            assert notification_counts.get(1) == count
+
+            supplier.name = 'FriendFlutter'
+            db.session.commit()
+            assert notification_counts.get(1) is None
+
+            get_notification_count(1)
+            MasterAgreement.query.get(1).data = {'pdfUrl': '/path/to/agreement.pdf'}
+            db.session.commit()
+            assert notification_counts.get(1) is None
+        finally:
+            notification_counts.clear()
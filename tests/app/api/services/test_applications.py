@@ -1,7 +1,9 @@
+from datetime import date, datetime
+
 import pytest
 
-from app.api.services import application_service
-from app.models import Application, db
+from app.api.services import application_service, audit_types
+from app.models import Application, AuditEvent, db
 from tests.app.helpers import BaseApplicationTest
 
 
@@ -22,3 +24,26 @@ class TestApplicationService(BaseApplicationTest):
     def test_get_submitted_application_ids(self, applications):
         submitted_applications = application_service.get_submitted_application_ids()
         assert submitted_applications == [1, 4]
+
+    def test_update_history_metrics_snapshots_each_day_once(self, applications):
+        for application_id, audit_type, created_at in [
+            (1, audit_types.create_application, datetime(2019, 1, 1, 10)),
+            (1, audit_types.submit_application, datetime(2019, 1, 3, 10)),
+            (2, audit_types.create_application, datetime(2019, 1, 2, 10))
+        ]:
+            event = AuditEvent(audit_type, 'user', {}, Application.query.get(application_id))
+            event.created_at = created_at
+            db.session.add(event)
+        db.session.commit()
+
+        assert application_service.update_history_metrics(until=date(2019, 1, 4)) > 0
+        assert application_service.update_history_metrics(until=date(2019, 1, 4)) == 0
+
+        metrics = {(m.day, m.type): m.count for m in application_service.get_history_metrics()}
+        assert metrics[(date(2019, 1, 2), 'create_application')] == 1
+        assert metrics[(date(2019, 1, 3), 'create_application')] == 2
+        assert metrics[(date(2019, 1, 4), 'create_application')] == 1
+        assert metrics[(date(2019, 1, 4), 'submit_application')] == 1
+        assert metrics[(date(2019, 1, 4), 'started_application')] == 2
+        assert metrics[(date(2019, 1, 4), 'completed_application')] == 1
+        assert metrics[(date(2019, 1, 2), 'completed_application')] is None
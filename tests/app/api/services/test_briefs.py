@@ -1,12 +1,14 @@
 import pendulum
 import pytest
+from flask import current_app
 
 from app.api.business.brief import brief_business
-from app.api.services import audit_types, brief_responses_service
+from app.api.services import audit_types, brief_responses_service, key_values_service
 from app.api.services import briefs as briefs_service
+from app.api.services.briefs import brief_counts_cache
 from app.api.services import frameworks_service, lots_service
-from app.models import (AuditEvent, Brief, BriefQuestion, BriefResponse,
-                        Supplier, User, db)
+from app.models import (AuditEvent, Brief, BriefAccess, BriefQuestion,
+                        BriefResponse, BriefUser, Supplier, User, db)
 from tests.app.helpers import BaseApplicationTest
 
 
@@ -239,3 +241,83 @@ class TestBriefsService(BaseApplicationTest):
         email_addresses = briefs_service.get_sellers_to_notify(brief, brief_business.is_open_to_all(brief))
         assert 'biz.contact@friendface.com.au' in email_addresses
         assert 'authorised.rep@friendflutter.com.au' in email_addresses
+
+    def test_metrics_are_counted_in_one_pass(self, brief):
+        metrics = briefs_service.get_metrics()
+        assert metrics['total'] == 1
+        assert metrics['live'] == 1
+        assert metrics['open_to_all'] == 0
+        assert metrics['most_recent_published_at']
+        assert briefs_service.with_time_since(metrics)['recent_brief_time_since'] != ''
+
+    def test_metrics_are_not_updated_before_they_are_materialised(self, brief):
+        assert briefs_service.update_metrics(brief, 'published') is None
+
+    def test_stored_metrics_follow_withdrawn_brief(self, brief):
+        brief.data['sellerSelector'] = 'allSellers'
+        briefs_service.save(brief)
+        key_values_service.upsert(briefs_service.METRICS_KEY, briefs_service.get_metrics())
+        assert key_values_service.get_by_key(briefs_service.METRICS_KEY)['data']['open_to_all'] == 1
+
+        withdrawn_brief = briefs_service.withdraw_opportunity(brief, 'Project cancelled')
+        metrics = briefs_service.update_metrics(withdrawn_brief, 'withdrawn')
+
+        assert metrics['total'] == 0
+        assert metrics['live'] == 0
+        assert metrics['open_to_all'] == 0
+        assert key_values_service.get_by_key(briefs_service.METRICS_KEY)['data'] == metrics
+
+    def test_stored_metrics_are_timed_when_read(self, brief):
+        key_values_service.upsert(briefs_service.METRICS_KEY, briefs_service.get_metrics())
+        metrics = briefs_service.update_metrics(brief, 'published')
+
+        assert metrics['most_recent_published_at'] == brief.published_at.to_iso8601_string(extended=True)
+        assert 'recent_brief_time_since' not in metrics
+        assert briefs_service.with_time_since(metrics)['recent_brief_time_since'] != ''
+        assert 'most_recent_published_at' not in briefs_service.with_time_since(metrics)
+
+    def test_brief_counts_are_grouped_by_status(self, brief):
+        assert briefs_service.get_brief_counts(1) == {'withdrawn': 0, 'draft': 0, 'live': 1, 'closed': 0}
+
+    def test_cached_brief_counts_follow_withdrawn_brief(self, brief):
+        current_app.config['BRIEF_COUNTS_CACHE_TTL'] = 60
+        brief_counts_cache.clear()
+        try:
+            assert briefs_service.get_brief_counts(1)['live'] == 1
+            assert brief_counts_cache.get(1) is not None
+
+            briefs_service.withdraw_opportunity(brief, 'Project cancelled')
+
+            assert brief_counts_cache.get(1) is None
+            counts = briefs_service.get_brief_counts(1)
+            assert counts['live'] == 0
+            assert counts['withdrawn'] == 1
+        finally:
+            brief_counts_cache.clear()
+
+    def test_cached_brief_counts_are_kept_for_other_buyers(self, brief):
+        current_app.config['BRIEF_COUNTS_CACHE_TTL'] = 60
+        brief_counts_cache.clear()
+        try:
+            brief_counts_cache.set(7, {'withdrawn': 0, 'draft': 0, 'live': 0, 'closed': 0}, ttl=60)
+            assert briefs_service.get_brief_counts(1)['live'] == 1
+
+            briefs_service.withdraw_opportunity(brief, 'Project cancelled')
+
+            assert brief_counts_cache.get(1) is None
+            assert brief_counts_cache.get(7) is not None
+        finally:
+            brief_counts_cache.clear()
+
+    def test_brief_access_follows_brief_users(self, brief):
+        assert briefs_service.has_permission_to_brief(1, 1)
+        assert not briefs_service.has_permission_to_brief(7, 1)
+
+        db.session.add(BriefUser(brief_id=1, user_id=7))
+        db.session.commit()
+        assert briefs_service.has_permission_to_brief(7, 1)
+        assert BriefAccess.query.filter(BriefAccess.viewer_id == 7).count() == 6
+
+        BriefUser.query.filter(BriefUser.user_id == 7).delete()
+        db.session.commit()
+        assert not briefs_service.has_permission_to_brief(7, 1)
@@ -1,7 +1,8 @@
 import pytest
+from flask import current_app
 
 from app.api.services import domain_service
-from app.models import Domain, db
+from app.models import Domain, db, domain_registry
 from tests.app.helpers import BaseApplicationTest
 
 
@@ -18,3 +19,24 @@ class TestDomainsService(BaseApplicationTest):
         active_domains = domain_service.get_active_domains()
         active_domain_names = [domain.name for domain in active_domains]
         assert 'Change, Training and Transformation' not in active_domain_names
+
+    def test_get_by_name_or_id_ignores_case_and_hides_legacy_domains(self, domains):
+        domain = domain_service.get_by_name_or_id('change, training and transformation')
+        assert domain.name == 'Change, Training and Transformation'
+        assert domain_service.get_by_name_or_id(domain.id) is domain
+        assert domain_service.get_by_name_or_id(domain.id, show_legacy=False) is None
+        assert domain_service.get_by_name_or_id('no such domain') is None
+
+    def test_domain_registry_is_cached_until_a_domain_is_committed(self, app, domains):
+        current_app.config['DOMAIN_CACHE_TTL'] = 60
+        domain_registry.clear()
+        try:
+            domain = Domain.get_by_name_or_id(domains[0].id)
+            assert 'domains' in domain_registry
+
+            domain.name = 'Renamed domain'
+            db.session.commit()
+            assert 'domains' not in domain_registry
+            assert Domain.get_by_name_or_id('renamed DOMAIN').id == domain.id
+        finally:
+            domain_registry.clear()
@@ -11,7 +11,7 @@ from pytest import raises
 from sqlalchemy.exc import DataError, IntegrityError
 
 from app import create_app, db
-from app.datetime_utils import naive, utcnow
+from app.datetime_utils import DateTime, LazyPendulum, naive, to_iso8601_string, utcnow
 from app.models import (Address, Application, Brief,
                         BriefClarificationQuestion, BriefResponse, Domain,
                         Framework, Lot, MasterAgreement, Product,
@@ -38,6 +38,34 @@ def test_views(app_context):
     assert u.viewrow().email_domain == 'whatever.gov.au'
 
 
+def test_datetime_results_are_pendulums_until_touched():
+    loaded = DateTime().process_result_value(builtindatetime(2018, 3, 4, 5, 6, 7, 89), None)
+
+    assert isinstance(loaded, LazyPendulum)
+    assert loaded.to_iso8601_string(extended=True) == '2018-03-04T05:06:07.000089+00:00'
+    assert '_lazy_tz' in loaded.__dict__
+
+    assert loaded == datetime(2018, 3, 4, 5, 6, 7, 89)
+    assert loaded.timezone_name == 'UTC'
+    assert loaded.add(days=1).to_iso8601_string() == '2018-03-05T05:06:07+00:00'
+
+
+def test_datetime_results_drop_the_timezone_of_aware_values():
+    aware = datetime(2018, 3, 4, 5, 6, 7, tz='Australia/Sydney')
+    loaded = DateTime().process_result_value(aware, None)
+
+    assert loaded.to_iso8601_string() == '2018-03-04T05:06:07+00:00'
+    assert loaded == datetime(2018, 3, 4, 5, 6, 7)
+    assert loaded.in_timezone('Australia/Sydney').hour == 16
+
+
+def test_to_iso8601_string_matches_pendulum():
+    for dt in [builtindatetime(2018, 3, 4, 5, 6, 7), datetime(2018, 3, 4, 5, 6, 7, 89, tz='Australia/Sydney'),
+               datetime(2018, 3, 4, 5, 6, 7, tz=-3.5)]:
+        assert to_iso8601_string(dt) == pendulum.instance(dt).to_iso8601_string()
+        assert to_iso8601_string(dt, extended=True) == pendulum.instance(dt).to_iso8601_string(extended=True)
+
+
 def test_should_not_return_password_on_user():
     app = create_app('test')
     now = utcnow()
@@ -209,6 +237,23 @@ class TestBriefs(BaseApplicationTest):
             assert brief.id is not None
             assert brief.data == dict()
 
+    def test_draft_dates_are_hypothetical_without_publishing_the_brief(self):
+        with self.app.app_context(), pendulum.test(pendulum.create(2015, 1, 1, 12, tz='Australia/Sydney')):
+            brief = Brief(data={}, framework=self.framework, lot=self.lot)
+            db.session.add(brief)
+            db.session.commit()
+
+            dates = brief.dates_for_serialization
+
+            assert dates['published_date'] is None
+            assert dates['hypothetical']['closing_time'] == '2015-01-15T07:00:00+00:00'
+            assert dates['hypothetical']['questions_close'] == '2015-01-08T07:00:00+00:00'
+            assert brief.published_at is None
+            assert brief.status == 'draft'
+            assert brief not in db.session.dirty
+
+            assert brief.dates_for_serialization == dates
+
     def test_brief_domains(self):
         with self.app.app_context():
             brief = Brief(data={}, framework=self.framework, lot=self.lot)
@@ -8,7 +8,8 @@ from jsonschema import validate, SchemaError, ValidationError
 
 from app.utils import drop_foreign_fields
 from app.validation import validates_against_schema, is_valid_service_id, is_valid_date, \
-    is_valid_acknowledged_state, get_validation_errors, is_valid_string, min_price_less_than_max_price
+    is_valid_acknowledged_state, get_validation_errors, is_valid_string, min_price_less_than_max_price, \
+    get_validator
 
 EXAMPLE_LISTING_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__),
                                                     '..', '..', 'example_listings'))
@@ -273,6 +274,17 @@ def test_required_fields_param_requires_specified_fields():
     assert "answer_required" in errs['serviceSummary']
 
 
+def test_validators_are_shared_per_schema_and_required_fields():
+    assert get_validator('services-g-cloud-7-scs') is get_validator('services-g-cloud-7-scs')
+
+    partial = get_validator('services-g-cloud-7-scs', enforce_required=False, required_fields=['serviceSummary'])
+    assert partial is get_validator('services-g-cloud-7-scs', enforce_required=False,
+                                    required_fields=['serviceSummary', 'notInTheSchema'])
+    assert partial is not get_validator('services-g-cloud-7-scs', enforce_required=False)
+    assert partial.schema['required'] == ['serviceSummary']
+    assert 'serviceSummary' in get_validator('services-g-cloud-7-scs').schema['required']
+
+
 def test_additional_properties_has_validation_error():
     data = load_example_listing("G7-SCS")
     data = drop_api_exported_fields_so_that_api_import_will_validate(data)
@@ -1262,3 +1262,6 @@ class TestCounts(BaseApplicationTest):
     def test_get_briefs(self):
         response = self.client.get('/briefs/count')
         assert response.status_code == 200
+        data = json.loads(response.get_data(as_text=True))['briefs']
+        assert data['recent_brief_time_since'] == ''
+        assert 'most_recent_published_at' not in data
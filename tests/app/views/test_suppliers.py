@@ -5,6 +5,7 @@ from six.moves.urllib import parse as urlparse
 import time
 from freezegun import freeze_time
 from flask import current_app
+from sqlalchemy import event
 from nose.tools import assert_equal, assert_in, assert_is_none, assert_is_not_none, assert_true, assert_false
 
 from app import db
@@ -103,6 +104,37 @@ class TestListSuppliers(BaseApplicationTest):
         assert 'suppliers' in data
         assert len(data['suppliers']) == 2
 
+    def test_query_count_does_not_grow_with_the_page(self):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        with self.app.app_context():
+            self.client.get('/suppliers?per_page=1')
+            event.listen(db.engine, 'before_cursor_execute', count)
+            try:
+                self.client.get('/suppliers?per_page=1')
+                one = len(statements)
+                del statements[:]
+                self.client.get('/suppliers?per_page=7')
+                seven = len(statements)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', count)
+
+        assert seven == one
+
+    def test_batch_loaded_suppliers_serialize_as_lazily_loaded_ones(self):
+        with self.app.test_request_context('/'):
+            lazily = [s.serializable for s in Supplier.query.order_by(Supplier.code)]
+            db.session.expunge_all()
+            batched = [
+                s.serializable
+                for s in Supplier.query.options(*Supplier.serializer_options()).order_by(Supplier.code)
+            ]
+
+        assert batched == lazily
+
     @mock.patch('app.tasks.publish_tasks.supplier')
     def test_results_after_delete(self, supplier):
         self.client.delete('/suppliers/{}'.format(1))
@@ -681,6 +713,40 @@ class TestSupplierSearch(BaseApplicationTest):
             results = self.do_search(NEW_DOMAIN_SEARCH)
             assert [_['name'] for _ in results] == ['Supplier 2']
 
+    def test_search_pages_in_sql(self):
+        self.setup_dummy_suppliers_with_old_and_new_domains(5)
+
+        MATCH_ALL_SEARCH = {
+            "query": {
+                "match_all": {
+                }
+            }
+        }
+
+        with self.app.app_context():
+            response = self.search(MATCH_ALL_SEARCH, framework='digital-outcomes-and-specialists', size='2')
+            result = json.loads(response.get_data())
+            assert result['hits']['total'] == 5
+            assert len(result['hits']['hits']) == 2
+
+            response = self.search(MATCH_ALL_SEARCH, framework='digital-outcomes-and-specialists', size='2', **{
+                'from': '4'
+            })
+            result = json.loads(response.get_data())
+            assert result['hits']['total'] == 5
+            assert len(result['hits']['hits']) == 1
+
+            response = self.search(MATCH_ALL_SEARCH, framework='digital-outcomes-and-specialists', **{
+                'from': '10'
+            })
+            result = json.loads(response.get_data())
+            assert result['hits']['total'] == 5
+            assert result['hits']['hits'] == []
+
+            response = self.search({'query': {'term': {'code': 3}}}, framework='digital-outcomes-and-specialists')
+            hit = json.loads(response.get_data())['hits']['hits'][0]['_source']
+            assert hit['domains'] == {'assessed': ['Data science'], 'unassessed': ['Content and Publishing']}
+
     def test_product_search_results(self):
         self.setup_dummy_suppliers_with_old_and_new_domains(5)
 
@@ -694,6 +760,14 @@ class TestSupplierSearch(BaseApplicationTest):
 
         assert titles == ['zzz 3', 'otherproduct 3']
 
+        with self.app.app_context():
+            response = self.search_products(PRODUCT_SEARCH, framework='digital-outcomes-and-specialists', size='1', **{
+                'from': '1'
+            })
+            result = json.loads(response.get_data())
+            assert result['hits']['total'] == 2
+            assert [h['_source']['name'] for h in result['hits']['hits']] == ['otherproduct 3']
+
         PRODUCT_SEARCH_WITH_TERM_AND_SELLER_TYPE = {
             'seller_types': ['start_up'],
             'search_term': 'otherproduct'
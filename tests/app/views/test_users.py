@@ -1625,6 +1625,29 @@ class TestUsersExport(BaseUserTest):
         data = json.loads(self._return_users_export_after_setting_framework_status().get_data())["users"]
         assert len(data) == len(self.users) - 1
 
+    def test_response_streams_csv(self):
+        self._setup()
+        self._put_complete_declaration()
+        self._post_complete_draft_service()
+        self._set_framework_status()
+        response = self.client.get('/users/export/{}?format=csv'.format(self.framework_slug))
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert response.headers['Content-Disposition'] == \
+            'attachment; filename=users-{}.csv'.format(self.framework_slug)
+
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0] == ('user_email,user_name,supplier_code,declaration_status,application_status,'
+                            'framework_agreement,application_result')
+        assert len(lines) == len(self.users) + 1
+        for line in lines[1:]:
+            assert line.endswith(',{},complete,application,False,no result'.format(self.supplier_code))
+
+    def test_400_response_if_bad_format(self):
+        self._setup()
+        response = self.client.get('/users/export/{}?format=xml'.format(self.framework_slug))
+        assert response.status_code == 400
+
     # Test 400 if bad framework name
     def test_400_response_if_bad_framework_name(self):
         self._setup()
@@ -0,0 +1,108 @@
+"""EXPLAIN ANALYZE of the /opportunities and brief metrics filters with brief.data as json and as jsonb.
+
+Generates 100k synthetic briefs into two scratch tables in the given database, one with a json data
+column and one with a jsonb data column plus the expression indexes declared on Brief, and prints the
+plan and execution time of each query against both. Both tables have the brief table's existing
+timestamp indexes. The scratch tables are dropped afterwards.
+
+Run from the repository root against a disposable database:
+
+    python -m tests.benchmarks.bench_brief_jsonb postgresql://localhost/scratch [rows]
+"""
+from __future__ import print_function
+
+import sys
+
+from sqlalchemy import create_engine, text
+
+
+SETUP = """
+create table {table} (
+    id serial primary key,
+    published_at timestamp,
+    withdrawn_at timestamp,
+    closed_at timestamp,
+    data {data_type}
+);
+
+insert into {table} (published_at, withdrawn_at, closed_at, data)
+select
+    now() - (n || ' hours')::interval,
+    case when n % 50 = 0 then now() else null end,
+    now() - (n || ' hours')::interval + interval '14 days',
+    json_build_object(
+        'title', 'Opportunity ' || n,
+        'organisation', 'Agency ' || (n % 300),
+        'sellerSelector', (array['allSellers', 'someSellers', 'oneSellers'])[1 + n % 3],
+        'areaOfExpertise', (array['Software engineering and Development', 'Agile delivery and Governance',
+                                  'Training, Learning and Development', ''])[1 + n % 4],
+        'location', json_build_array((array['Australian Capital Territory', 'New South Wales', 'Victoria',
+                                            'Offsite'])[1 + n % 4])
+    ){cast}
+from generate_series(1, :rows) n;
+"""
+
+# the timestamp indexes the brief table already had, created on both tables
+BASELINE_INDEXES = """
+create index on {table} (published_at);
+create index on {table} (withdrawn_at);
+create index on {table} (closed_at);
+"""
+
+INDEXES = """
+create index on {table} ((data ->> 'sellerSelector'));
+create index on {table} ((data ->> 'areaOfExpertise'));
+"""
+
+QUERIES = [
+    ('open to one seller', """
+        select id, data ->> 'title', data ->> 'organisation' from {table}
+        where published_at is not null and data ->> 'sellerSelector' = 'oneSellers'
+        order by published_at desc
+    """),
+    ('training area of expertise', """
+        select id, data ->> 'title' from {table}
+        where published_at is not null and data ->> 'areaOfExpertise' = 'Training, Learning and Development'
+        order by published_at desc
+    """),
+    ('brief metrics', """
+        select count(*),
+               count(*) filter (where data ->> 'sellerSelector' = 'allSellers'),
+               count(*) filter (where data ->> 'sellerSelector' = 'someSellers')
+        from {table} where withdrawn_at is null and published_at is not null
+    """),
+]
+
+
+def main(database_url, rows=100000):
+    engine = create_engine(database_url)
+    tables = [
+        ('before (json)', 'bench_brief_json', 'json', '', False),
+        ('after (jsonb)', 'bench_brief_jsonb', 'jsonb', '::jsonb', True),
+    ]
+
+    with engine.begin() as conn:
+        for _, table, data_type, cast, indexed in tables:
+            conn.execute('drop table if exists {}'.format(table))
+            conn.execute(text(SETUP.format(table=table, data_type=data_type, cast=cast)), rows=rows)
+            conn.execute(BASELINE_INDEXES.format(table=table))
+            if indexed:
+                conn.execute(INDEXES.format(table=table))
+            conn.execute('analyze {}'.format(table))
+
+    try:
+        with engine.connect() as conn:
+            for name, query in QUERIES:
+                for label, table, _, _, _ in tables:
+                    plan = conn.execute('explain analyze ' + query.format(table=table)).fetchall()
+                    print('=== {}: {} ==='.format(name, label))
+                    print('\n'.join(line for (line,) in plan))
+                    print()
+    finally:
+        with engine.begin() as conn:
+            for _, table, _, _, _ in tables:
+                conn.execute('drop table if exists {}'.format(table))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *[int(a) for a in sys.argv[2:3]])
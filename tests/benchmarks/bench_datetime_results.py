@@ -0,0 +1,63 @@
+"""Time taken to load audit events and format their timestamps, with eager and lazy DateTime results.
+
+"eager" is the previous DateTime.process_result_value, which built one or two Pendulums per value. "lazy"
+is the current one, which returns a LazyPendulum. Each run loads `count` audit events, then formats every
+created_at as the serializers do.
+
+Run from the repository root against a database with at least `count` audit events:
+
+    python -m tests.benchmarks.bench_datetime_results postgresql://localhost/marketplace [count] [iterations]
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+import mock
+import pendulum
+
+from app import create_app, db
+from app.datetime_utils import DateTime, vanilla
+from app.models import AuditEvent
+from config import configs
+
+
+def eager(self, value, dialect):
+    if value is not None:
+        result = pendulum.instance(value)
+
+        if value.tzinfo is not None:
+            result = pendulum.instance(vanilla(result))
+        return result
+
+
+def measure(count, iterations):
+    loading = formatting = 0
+    for _ in range(iterations):
+        started = time.time()
+        events = AuditEvent.query.order_by(AuditEvent.id).limit(count).all()
+        loaded = time.time()
+        [e.created_at.to_iso8601_string(extended=True) for e in events]
+        formatting += time.time() - loaded
+        loading += loaded - started
+        db.session.remove()
+
+    return len(events), loading / iterations * 1000, formatting / iterations * 1000
+
+
+def main(database_url, count=50000, iterations=5):
+    configs['development'].SQLALCHEMY_DATABASE_URI = database_url
+    app = create_app('development')
+
+    with app.app_context():
+        for label, process_result_value in [('eager', eager), ('lazy', DateTime.process_result_value)]:
+            with mock.patch.object(DateTime, 'process_result_value', process_result_value):
+                # result processors are cached per type and dialect, forget the other run's
+                db.engine.dialect._type_memos.clear()
+                rows, load_ms, format_ms = measure(count, iterations)
+            print('{:<6} {:>7} events {:>9.1f} ms loading {:>9.1f} ms formatting'.format(
+                label, rows, load_ms, format_ms))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *[int(a) for a in sys.argv[2:4]])
@@ -0,0 +1,82 @@
+"""Time taken to build a responses archive from many attachments, downloading them serially or concurrently.
+
+S3 is replaced by a directory of random files, with a fixed delay before each download to stand in for the
+round trip. The baseline is the previous approach: each attachment is downloaded into memory and copied into the
+archive one at a time. The max rss column is the process's peak so far.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_responses_zip [attachments] [size_kb] [latency_ms]
+"""
+from __future__ import print_function
+
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+
+import mock
+
+from app import create_app
+from app.tasks import s3
+
+
+class FakeS3(object):
+    """Serves `download_fileobj` from files under `root`, after sleeping for `latency` seconds."""
+
+    def __init__(self, root, latency):
+        self.root = root
+        self.latency = latency
+
+    def __call__(self, service, method, Bucket=None, Key=None, Fileobj=None, **kwargs):
+        time.sleep(self.latency)
+        with open(os.path.join(self.root, Key), 'rb') as f:
+            shutil.copyfileobj(f, Fileobj)
+
+
+def serial_in_memory(zf, files, bucket, workers):
+    for file in files:
+        with BytesIO() as stream:
+            s3.call_with_client('s3', 'download_fileobj', Bucket=bucket, Key=file['key'], Fileobj=stream)
+            zf.writestr(file['zip_name'], stream.getvalue())
+
+
+def measure(app, add, files, workers):
+    with app.app_context(), tempfile.TemporaryFile() as archive:
+        started = time.time()
+        with zipfile.ZipFile(archive, mode='w', compression=zipfile.ZIP_DEFLATED) as zf:
+            add(zf, files, 'bucket', workers)
+        return time.time() - started, archive.tell()
+
+
+def main(attachments=200, size_kb=512, latency_ms=50):
+    app = create_app('development')
+    root = tempfile.mkdtemp()
+    try:
+        files = []
+        for i in range(attachments):
+            key = 'attachment-{}.pdf'.format(i)
+            with open(os.path.join(root, key), 'wb') as f:
+                f.write(os.urandom(size_kb * 1024))
+            files.append({'key': key, 'zip_name': 'documents/{}'.format(key)})
+
+        with mock.patch('app.tasks.s3.call_with_client', FakeS3(root, latency_ms / 1000.0)):
+            # max rss only ever grows, so the in-memory baseline runs last
+            for label, add, workers in [('1 worker', s3.add_attachments, 1),
+                                        ('8 workers', s3.add_attachments, 8),
+                                        ('16 workers', s3.add_attachments, 16),
+                                        ('serial, in memory', serial_in_memory, 1)]:
+                elapsed, size = measure(app, add, files, workers)
+                print('{:<18} {:>8.2f} s {:>8.1f} MB archive {:>8.1f} MB max rss'.format(
+                    label, elapsed, size / 1024.0 / 1024,
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:4]])
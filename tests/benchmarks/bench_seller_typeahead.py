@@ -0,0 +1,66 @@
+"""Time taken by the seller name typeahead for 1, 3 and 10 character keywords, before and after the trigram search.
+
+"before" is the previous query: an unranked, unlimited ilike over suppliers with their frameworks, domains and
+prices eagerly joined. "after" is SuppliersService.search_sellers_by_name. Keywords are prefixes of `name`.
+
+Run from the repository root against a database with supplier data:
+
+    python -m tests.benchmarks.bench_seller_typeahead postgresql://localhost/marketplace <name> [iterations]
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+from sqlalchemy.orm import joinedload, noload, raiseload
+
+from app import create_app, db
+from app.api.services import suppliers
+from app.models import Supplier
+from config import configs
+
+
+def before(keyword):
+    return (
+        db.session.query(Supplier)
+        .filter(Supplier.name.ilike('%{}%'.format(keyword)))
+        .filter(Supplier.status != 'deleted')
+        .options(
+            joinedload(Supplier.frameworks),
+            joinedload(Supplier.domains),
+            joinedload(Supplier.prices),
+            joinedload('domains.domain'),
+            joinedload('prices.service_role'),
+            joinedload('frameworks.framework'),
+            noload('frameworks.framework.lots'),
+            raiseload('*'))
+        .all()
+    )
+
+
+def after(keyword):
+    return suppliers.search_sellers_by_name(keyword)
+
+
+def measure(search, keyword, iterations):
+    started = time.time()
+    for _ in range(iterations):
+        rows = search(keyword)
+        db.session.remove()
+    return len(rows), (time.time() - started) / iterations * 1000
+
+
+def main(database_url, name, iterations=20):
+    configs['development'].SQLALCHEMY_DATABASE_URI = database_url
+    app = create_app('development')
+
+    with app.app_context():
+        for length in [1, 3, 10]:
+            keyword = name[:length]
+            for label, search in [('before', before), ('after', after)]:
+                rows, ms = measure(search, keyword, iterations)
+                print('{:<12} {:<7} {:>6} rows {:>8.2f} ms/search'.format(repr(keyword), label, rows, ms))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], sys.argv[2], *[int(a) for a in sys.argv[3:4]])
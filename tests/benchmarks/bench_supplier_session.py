@@ -0,0 +1,61 @@
+"""Queries and time spent loading a supplier's session, with and without the cached notification count.
+
+Runs the api blueprint's user loader, which every authenticated request goes through, for an existing
+supplier user and counts the SQL statements it issues. Without redis (REDIS_SESSIONS off) the count is
+cached per process, which is enough to show the difference.
+
+Run from the repository root against a database with supplier data:
+
+    python -m tests.benchmarks.bench_supplier_session postgresql://localhost/marketplace <user_id> [iterations]
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.api import load_user
+from app.api.business.supplier_business import notification_counts
+from config import configs
+
+
+def measure(app, user_id, iterations):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.test_request_context('/2/ping'):
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            load_user(user_id)
+            del statements[:]
+
+            started = time.time()
+            for _ in range(iterations):
+                load_user(user_id)
+                db.session.remove()
+            elapsed = time.time() - started
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+    return len(statements) / float(iterations), elapsed / iterations * 1000
+
+
+def main(database_url, user_id, iterations=50):
+    configs['development'].SQLALCHEMY_DATABASE_URI = database_url
+    configs['development'].REDIS_SESSIONS = False
+    app = create_app('development')
+
+    for label, ttl in [('uncached', 0), ('cached', 600)]:
+        app.config['SUPPLIER_NOTIFICATION_COUNT_CACHE_TTL'] = ttl
+        with app.app_context():
+            notification_counts.clear()
+        queries, ms = measure(app, user_id, iterations)
+        print('{:<10} {:>6.1f} queries/request {:>8.2f} ms/request'.format(label, queries, ms))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], int(sys.argv[2]), *[int(a) for a in sys.argv[3:4]])
@@ -0,0 +1,73 @@
+"""Queries and time taken by `/suppliers?per_page=<n>`, with and without the batch loaded relationships.
+
+"before" serializes the same page with every relationship left to load lazily, as the view did before
+Supplier.serializer_options. "after" is the view itself.
+
+Run from the repository root against a database with supplier data:
+
+    python -m tests.benchmarks.bench_suppliers_list postgresql://localhost/marketplace [per_page] [iterations]
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Supplier
+from config import configs
+
+
+def before(app, per_page):
+    with app.test_request_context('/api/suppliers'):
+        page = (
+            Supplier.query
+            .filter(Supplier.abn.is_(None) | (Supplier.abn != Supplier.DUMMY_ABN))
+            .filter(Supplier.status != 'deleted')
+            .distinct(Supplier.name, Supplier.code)
+            .paginate(page=1, per_page=per_page)
+        )
+        return len([s.serializable for s in page.items])
+
+
+def after(app, per_page):
+    res = app.test_client().get('/api/suppliers?per_page={}'.format(per_page))
+    assert res.status_code == 200, res.status_code
+    return len(res.get_data())
+
+
+def measure(app, list_suppliers, per_page, iterations):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        list_suppliers(app, per_page)
+        db.session.remove()
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            started = time.time()
+            for _ in range(iterations):
+                list_suppliers(app, per_page)
+                db.session.remove()
+            elapsed = time.time() - started
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+    return len(statements) / float(iterations), elapsed / iterations * 1000
+
+
+def main(database_url, per_page=100, iterations=10):
+    configs['development'].SQLALCHEMY_DATABASE_URI = database_url
+    configs['development'].AUTH_REQUIRED = False
+    app = create_app('development')
+
+    for label, list_suppliers in [('before', before), ('after', after)]:
+        queries, ms = measure(app, list_suppliers, per_page, iterations)
+        print('{:<7} {:>8.1f} queries/page {:>9.2f} ms/page'.format(label, queries, ms))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *[int(a) for a in sys.argv[2:4]])
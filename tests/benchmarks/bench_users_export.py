@@ -0,0 +1,156 @@
+"""Queries and time taken by `/users/export/<framework_slug>`, before and after the single grouped query.
+
+"before" is the previous view: every (SupplierFramework, Supplier, User) row loaded as ORM objects, then a
+count of submitted drafts queried for each supplier. "after" is the view itself, as JSON and as CSV.
+
+`suppliers` suppliers with `users` active users each are added to the framework, half of them with a complete
+declaration and a submitted draft, and removed again afterwards. The framework is set to pending for the run,
+so the application columns are exported.
+
+Run from the repository root against a database with a framework that has at least one lot:
+
+    python -m tests.benchmarks.bench_users_export postgresql://localhost/marketplace <framework_slug> \
+        [suppliers] [users] [iterations]
+"""
+from __future__ import print_function
+
+import sys
+import time
+
+from sqlalchemy import event, func
+
+from app import create_app, db
+from app.datetime_utils import utcnow
+from app.models import DraftService, Framework, Supplier, SupplierFramework, User
+from config import configs
+
+FIRST_CODE = 900000000
+
+
+def seed(framework, suppliers, users):
+    lot = framework.lots[0]
+    now = utcnow()
+    codes = range(FIRST_CODE, FIRST_CODE + suppliers)
+
+    db.session.bulk_insert_mappings(Supplier, [
+        {'code': code, 'name': 'Benchmark Supplier {}'.format(code), 'status': 'complete', 'data': {}}
+        for code in codes
+    ])
+    db.session.bulk_insert_mappings(User, [
+        {'name': 'Benchmark User {}-{}'.format(code, i),
+         'email_address': 'bench-{}-{}@example.com'.format(code, i),
+         'password': 'not-a-real-password', 'active': True, 'role': 'supplier', 'supplier_code': code,
+         'password_changed_at': now}
+        for code in codes for i in range(users)
+    ])
+    db.session.bulk_insert_mappings(SupplierFramework, [
+        {'supplier_code': code, 'framework_id': framework.id,
+         'declaration': {'status': 'complete'} if code % 2 else {}}
+        for code in codes
+    ])
+    db.session.bulk_insert_mappings(DraftService, [
+        {'supplier_code': code, 'framework_id': framework.id, 'lot_id': lot.id, 'status': 'submitted', 'data': {}}
+        for code in codes if code % 2
+    ])
+    db.session.commit()
+
+
+def unseed():
+    for model in [DraftService, SupplierFramework, User]:
+        model.query.filter(model.supplier_code >= FIRST_CODE).delete(synchronize_session=False)
+    Supplier.query.filter(Supplier.code >= FIRST_CODE).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def before(app, framework_slug):
+    with app.test_request_context():
+        rows = db.session.query(
+            SupplierFramework, Supplier, User
+        ).join(
+            Supplier, User, Framework
+        ).filter(
+            Framework.slug == framework_slug
+        ).filter(
+            User.active.is_(True)
+        ).all()
+
+        counts = {}
+        user_rows = []
+        for sf, s, u in rows:
+            declaration_status = sf.declaration.get('status') if sf.declaration else 'unstarted'
+            if sf.supplier_code not in counts:
+                counts[sf.supplier_code] = db.session.query(func.count()).filter(
+                    DraftService.supplier_code == sf.supplier_code,
+                    DraftService.framework_id == sf.framework_id,
+                    DraftService.status == 'submitted'
+                ).scalar()
+            user_rows.append({
+                'user_email': u.email_address,
+                'user_name': u.name,
+                'supplier_code': s.code,
+                'declaration_status': declaration_status,
+                'application_status':
+                    'application' if counts[sf.supplier_code] and declaration_status == 'complete'
+                    else 'no_application',
+                'framework_agreement': bool(sf.agreement_returned_at),
+                'application_result':
+                    'no result' if sf.on_framework is None else ('pass' if sf.on_framework else 'fail')
+            })
+        return len(user_rows)
+
+
+def after(output_format):
+    def export(app, framework_slug):
+        res = app.test_client().get('/api/users/export/{}?format={}'.format(framework_slug, output_format))
+        assert res.status_code == 200, res.status_code
+        return len(res.get_data())
+    return export
+
+
+def measure(app, export, framework_slug, iterations):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            started = time.time()
+            for _ in range(iterations):
+                export(app, framework_slug)
+                db.session.remove()
+            elapsed = time.time() - started
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+    return len(statements) / float(iterations), elapsed / iterations * 1000
+
+
+def main(database_url, framework_slug, suppliers=5000, users=3, iterations=3):
+    configs['development'].SQLALCHEMY_DATABASE_URI = database_url
+    configs['development'].AUTH_REQUIRED = False
+    app = create_app('development')
+
+    with app.app_context():
+        framework = Framework.query.filter(Framework.slug == framework_slug).one()
+        status = framework.status
+        framework.status = 'pending'
+        seed(framework, suppliers, users)
+        framework_id = framework.id
+        db.session.remove()
+
+    try:
+        print('{} suppliers x {} users'.format(suppliers, users))
+        for label, export in [('before', before), ('after json', after('json')), ('after csv', after('csv'))]:
+            queries, ms = measure(app, export, framework_slug, iterations)
+            print('{:<10} {:>8.1f} queries {:>9.1f} ms/export'.format(label, queries, ms))
+    finally:
+        with app.app_context():
+            unseed()
+            Framework.query.get(framework_id).status = status
+            db.session.commit()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], sys.argv[2], *[int(a) for a in sys.argv[3:6]])
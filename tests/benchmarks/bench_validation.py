@@ -0,0 +1,43 @@
+"""Per-call cost of JSON schema validation with and without the shared validator cache.
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench_validation [iterations]
+"""
+from __future__ import print_function
+
+import sys
+import timeit
+
+from app.validation import SCHEMA_NAMES, _build_validator, get_validator
+
+
+def bench(label, fn, iterations):
+    seconds = timeit.timeit(fn, number=iterations)
+    per_call = seconds / iterations / len(SCHEMA_NAMES) * 1e6
+    print('{:<40} {:>10.1f} us/call'.format(label, per_call))
+
+
+def main(iterations=200):
+    print('{} schemas, {} iterations'.format(len(SCHEMA_NAMES), iterations))
+
+    def uncached(**kwargs):
+        def run():
+            for name in SCHEMA_NAMES:
+                list(_build_validator(name, **kwargs).iter_errors({}))
+        return run
+
+    def cached(**kwargs):
+        def run():
+            for name in SCHEMA_NAMES:
+                list(get_validator(name, **kwargs).iter_errors({}))
+        return run
+
+    bench('before: enforce_required=True', uncached(), iterations)
+    bench('after:  enforce_required=True', cached(), iterations)
+    bench('before: enforce_required=False', uncached(required_fields=[]), iterations)
+    bench('after:  enforce_required=False', cached(enforce_required=False), iterations)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
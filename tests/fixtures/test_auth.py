@@ -2,6 +2,9 @@ import json
 import pytest
 from base64 import b64encode
 
+from app.api.services import api_key_service
+from app.api.services.api_key import api_key_users, hash_key
+
 
 def test_anonymous(client):
     res = client.get('/2/ping')
@@ -229,3 +232,24 @@ def test_api_key_require_auth_decorator(client, users, api_key):
 
     res = client.get('/2/reports/brief/published', headers={'X-Api-Key': key})
     assert res.status_code == 200
+
+
+def test_api_key_is_cached_until_revoked(app, client, users, api_key, mocker):
+    key = api_key.key
+    app.config['API_KEY_CACHE_TTL'] = 60
+    api_key_users.clear()
+    get_user_id = mocker.spy(api_key_service, 'get_user_id')
+
+    try:
+        res = client.get('/2/ping', headers={'X-Api-Key': key})
+        assert json.loads(res.get_data(as_text=True))['isAuthenticated']
+        assert api_key_users.get(hash_key(key)) == api_key.user_id
+        assert get_user_id.call_count == 1
+
+        api_key_service.revoke(key)
+        assert api_key_users.get(hash_key(key)) is None
+
+        res = client.get('/2/ping', headers={'X-Api-Key': key})
+        assert res.status_code == 403
+    finally:
+        api_key_users.clear()
@@ -1,7 +1,7 @@
 # coding: utf-8
 
 import pytest
-from app.api.csv import generate_brief_responses_csv
+from app.api.csv import generate_atm_opportunities_csv, generate_brief_responses_csv
 
 brief_response_data_1 = {
     "supplierName": "K,ev’s \"Bu,tties",
@@ -294,3 +294,36 @@ def test_csv_specialist_hourly_rate(app, briefs, brief_responses):
         u'Queensland Labour hire licence expiry,'
     ]
     assert csvdata.splitlines() == lines
+
+
+def test_streamed_csv_matches_buffered_csv():
+    opportunities = [{
+        'id': i,
+        'title': u'Opportunity ❝{}❞'.format(i),
+        'email_address': 'buyer@digital.gov.au',
+        'openTo': 'all',
+        'areaOfExpertise': 'Software engineering and Development',
+        'organisation': 'Digital Transformation Agency',
+        'summary': '=cmd, with a comma',
+        'location': ['ACT', 'NSW'],
+        'evaluationType': ['References'],
+        'startDate': '2019-01-01',
+        'evaluationCriteria': [{'criteria': 'good', 'weighting': '100'}],
+        'awarded_to': None,
+        'created_at': '2018-12-01',
+        'published_at': '2018-12-02',
+        'closed_at': '2018-12-16',
+        'time_awarded': None
+    } for i in range(1, 1202)]
+
+    buffered = generate_atm_opportunities_csv(opportunities)
+    chunks = list(generate_atm_opportunities_csv(iter(opportunities), stream=True))
+
+    assert len(chunks) == 3
+    assert ''.join(chunks) == buffered
+    assert buffered.splitlines()[0].startswith(u'Opportunity id,title,Raised by,')
+    assert len(buffered.splitlines()) == 1202
+
+
+def test_streamed_csv_of_nothing_is_an_empty_row():
+    assert ''.join(generate_atm_opportunities_csv(iter([]), stream=True)) == generate_atm_opportunities_csv([])
@@ -1,6 +1,8 @@
 import json
 import pytest
 from datetime import date
+from app.api.services.briefs import opportunities_cache
+from app.models import Brief, db
 from tests.app.helpers import COMPLETE_DIGITAL_SPECIALISTS_BRIEF
 
 briefs_data_all_sellers = COMPLETE_DIGITAL_SPECIALISTS_BRIEF.copy()
@@ -302,3 +304,56 @@ def test_opportunities_success_location(client, briefs):
     data = json.loads(res.get_data(as_text=True))
     assert 'opportunities' in data
     assert len(data['opportunities']) == 5
+
+
+@pytest.fixture()
+def cached_opportunities(app):
+    app.config['OPPORTUNITIES_CACHE_TTL'] = 60
+    opportunities_cache.clear()
+    yield
+    opportunities_cache.clear()
+
+
+def test_opportunities_etag(client, briefs, cached_opportunities):
+    res = client.get('/2/opportunities?statusFilters=live')
+    assert res.status_code == 200
+    etag = res.headers['ETag']
+
+    res = client.get('/2/opportunities?statusFilters=live', headers={'If-None-Match': etag})
+    assert res.status_code == 304
+
+    res = client.get('/2/opportunities?statusFilters=closed', headers={'If-None-Match': etag})
+    assert res.status_code == 200
+    assert res.headers['ETag'] != etag
+
+
+def test_opportunities_cache_cleared_on_commit(app, client, briefs, cached_opportunities):
+    res = client.get('/2/opportunities')
+    etag = res.headers['ETag']
+    assert len(json.loads(res.get_data(as_text=True))['opportunities']) == 5
+
+    with app.app_context():
+        brief = Brief.query.get(1)
+        # the published_at setter ignores None
+        brief._published_at = None
+        db.session.commit()
+
+    res = client.get('/2/opportunities', headers={'If-None-Match': etag})
+    assert res.status_code == 200
+    assert len(json.loads(res.get_data(as_text=True))['opportunities']) == 4
+
+
+def test_opportunities_cache_kept_when_a_draft_changes(app, client, briefs, cached_opportunities):
+    res = client.get('/2/opportunities')
+    etag = res.headers['ETag']
+
+    with app.app_context():
+        brief = Brief.query.get(1)
+        draft = Brief(data={'title': 'Draft'}, framework=brief.framework, lot=brief.lot)
+        db.session.add(draft)
+        db.session.commit()
+        draft.data['title'] = 'Draft, edited'
+        db.session.commit()
+
+    res = client.get('/2/opportunities', headers={'If-None-Match': etag})
+    assert res.status_code == 304
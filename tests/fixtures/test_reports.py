@@ -0,0 +1,86 @@
+import json
+
+import pendulum
+
+from app import db
+from app.models import AuditEvent, AuditTypes
+
+
+def add_feedback(app, comments, created_at):
+    with app.app_context():
+        for comment in comments:
+            event = AuditEvent(
+                audit_type=AuditTypes.feedback,
+                user='test@digital.gov.au',
+                data={'objectAction': 'submitted', 'comment': comment},
+                db_object=None
+            )
+            event.created_at = created_at
+            db.session.add(event)
+        db.session.commit()
+
+
+def test_report_defaults_to_json_document(app, client, api_key):
+    add_feedback(app, ['one', 'two'], pendulum.create(2018, 1, 1, tz='UTC'))
+
+    res = client.get('/2/reports/feedback/all', headers={'X-Api-Key': api_key.key})
+    assert res.status_code == 200
+
+    data = json.loads(res.get_data(as_text=True))
+    assert data['total'] == 2
+    assert [i['comment'] for i in data['items']] == ['one', 'two']
+    assert 'X-Updated-Until' in res.headers
+
+
+def test_report_streams_ndjson(app, client, api_key):
+    add_feedback(app, ['one', 'two'], pendulum.create(2018, 1, 1, tz='UTC'))
+
+    res = client.get('/2/reports/feedback/all?format=ndjson', headers={'X-Api-Key': api_key.key})
+    assert res.status_code == 200
+    assert res.mimetype == 'application/x-ndjson'
+
+    lines = res.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['comment'] for line in lines] == ['one', 'two']
+
+
+def test_report_streams_csv(app, client, api_key):
+    add_feedback(app, ['one', 'two'], pendulum.create(2018, 1, 1, tz='UTC'))
+
+    res = client.get('/2/reports/feedback/all?format=csv', headers={'X-Api-Key': api_key.key})
+    assert res.status_code == 200
+    assert res.mimetype == 'text/csv'
+    assert res.headers['Content-Disposition'] == 'attachment; filename=feedback.csv'
+
+    lines = res.get_data(as_text=True).splitlines()
+    assert len(lines) == 3
+    assert lines[0].startswith('created_at,user,action,')
+    assert lines[1].startswith('2018-01-01T00:00:00+00:00,test@digital.gov.au,submitted,')
+
+
+def test_report_only_includes_rows_updated_since(app, client, api_key):
+    add_feedback(app, ['old'], pendulum.create(2018, 1, 1, tz='UTC'))
+    add_feedback(app, ['new'], pendulum.create(2018, 3, 1, tz='UTC'))
+
+    res = client.get('/2/reports/feedback/all?format=ndjson&updated_since=2018-02-01T00:00:00Z',
+                     headers={'X-Api-Key': api_key.key})
+    assert res.status_code == 200
+
+    lines = res.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['comment'] for line in lines] == ['new']
+
+    updated_until = res.headers['X-Updated-Until']
+    assert updated_until.endswith('Z')
+    res = client.get('/2/reports/feedback/all', query_string={'updated_since': updated_until},
+                     headers={'X-Api-Key': api_key.key})
+    assert json.loads(res.get_data(as_text=True))['total'] == 0
+
+
+def test_report_rejects_invalid_parameters(client, api_key):
+    res = client.get('/2/reports/feedback/all?format=xml', headers={'X-Api-Key': api_key.key})
+    assert res.status_code == 400
+
+    res = client.get('/2/reports/feedback/all?updated_since=yesterday', headers={'X-Api-Key': api_key.key})
+    assert res.status_code == 400
+
+    res = client.get('/2/reports/agency/all?updated_since=2018-02-01', headers={'X-Api-Key': api_key.key})
+    assert res.status_code == 400
@@ -1,6 +1,6 @@
 import json
 from app.models import Brief, Framework, User, Supplier, SupplierDomain, SupplierFramework, CaseStudy, db
-from app.api.services import frameworks_service, lots_service
+from app.api.services import frameworks_service, lots_service, suppliers as suppliers_service
 import pytest
 import pendulum
 
@@ -209,3 +209,42 @@ def test_seller_search_does_not_return_recruiter_for_non_specialist(
     }
 
     assert recruiter not in json.loads(response.data)['sellers']
+
+
+@pytest.fixture()
+def named_suppliers(app, request):
+    with app.app_context():
+        framework = db.session.query(Framework).filter(Framework.slug == 'digital-marketplace').first()
+        names = ['Digital Acme', 'Acme Digital', '100% Acme', u'Caf\xe9 M\u0101ori']
+        names += ['Bulk Seller {}'.format(i) for i in range(25)]
+        for i, name in enumerate(names, start=100):
+            db.session.add(Supplier(abn=i, code=i, name=name, data={}))
+            db.session.add(SupplierFramework(framework_id=framework.id, supplier_code=i))
+
+        db.session.commit()
+        yield db.session.query(Supplier).filter(Supplier.code >= 100).all()
+
+
+def test_seller_search_ranks_prefix_matches_first(client, briefs, named_suppliers):
+    response = client.get('/2/suppliers/search?keyword=acme&briefId=3&all=true')
+    assert [s['name'] for s in json.loads(response.data)['sellers']] == ['Acme Digital', '100% Acme', 'Digital Acme']
+
+
+def test_seller_search_treats_keyword_literally(client, briefs, named_suppliers):
+    response = client.get('/2/suppliers/search?keyword=100%25&briefId=3&all=true')
+    assert [s['name'] for s in json.loads(response.data)['sellers']] == ['100% Acme']
+
+
+def test_seller_search_is_capped(client, briefs, named_suppliers):
+    response = client.get('/2/suppliers/search?keyword=bulk&briefId=3&all=true')
+    assert len(json.loads(response.data)['sellers']) == 20
+
+
+def test_seller_search_matches_non_ascii_keywords(app, client, briefs, named_suppliers):
+    response = client.get('/2/suppliers/search', query_string={'keyword': u'caf\xe9', 'briefId': 3, 'all': 'true'})
+    assert response.status_code == 200
+    assert [s['name'] for s in json.loads(response.data)['sellers']] == [u'Caf\xe9 M\u0101ori']
+
+    with app.app_context():
+        results = suppliers_service.search_sellers_by_name(u'm\u0101ori')
+        assert [r.name for r in results] == [u'Caf\xe9 M\u0101ori']
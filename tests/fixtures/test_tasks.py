@@ -1,14 +1,19 @@
+import tempfile
+import zipfile
 from datetime import date, timedelta
+from io import BytesIO
 from os import environ
 
 import pytest
 from flask import current_app
+from botocore.exceptions import ClientError
 from mock.mock import MagicMock
 from requests.exceptions import RequestException
 
 from app import db
+from app.tasks import aws
 from app.api.services import AuditTypes as audit_types
-from app.models import (Application, Assessment, AuditEvent, Supplier,
+from app.models import (Application, Assessment, AuditEvent, Brief, Supplier,
                         SupplierDomain)
 from app.tasks.jira import sync_application_approvals_with_jira
 from app.tasks.mailchimp import (MailChimpConfigException,
@@ -18,7 +23,7 @@ from app.tasks.mailchimp import (MailChimpConfigException,
                                  send_labour_hire_licence_expiry_campaign,
                                  send_new_briefs_email,
                                  sync_mailchimp_seller_list)
-from app.tasks.s3 import CreateResponsesZipException, create_responses_zip
+from app.tasks.s3 import CreateResponsesZipException, add_attachments, create_responses_zip
 from dmapiclient.audit import AuditTypes
 from tests.app.helpers import (COMPLETE_DIGITAL_SPECIALISTS_BRIEF,
                                INCOMING_APPLICATION_DATA)
@@ -56,7 +61,9 @@ def test_sync_mailchimp_seller_list_success(app, mocker, suppliers, supplier_dom
 
         sync_mailchimp_seller_list()
 
-        client.lists.members.all.assert_called_with('123456', fields='members.email_address,members.id', get_all=True)
+        client.lists.members.all.assert_called_with(
+            '123456', count=1000, offset=0, fields='members.email_address,members.status,total_items'
+        )
         client.lists.update_members.assert_any_call(list_id='123456', data={
             'members': [{
                 'email_address': email,
@@ -65,6 +72,88 @@ def test_sync_mailchimp_seller_list_success(app, mocker, suppliers, supplier_dom
         })
 
 
+class StubMailChimp(object):
+    """A local stand-in for the mailchimp3 client's list member endpoints.
+
+    `members` maps addresses to their status. The first `failures` batch updates raise a RequestException.
+    """
+
+    def __init__(self, members=None, failures=0):
+        self.list_members = dict(members or {})
+        self.failures = failures
+        self.offsets = []
+        self.batches = []
+        self.lists = self
+        self.members = self
+
+    def all(self, list_id, count, offset, fields):
+        self.offsets.append(offset)
+        page = sorted(self.list_members)[offset:offset + count]
+        return {
+            'members': [{'email_address': a, 'status': self.list_members[a]} for a in page],
+            'total_items': len(self.list_members)
+        }
+
+    def update_members(self, list_id, data):
+        if self.failures:
+            self.failures -= 1
+            raise RequestException('Service unavailable')
+        self.batches.append([m['email_address'] for m in data['members']])
+        for member in data['members']:
+            if member['email_address'] not in self.list_members or data.get('update_existing'):
+                self.list_members[member['email_address']] = member['status']
+
+
+@pytest.mark.parametrize('suppliers', [{'framework_slug': 'digital-marketplace'}], indirect=True)
+@pytest.mark.parametrize(
+    'users',
+    [{'framework_slug': 'digital-marketplace', 'user_role': 'supplier', 'email_domain': 'supplier.com'}],
+    indirect=True
+)
+def test_sync_mailchimp_seller_list_pages_and_batches(app, mocker, suppliers, supplier_domains, users):
+    seller_addresses = [x.data['contact_email'].lower() for x in suppliers] + [x.email_address.lower() for x in users]
+    stub = StubMailChimp(members={
+        seller_addresses[0]: 'subscribed',
+        seller_addresses[1]: 'unsubscribed',
+        'a@former.com': 'subscribed',
+        'b@former.com': 'unsubscribed'
+    }, failures=2)
+    mocker.patch('app.tasks.mailchimp.MailChimp', return_value=stub)
+    mocker.patch('app.tasks.mailchimp.MEMBER_PAGE_SIZE', 3)
+    mocker.patch('app.tasks.mailchimp.MEMBER_BATCH_SIZE', 2)
+    sleep = mocker.patch('app.tasks.mailchimp.sleep')
+
+    with app.app_context():
+        environ['MAILCHIMP_SELLER_LIST_ID'] = '123456'
+        diff = sync_mailchimp_seller_list()
+
+    assert stub.offsets == [0, 3]
+    assert diff == {'add': seller_addresses[2:], 'remove': ['a@former.com']}
+    assert [len(batch) for batch in stub.batches] == [2] * (len(diff['add']) // 2) + [1] * (len(diff['add']) % 2)
+    assert [c[0][0] for c in sleep.call_args_list] == [1, 2]
+    # members who unsubscribed are not resubscribed and those who aren't sellers are left alone by default
+    assert stub.list_members[seller_addresses[1]] == 'unsubscribed'
+    assert stub.list_members['a@former.com'] == 'subscribed'
+
+
+@pytest.mark.parametrize('suppliers', [{'framework_slug': 'digital-marketplace'}], indirect=True)
+def test_sync_mailchimp_seller_list_dry_run_and_unsubscribe(app, mocker, suppliers, supplier_domains):
+    stub = StubMailChimp(members={'a@former.com': 'subscribed'})
+    mocker.patch('app.tasks.mailchimp.MailChimp', return_value=stub)
+
+    with app.app_context():
+        environ['MAILCHIMP_SELLER_LIST_ID'] = '123456'
+
+        diff = sync_mailchimp_seller_list(dry_run=True, unsubscribe_missing=True)
+        assert len(diff['add']) == len(suppliers)
+        assert diff['remove'] == ['a@former.com']
+        assert stub.batches == []
+
+        sync_mailchimp_seller_list(unsubscribe_missing=True)
+        assert stub.list_members['a@former.com'] == 'unsubscribed'
+        assert sync_mailchimp_seller_list(dry_run=True) == {'add': [], 'remove': []}
+
+
 def test_sync_mailchimp_seller_list_fails_mailchimp_api_call_with_requests_error(app, mocker):
     mailchimp = mocker.patch('app.tasks.mailchimp.MailChimp')
     requestEx = mocker.patch('app.tasks.mailchimp.RequestException')
@@ -223,21 +312,134 @@ brief_response_data = {
 }
 
 
+class FakeS3(object):
+    """Stands in for call_with_client. Attachments that haven't been stored explicitly contain their own key."""
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+
+    def content(self, key):
+        if key in self.objects:
+            return self.objects[key]
+        if '/documents/' in key:
+            return key.encode('utf-8')
+        raise ClientError({'Error': {'Code': 'NoSuchKey', 'Message': 'missing'}}, 'GetObject')
+
+    def __call__(self, service, method, **kwargs):
+        key = kwargs.get('Key')
+        self.calls.append((method, key))
+        if method == 'list_objects_v2':
+            return {'Contents': [{'Key': k, 'ETag': str(hash(v))} for k, v in self.objects.items()
+                                 if k.startswith(kwargs['Prefix'])]}
+        if method == 'head_object':
+            return {'ETag': str(hash(self.content(key)))}
+        if method == 'download_fileobj':
+            kwargs['Fileobj'].write(self.content(key))
+        if method == 'upload_fileobj':
+            self.objects[key] = kwargs['Fileobj'].read()
+
+    def downloaded(self):
+        return [key.split('/')[-1] for method, key in self.calls if method == 'download_fileobj']
+
+
 @pytest.mark.parametrize('brief_responses', [{'data': brief_response_data}], indirect=True)
 def test_create_responses_zip_success(app, briefs, brief_responses, mocker):
-    boto3 = mocker.patch('app.tasks.s3.boto3')
-    s3 = MagicMock()
-    bucket = MagicMock()
+    s3 = FakeS3()
+    call_with_client = mocker.patch('app.tasks.s3.call_with_client', side_effect=s3)
+
+    with app.app_context():
+        create_responses_zip(1)
+        methods = [c[0][1] for c in call_with_client.call_args_list]
+        assert 'download_fileobj' in methods
+        assert methods[-1] == 'upload_fileobj'
 
-    boto3.resource.return_value = s3
-    s3.Bucket.return_value = bucket
+
+@pytest.mark.parametrize('brief_responses', [{'data': brief_response_data}], indirect=True)
+def test_create_responses_zip_adds_attachments_in_order(app, briefs, brief_responses, mocker):
+    s3 = FakeS3()
+    mocker.patch('app.tasks.s3.call_with_client', side_effect=s3)
+
+    with app.app_context():
+        create_responses_zip(1)
+        archive = s3.objects['digital-marketplace/archives/brief-1/brief-1-resumes.zip']
+        assert Brief.query.get(1).responses_zip_filesize == len(archive)
+
+    with zipfile.ZipFile(BytesIO(archive)) as zf:
+        attachments = [zf.read(name) for name in zf.namelist() if name.endswith('.pdf')]
+
+    assert [a.split('/')[-1] for a in attachments] == ['attachment_1.pdf', 'attachment_2.pdf']
+
+
+@pytest.mark.parametrize('brief_responses', [{'data': brief_response_data}], indirect=True)
+def test_create_responses_zip_only_downloads_changed_attachments(app, briefs, brief_responses, mocker):
+    s3 = FakeS3()
+    mocker.patch('app.tasks.s3.call_with_client', side_effect=s3)
 
     with app.app_context():
         create_responses_zip(1)
-        assert boto3.resource.called
-        assert s3.Bucket.called
-        assert bucket.download_fileobj.called
-        assert bucket.upload_fileobj.called
+        assert s3.downloaded() == ['attachment_1.pdf', 'attachment_2.pdf']
+
+        changed = 'digital-marketplace/documents/brief-1/supplier-{}/attachment_2.pdf'.format(
+            brief_responses[0].supplier_code
+        )
+        s3.objects[changed] = b'changed'
+        del s3.calls[:]
+
+        create_responses_zip(1)
+        assert s3.downloaded() == ['brief-1-resumes.zip', 'attachment_2.pdf']
+
+        manifest = Brief.query.get(1).responses_zip_manifest
+        assert manifest['fingerprint']
+        assert [e['key'] for e in manifest['entries']][1] == changed
+
+    with zipfile.ZipFile(BytesIO(s3.objects['digital-marketplace/archives/brief-1/brief-1-resumes.zip'])) as zf:
+        attachments = [zf.read(name) for name in zf.namelist() if name.endswith('.pdf')]
+
+    assert attachments[0].endswith(b'attachment_1.pdf')
+    assert attachments[1] == b'changed'
+
+
+@pytest.mark.parametrize('brief_responses', [{'data': brief_response_data}], indirect=True)
+def test_create_responses_zip_does_not_record_a_failed_upload(app, briefs, brief_responses, mocker):
+    s3 = FakeS3()
+
+    def failing_upload(service, method, **kwargs):
+        if method == 'upload_fileobj':
+            raise ClientError({'Error': {'Code': 'InternalError', 'Message': 'failed'}}, 'PutObject')
+        return s3(service, method, **kwargs)
+
+    mocker.patch('app.tasks.s3.call_with_client', side_effect=failing_upload)
+
+    with app.app_context():
+        with pytest.raises(CreateResponsesZipException):
+            create_responses_zip(1)
+
+        brief = Brief.query.get(1)
+        assert brief.responses_zip_manifest is None
+        assert not brief.responses_zip_filesize
+
+
+def test_add_attachments_closes_downloads_when_one_fails(app, mocker):
+    downloads = []
+
+    def download_attachment(app, bucket, key):
+        if key == 'first':
+            raise CreateResponsesZipException('The file "first" failed to download')
+        attachment = tempfile.NamedTemporaryFile()
+        downloads.append(attachment)
+        return attachment
+
+    mocker.patch('app.tasks.s3.download_attachment', side_effect=download_attachment)
+    files = [{'key': key, 'zip_name': key} for key in ['first', 'second', 'third']]
+
+    with app.app_context(), tempfile.TemporaryFile() as archive:
+        with zipfile.ZipFile(archive, mode='w') as zf:
+            with pytest.raises(CreateResponsesZipException):
+                add_attachments(zf, files, 'bucket', 2)
+
+    assert downloads
+    assert all(d.closed for d in downloads)
 
 
 brief_response_data = {
@@ -246,25 +448,35 @@ brief_response_data = {
 
 
 def test_create_responses_zip_fails_when_no_responses(app, briefs, mocker):
-    boto3 = mocker.patch('app.tasks.s3.boto3')
-    s3 = MagicMock()
-    bucket = MagicMock()
-
-    boto3.resource.return_value = s3
-    s3.Bucket.return_value = bucket
+    call_with_client = mocker.patch('app.tasks.s3.call_with_client')
 
     with app.app_context():
         try:
             create_responses_zip(1)
             assert False
         except CreateResponsesZipException as e:
-            assert not boto3.resource.called
-            assert not s3.Bucket.called
-            assert not bucket.download_fileobj.called
-            assert not bucket.upload_fileobj.called
+            assert not call_with_client.called
             assert str(e) == 'There were no respones for brief id 1'
 
 
+def test_aws_client_is_reused_and_rebuilt_when_credentials_expire(app, mocker):
+    boto3 = mocker.patch('app.tasks.aws.boto3')
+    expired = ClientError({'Error': {'Code': 'ExpiredToken', 'Message': 'expired'}}, 'SendEmail')
+    first, second = MagicMock(), MagicMock()
+    first.send_email.side_effect = [{}, expired]
+    boto3.session.Session.return_value.client.side_effect = [first, second]
+
+    with app.app_context():
+        aws.discard_client('ses')
+        aws.call_with_client('ses', 'send_email')
+        aws.call_with_client('ses', 'send_email')
+
+        assert boto3.session.Session.return_value.client.call_count == 2
+        assert first.send_email.call_count == 2
+        assert second.send_email.call_count == 1
+        aws.discard_client('ses')
+
+
 @pytest.fixture
 def mock_jira_application_response(mocker):
     marketplace_jira = MagicMock()